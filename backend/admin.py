@@ -0,0 +1,34 @@
+"""
+Admin Access
+Shared-secret check for the diagnostic /api/admin endpoints
+
+Admin endpoints are disabled (404) unless ADMIN_TOKEN is set; requests must
+then send it in the X-Admin-Token header.
+
+Configuration (environment variables):
+- ADMIN_TOKEN: shared secret for admin endpoints (default unset = disabled)
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+ADMIN_TOKEN_HEADER = 'X-Admin-Token'
+
+
+def is_admin_token(token):
+    """True when admin access is enabled and token matches ADMIN_TOKEN"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode('utf-8'), ADMIN_TOKEN.encode('utf-8'))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """FastAPI dependency guarding admin endpoints"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -0,0 +1,57 @@
+"""
+Columnar Response Format
+Compact chart payloads for ?format=columnar
+
+Instead of an array of objects repeating every key per point:
+
+    {
+        "columns": ["date", "min_score", ...],
+        "data": {"date": [19723, 19730, ...], "min_score": [65, 71, ...]},
+        "epoch_days": ["date"]
+    }
+
+Dates are encoded as days since 1970-01-01 (timestamps as fractional days),
+listed under "epoch_days" so clients know which columns to convert back:
+new Date(days * 86400000).
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+EPOCH_DATE = date(1970, 1, 1)
+EPOCH_DATETIME = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86400
+
+
+def epoch_days(value):
+    """Days since the epoch; whole days for dates, ~1 s resolution for timestamps"""
+    if isinstance(value, datetime):
+        epoch = EPOCH_DATETIME.replace(tzinfo=value.tzinfo) if value.tzinfo else EPOCH_DATETIME
+        return round((value - epoch).total_seconds() / SECONDS_PER_DAY, 5)
+    return (value - EPOCH_DATE).days
+
+
+def to_columnar(rows, columns):
+    """
+    Pivot row dicts into the columnar payload
+
+    - columns: names to include, in order (e.g. list(Model.model_fields))
+    """
+    data = {column: [] for column in columns}
+    day_columns = set()
+
+    for row in rows:
+        for column in columns:
+            value = row[column]
+            if isinstance(value, date):
+                value = epoch_days(value)
+                day_columns.add(column)
+            elif isinstance(value, Decimal):
+                value = float(value)
+            data[column].append(value)
+
+    return {
+        "columns": list(columns),
+        "data": data,
+        "epoch_days": [column for column in columns if column in day_columns]
+    }
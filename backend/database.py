@@ -0,0 +1,395 @@
+"""
+Database Access Layer
+Shared PostgreSQL connection pool for the FastAPI backend
+
+Connections are opened once and reused across requests instead of running a
+fresh psycopg2.connect() (TCP + auth handshake) per request.
+
+Configuration (environment variables):
+- DB_POOL_MIN: connections opened when the pool starts (default 1)
+- DB_POOL_MAX: hard cap on open connections (default 10)
+- DB_POOL_TIMEOUT: seconds to wait for a free connection (default 10)
+- DB_POOL_PING_AFTER: idle seconds after which a connection is pinged
+  with SELECT 1 before reuse, 0 pings on every checkout (default 30)
+
+Async callers must not run psycopg2 on the event loop; they go through
+run_db() / fetch_all() / fetch_one(), which offload the blocking work to a
+bounded executor sized to the pool.
+
+Cursors from get_cursor() time every execute() for /metrics, labelled with
+the function that ran the statement; pool checkout waits are timed too.
+Statements slower than SLOW_QUERY_MS go to the slow query log (slow_queries.py),
+and statements of a profiled request are added to its profile (profiling.py).
+
+With EMBEDDED_DB_PATH set (embedded.py) there is no pool: get_cursor()
+yields a read-only cursor on the exported SQLite file instead, timed the
+same way.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+from metrics import observe_query, observe_pool_wait
+import embedded
+import profiling
+import slow_queries
+
+load_dotenv()
+
+# Database configuration
+DATABASE_URL = os.getenv('DATABASE_URL')
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_PORT = os.getenv('DB_PORT', '5432')
+DB_NAME = os.getenv('DB_NAME', 'aaip_data')
+DB_USER = os.getenv('DB_USER')
+DB_PASSWORD = os.getenv('DB_PASSWORD')
+
+# Pool configuration
+DB_POOL_MIN = int(os.getenv('DB_POOL_MIN', '1'))
+DB_POOL_MAX = int(os.getenv('DB_POOL_MAX', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+DB_POOL_PING_AFTER = float(os.getenv('DB_POOL_PING_AFTER', '30'))
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes free within DB_POOL_TIMEOUT"""
+
+
+# Idle connections as (connection, last_used) pairs, most recently used last.
+# The semaphore caps connections handed out, and new connections are only
+# opened when nothing is idle, so the total never exceeds DB_POOL_MAX.
+_idle = []
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+_started = False
+_executor = None
+# Per-request memo of shared lookups, see shared_lookups()
+_shared = contextvars.ContextVar('shared_lookups', default=None)
+
+
+def _statement_label(frame):
+    """'get_draw_stats', 'fetch_latest_summary.load', ... for the function running a statement"""
+    code = frame.f_code
+    return getattr(code, 'co_qualname', code.co_name).replace('.<locals>', '')
+
+
+class TimedExecute:
+    """
+    Cursor mixin recording the duration of every execute()
+
+    The statement label is the calling function unless label is set.
+    Statements over the slow query threshold are also sent to the slow log.
+    """
+
+    label = None
+
+    def execute(self, query, vars=None):
+        label = self.label or _statement_label(sys._getframe(1))
+        start = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception:
+            observe_query(label, time.perf_counter() - start, failed=True)
+            raise
+        elapsed = time.perf_counter() - start
+        observe_query(label, elapsed)
+        if profiling.active:
+            profiling.record_query(label, elapsed)
+
+        slow_after = slow_queries.threshold_seconds()
+        if slow_after is not None and elapsed >= slow_after:
+            slow_queries.record(label, query, vars, self.query, elapsed, self.rowcount)
+        return result
+
+
+class TimedCursor(TimedExecute, RealDictCursor):
+    """RealDictCursor with timed execute()"""
+
+
+class TimedEmbeddedCursor(TimedExecute, embedded.EmbeddedCursor):
+    """Read-only cursor on the embedded SQLite file with timed execute()"""
+
+
+def _connect():
+    """Open a new PostgreSQL connection"""
+    if DATABASE_URL:
+        return psycopg2.connect(DATABASE_URL)
+    return psycopg2.connect(
+        host=DB_HOST,
+        port=DB_PORT,
+        database=DB_NAME,
+        user=DB_USER,
+        password=DB_PASSWORD
+    )
+
+
+def dedicated_connection():
+    """Open a connection outside the pool, for long-lived uses such as LISTEN"""
+    return _connect()
+
+
+def init_pool():
+    """Open DB_POOL_MIN connections up front (no-op if already started or embedded)"""
+    global _started
+    if embedded.EMBEDDED_DB_PATH:
+        return
+    with _lock:
+        if _started:
+            return
+        _started = True
+        missing = DB_POOL_MIN - len(_idle)
+
+    try:
+        for _ in range(max(0, missing)):
+            conn = _connect()
+            with _lock:
+                _idle.append((conn, time.monotonic()))
+    except psycopg2.Error:
+        with _lock:
+            _started = False
+        raise
+
+
+def close_pool():
+    """Close every idle connection, called on application shutdown"""
+    global _started, _executor
+    with _lock:
+        idle = list(_idle)
+        _idle.clear()
+        _started = False
+        executor, _executor = _executor, None
+
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+    for conn, _ in idle:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+
+def pool_status():
+    """Snapshot of pool usage for diagnostics"""
+    with _lock:
+        idle = len(_idle)
+    return {
+        'idle': idle,
+        'max': DB_POOL_MAX,
+        'min': DB_POOL_MIN
+    }
+
+
+def _is_healthy(conn, last_used):
+    """Check a connection before handing it out"""
+    if conn.closed:
+        return False
+    if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+        return False
+    if time.monotonic() - last_used < DB_POOL_PING_AFTER:
+        return True
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        cursor.close()
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+def _checkout():
+    """Take a healthy connection from the pool, waiting for a free slot"""
+    start = time.perf_counter()
+    if not _slots.acquire(timeout=DB_POOL_TIMEOUT):
+        observe_pool_wait(time.perf_counter() - start)
+        raise PoolTimeoutError(f"No database connection available after {DB_POOL_TIMEOUT}s")
+
+    try:
+        init_pool()
+        while True:
+            with _lock:
+                entry = _idle.pop() if _idle else None
+            if entry is None:
+                conn = _connect()
+                observe_pool_wait(time.perf_counter() - start)
+                return conn
+
+            conn, last_used = entry
+            if _is_healthy(conn, last_used):
+                observe_pool_wait(time.perf_counter() - start)
+                return conn
+            # Stale after a database restart or network drop - discard it
+            try:
+                conn.close()
+            except psycopg2.Error:
+                pass
+    except Exception:
+        _slots.release()
+        raise
+
+
+def _release(conn):
+    """Return a connection to the pool, rolling back any open transaction"""
+    try:
+        if not conn.closed:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                conn.close()
+            elif status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+
+        if not conn.closed:
+            with _lock:
+                keep = _started
+                if keep:
+                    _idle.append((conn, time.monotonic()))
+            if not keep:
+                conn.close()
+    except psycopg2.Error:
+        conn.close()
+    finally:
+        _slots.release()
+
+
+@contextmanager
+def get_connection():
+    """
+    Borrow a pooled connection for the duration of a with-block
+
+    Uncommitted work is rolled back when the connection is returned.
+    """
+    conn = _checkout()
+    try:
+        yield conn
+    finally:
+        _release(conn)
+
+
+@contextmanager
+def get_cursor(commit=False):
+    """
+    Borrow a pooled connection and yield a RealDictCursor on it
+
+    - commit: commit the transaction when the block exits without error
+    """
+    if embedded.EMBEDDED_DB_PATH:
+        if commit:
+            raise PermissionError("The embedded database is read-only")
+        cursor = TimedEmbeddedCursor(embedded.connection())
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+        return
+
+    with get_connection() as conn:
+        cursor = conn.cursor(cursor_factory=TimedCursor)
+        try:
+            yield cursor
+            if commit:
+                conn.commit()
+        finally:
+            cursor.close()
+
+
+def query_all(query, params=None, label='query_all'):
+    """Run a query on a pooled connection and return every row as a dict"""
+    with get_cursor() as cursor:
+        cursor.label = label
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+
+def query_one(query, params=None, label='query_one'):
+    """Run a query on a pooled connection and return the first row (or None)"""
+    with get_cursor() as cursor:
+        cursor.label = label
+        cursor.execute(query, params)
+        return cursor.fetchone()
+
+
+def _get_executor():
+    """Lazily create the executor used to offload blocking database work"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            # One worker per pooled connection - extra workers would only
+            # queue on the pool semaphore
+            _executor = ThreadPoolExecutor(max_workers=DB_POOL_MAX, thread_name_prefix='db')
+        return _executor
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Run blocking database code without stalling the event loop
+
+    func is called on the bounded database executor; independent calls
+    awaited together (e.g. with asyncio.gather) run concurrently.
+    """
+    loop = asyncio.get_running_loop()
+    if profiling.active:
+        func = profiling.traced(func)
+    # Carry the caller's context into the worker so shared_lookups() apply
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+async def fetch_all(query, params=None, label='fetch_all'):
+    """Async variant of query_all(); label names the statement in /metrics"""
+    return await run_db(query_all, query, params, label)
+
+
+async def fetch_one(query, params=None, label='fetch_one'):
+    """Async variant of query_one(); label names the statement in /metrics"""
+    return await run_db(query_one, query, params, label)
+
+
+@contextmanager
+def shared_lookups():
+    """
+    Share lookups between handlers composed into one response
+
+    Inside the block, shared_lookup() runs each loader once per key and
+    hands the same result to every caller, including work offloaded with
+    run_db() from this context.
+    """
+    token = _shared.set({'lock': threading.Lock(), 'results': {}})
+    try:
+        yield
+    finally:
+        _shared.reset(token)
+
+
+def shared_lookup(key, loader):
+    """Return loader() - memoized per key when inside shared_lookups()"""
+    memo = _shared.get()
+    if memo is None:
+        return loader()
+
+    with memo['lock']:
+        future = memo['results'].get(key)
+        owner = future is None
+        if owner:
+            future = memo['results'][key] = Future()
+
+    if owner:
+        try:
+            future.set_result(loader())
+        except Exception as e:
+            future.set_exception(e)
+    return future.result()
@@ -0,0 +1,37 @@
+-- Latest stream snapshot
+-- Holds the rows of the most recent scrape only, so "current state" reads
+-- are O(#streams) instead of re-deriving
+-- WHERE timestamp = (SELECT MAX(timestamp) FROM stream_data) on every request.
+-- scraper.py rewrites it in the same transaction that inserts new stream_data rows.
+
+CREATE TABLE IF NOT EXISTS stream_data_latest (
+    stream_name TEXT PRIMARY KEY,
+    stream_data_id INTEGER NOT NULL,
+    timestamp TIMESTAMP NOT NULL,
+    stream_type TEXT NOT NULL,
+    parent_stream TEXT,
+    nomination_allocation INTEGER,
+    nominations_issued INTEGER,
+    nomination_spaces_remaining INTEGER,
+    applications_to_process INTEGER,
+    processing_date TEXT,
+    last_updated TEXT
+);
+
+-- Backfill from history (safe to re-run: always resets to the latest scrape)
+DELETE FROM stream_data_latest;
+
+INSERT INTO stream_data_latest (
+    stream_name, stream_data_id, timestamp, stream_type, parent_stream,
+    nomination_allocation, nominations_issued, nomination_spaces_remaining,
+    applications_to_process, processing_date, last_updated
+)
+SELECT
+    stream_name, id, timestamp, stream_type, parent_stream,
+    nomination_allocation, nominations_issued, nomination_spaces_remaining,
+    applications_to_process, processing_date, last_updated
+FROM stream_data
+WHERE timestamp = (SELECT MAX(timestamp) FROM stream_data);
+
+COMMENT ON TABLE stream_data_latest IS 'Stream rows from the most recent scrape, maintained by scraper.py alongside stream_data';
+COMMENT ON COLUMN stream_data_latest.stream_data_id IS 'id of the source row in stream_data';
@@ -0,0 +1,26 @@
+-- Keyset pagination indexes
+-- Match the ORDER BY of the paged list endpoints (see backend/pagination.py)
+-- so "rows after cursor X" is a single index range scan whatever the depth.
+
+-- /api/summary: ORDER BY timestamp DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_aaip_summary_timestamp_id
+    ON aaip_summary(timestamp DESC, id DESC);
+
+-- /api/streams: ORDER BY timestamp DESC, stream_name, id DESC
+CREATE INDEX IF NOT EXISTS idx_stream_data_page
+    ON stream_data(timestamp DESC, stream_name, id DESC);
+CREATE INDEX IF NOT EXISTS idx_stream_data_type_page
+    ON stream_data(stream_type, timestamp DESC, stream_name, id DESC);
+
+-- /api/draws: ORDER BY draw_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_draws_date_id
+    ON aaip_draws(draw_date DESC, id DESC);
+
+-- /api/news: ORDER BY published_date DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_aaip_news_published_id
+    ON aaip_news(published_date DESC, id DESC);
+
+-- /api/success-stories: approved stories by approval time
+CREATE INDEX IF NOT EXISTS idx_success_stories_approved_page
+    ON success_stories((COALESCE(approved_at, created_at)) DESC, id DESC)
+    WHERE status = 'approved';
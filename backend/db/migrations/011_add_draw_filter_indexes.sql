@@ -0,0 +1,16 @@
+-- Draw filter indexes
+-- Support the conditions compiled by backend/draw_filters.py:
+-- stream_category / COALESCE(stream_detail, '') equality plus a draw_date range.
+-- idx_draws_category_date (stream_category, draw_date DESC) and
+-- idx_draws_date_id (draw_date DESC, id DESC) cover category-only and
+-- date-only filters.
+
+-- Category + detail (including "General" = ''), ordered by date for paging
+CREATE INDEX IF NOT EXISTS idx_draws_category_detail_date
+    ON aaip_draws(stream_category, (COALESCE(stream_detail, '')), draw_date DESC, id DESC);
+
+-- Detail without a category filter
+CREATE INDEX IF NOT EXISTS idx_draws_detail_date
+    ON aaip_draws((COALESCE(stream_detail, '')), draw_date DESC, id DESC);
+
+ANALYZE aaip_draws;
@@ -0,0 +1,28 @@
+-- Precomputed smart insights
+-- Written by scraper/insights_generator.py after every scrape instead of
+-- being recomputed by /api/insights/weekly on each request.
+-- An insight is current while valid_to IS NULL; when a later run no longer
+-- produces it, valid_to is set, which keeps the full history queryable.
+
+CREATE TABLE IF NOT EXISTS insights (
+    id SERIAL PRIMARY KEY,
+    insight_type VARCHAR(20) NOT NULL,      -- 'warning', 'opportunity', 'positive', 'info'
+    title TEXT NOT NULL,
+    detail TEXT NOT NULL,
+    action TEXT,
+    reasoning TEXT,
+    priority SMALLINT NOT NULL,             -- display order by type
+    position SMALLINT NOT NULL,             -- order within the latest run
+    generated_at TIMESTAMP NOT NULL,        -- latest run that produced it
+    valid_from TIMESTAMP NOT NULL,
+    valid_to TIMESTAMP
+);
+
+-- /api/insights/weekly: the open rows in display order
+CREATE INDEX IF NOT EXISTS idx_insights_current
+    ON insights(priority, position) WHERE valid_to IS NULL;
+
+-- /api/insights/history
+CREATE INDEX IF NOT EXISTS idx_insights_valid_from ON insights(valid_from DESC, id DESC);
+
+COMMENT ON TABLE insights IS 'Smart insights generated at ingest time, with validity windows';
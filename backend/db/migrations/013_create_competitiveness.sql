@@ -0,0 +1,127 @@
+-- Stream competitiveness scoring
+-- One set-based query scores every main stream (previously one eoi_pool
+-- lookup per stream in Python), and a history table keeps a score series
+-- per scrape for /api/tools/competitiveness/history.
+--
+-- Score = 50
+--   + quota usage:  > 90% +25, > 75% +15, > 50% +5, otherwise -10
+--   + backlog:      > 500 applications +15, > 200 +5
+--   + EOI pool:     > 300 candidates +20, > 150 +10, > 50 +5
+-- clamped to 0..100. Level: >= 80 Very High, >= 65 High, >= 50 Medium, else Low.
+
+CREATE OR REPLACE VIEW stream_competitiveness AS
+WITH inputs AS (
+    SELECT
+        s.stream_name,
+        s.timestamp as stream_timestamp,
+        s.applications_to_process as backlog,
+        CASE
+            WHEN s.nomination_allocation > 0
+            -- float8 so percentages truncate exactly like the API always showed them
+            THEN COALESCE(s.nominations_issued, 0)::float8 / s.nomination_allocation
+        END as usage_rate,
+        e.candidate_count as pool_size,
+        e.timestamp as eoi_timestamp
+    FROM stream_data_latest s
+    LEFT JOIN LATERAL (
+        SELECT candidate_count, timestamp
+        FROM eoi_pool
+        WHERE eoi_pool.stream_name = s.stream_name
+        ORDER BY timestamp DESC
+        LIMIT 1
+    ) e ON TRUE
+    WHERE s.stream_type = 'main'
+),
+scored AS (
+    SELECT
+        *,
+        50
+        + CASE
+            WHEN usage_rate IS NULL THEN 0
+            WHEN usage_rate > 0.90 THEN 25
+            WHEN usage_rate > 0.75 THEN 15
+            WHEN usage_rate > 0.50 THEN 5
+            ELSE -10
+          END
+        + CASE
+            WHEN backlog > 500 THEN 15
+            WHEN backlog > 200 THEN 5
+            ELSE 0
+          END
+        + CASE
+            WHEN pool_size > 300 THEN 20
+            WHEN pool_size > 150 THEN 10
+            WHEN pool_size > 50 THEN 5
+            ELSE 0
+          END as raw_score
+    FROM inputs
+)
+SELECT
+    stream_name,
+    stream_timestamp,
+    eoi_timestamp,
+    LEAST(100, GREATEST(0, raw_score))::float8 as competitiveness_score,
+    CASE
+        WHEN raw_score >= 80 THEN 'Very High'
+        WHEN raw_score >= 65 THEN 'High'
+        WHEN raw_score >= 50 THEN 'Medium'
+        ELSE 'Low'
+    END as level,
+    json_strip_nulls(json_build_object(
+        'quota_usage', floor(usage_rate * 100)::int || '%',
+        'quota_pressure', CASE
+            WHEN usage_rate IS NULL THEN NULL
+            WHEN usage_rate > 0.90 THEN 'Critical - nearly exhausted'
+            WHEN usage_rate > 0.75 THEN 'High - limited spaces'
+            WHEN usage_rate > 0.50 THEN 'Moderate'
+            ELSE 'Low - ample spaces available'
+        END,
+        'backlog', CASE WHEN backlog <> 0 THEN backlog || ' applications' END,
+        'backlog_impact', CASE
+            WHEN backlog > 500 THEN 'High processing volume'
+            WHEN backlog > 200 THEN 'Moderate volume'
+        END,
+        'eoi_pool_size', pool_size || ' candidates',
+        'pool_pressure', CASE
+            WHEN pool_size > 300 THEN 'Very high competition'
+            WHEN pool_size > 150 THEN 'High competition'
+            WHEN pool_size > 50 THEN 'Moderate competition'
+        END
+    )) as factors
+FROM scored;
+
+-- Score series, one row per stream whenever its inputs change
+-- (written by scraper.py after each save)
+CREATE TABLE IF NOT EXISTS competitiveness_scores (
+    id SERIAL PRIMARY KEY,
+    stream_name TEXT NOT NULL,
+    stream_timestamp TIMESTAMP NOT NULL,
+    eoi_timestamp TIMESTAMP,
+    competitiveness_score REAL NOT NULL,
+    level VARCHAR(20) NOT NULL,
+    factors JSONB NOT NULL,
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Same inputs -> same score, so re-runs without new data insert nothing
+CREATE UNIQUE INDEX IF NOT EXISTS idx_competitiveness_inputs
+    ON competitiveness_scores(stream_name, stream_timestamp, COALESCE(eoi_timestamp, '-infinity'::timestamp));
+
+-- /api/tools/competitiveness/history filters and sorts on the data time of
+-- a score, GREATEST(stream_timestamp, eoi_timestamp): newest first overall,
+-- and per stream. (Replaces idx_competitiveness_recorded, which no query used.)
+DROP INDEX IF EXISTS idx_competitiveness_recorded;
+CREATE INDEX IF NOT EXISTS idx_competitiveness_data_time
+    ON competitiveness_scores((GREATEST(stream_timestamp, eoi_timestamp)) DESC, stream_name);
+CREATE INDEX IF NOT EXISTS idx_competitiveness_stream_data_time
+    ON competitiveness_scores(stream_name, (GREATEST(stream_timestamp, eoi_timestamp)) DESC);
+
+-- Seed the series with the current scores
+INSERT INTO competitiveness_scores
+    (stream_name, stream_timestamp, eoi_timestamp, competitiveness_score, level, factors)
+SELECT stream_name, stream_timestamp, eoi_timestamp, competitiveness_score, level, factors::jsonb
+FROM stream_competitiveness
+ON CONFLICT (stream_name, stream_timestamp, COALESCE(eoi_timestamp, '-infinity'::timestamp)) DO NOTHING;
+
+COMMENT ON VIEW stream_competitiveness IS 'Current competitiveness score of every main stream';
+COMMENT ON TABLE competitiveness_scores IS 'Competitiveness score history, one row per stream and input change';
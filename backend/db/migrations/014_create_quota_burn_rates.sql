@@ -0,0 +1,145 @@
+-- Quota burn rates
+-- Nominations issued per day over the last 7, 30 and 90 days for every main
+-- stream, with a confidence band. Previously /api/tools/quota-calculator
+-- looked up a 30-samples-old row per stream (LATERAL ... OFFSET 29) on every
+-- request; now scraper.py refreshes quota_burn_rates from the
+-- quota_burn_rate_estimates view in the same transaction that inserts new
+-- stream_data rows, and the calculator only reads the stored rates.
+--
+-- For each window the rate is the nominations issued between the sample at
+-- (or last before) the window start and the latest sample, divided by the
+-- days between them. The band is rate +/- 1.96 standard errors of the
+-- per-interval rates (between consecutive samples), weighted by interval
+-- length; the effective sample size accounts for uneven scrape spacing.
+-- Drops in nominations_issued (allocation year reset) count as 0 issued.
+
+CREATE OR REPLACE VIEW quota_burn_rate_estimates AS
+WITH windows(window_days) AS (
+    VALUES (7), (30), (90)
+),
+latest AS (
+    SELECT stream_name, timestamp
+    FROM stream_data_latest
+    WHERE stream_type = 'main'
+),
+-- Start from the last sample at or before the window start so the whole
+-- window is covered (or from the first sample if history is shorter).
+-- Looked up once per stream and window: as a condition inside the samples
+-- lookup it was re-run for every history row scanned.
+starts AS MATERIALIZED (
+    SELECT
+        l.stream_name,
+        w.window_days,
+        l.timestamp as latest_timestamp,
+        COALESCE((
+            SELECT MAX(p.timestamp)
+            FROM stream_data p
+            WHERE p.stream_name = l.stream_name
+            AND p.stream_type = 'main'
+            AND p.timestamp <= l.timestamp - make_interval(days => w.window_days)
+        ), '-infinity'::timestamp) as start_timestamp
+    FROM latest l
+    CROSS JOIN windows w
+),
+samples AS (
+    SELECT s.stream_name, s.window_days, d.timestamp, d.nominations_issued
+    FROM starts s
+    JOIN LATERAL (
+        SELECT timestamp, nominations_issued
+        FROM stream_data
+        WHERE stream_data.stream_name = s.stream_name
+        AND stream_data.stream_type = 'main'
+        AND stream_data.timestamp <= s.latest_timestamp
+        AND stream_data.timestamp >= s.start_timestamp
+    ) d ON TRUE
+),
+intervals AS (
+    SELECT
+        stream_name,
+        window_days,
+        timestamp,
+        LAG(timestamp) OVER w as previous_timestamp,
+        GREATEST(nominations_issued - LAG(nominations_issued) OVER w, 0)::float8 as issued,
+        EXTRACT(EPOCH FROM (timestamp - LAG(timestamp) OVER w))::float8 / 86400 as days
+    FROM samples
+    WINDOW w AS (PARTITION BY stream_name, window_days ORDER BY timestamp)
+),
+totals AS (
+    SELECT
+        stream_name,
+        window_days,
+        MIN(previous_timestamp) as window_start,
+        MAX(timestamp) as window_end,
+        COUNT(*) + 1 as samples,
+        SUM(issued) as issued,
+        SUM(days) as days,
+        SUM(issued * issued / days) as weighted_sq_rates,
+        SUM(days) * SUM(days) / SUM(days * days) as effective_intervals
+    FROM intervals
+    WHERE days > 0
+    GROUP BY stream_name, window_days
+),
+rates AS (
+    SELECT
+        *,
+        issued / days as rate_per_day,
+        -- Weighted variance of the interval rates: E[r^2] - E[r]^2
+        GREATEST(weighted_sq_rates / days - (issued / days) ^ 2, 0) as rate_variance
+    FROM totals
+)
+SELECT
+    stream_name,
+    window_days,
+    rate_per_day,
+    -- A single interval says nothing about the spread, so no band
+    CASE WHEN samples > 2
+        THEN GREATEST(rate_per_day - 1.96 * sqrt(rate_variance / effective_intervals), 0)
+    END as rate_low,
+    CASE WHEN samples > 2
+        THEN rate_per_day + 1.96 * sqrt(rate_variance / effective_intervals)
+    END as rate_high,
+    issued::int as nominations_issued,
+    days as days_covered,
+    samples::int as samples,
+    window_start,
+    window_end
+FROM rates;
+
+CREATE TABLE IF NOT EXISTS quota_burn_rates (
+    stream_name TEXT NOT NULL,
+    window_days INTEGER NOT NULL,
+    rate_per_day DOUBLE PRECISION NOT NULL,
+    rate_low DOUBLE PRECISION,
+    rate_high DOUBLE PRECISION,
+    nominations_issued INTEGER NOT NULL,
+    days_covered DOUBLE PRECISION NOT NULL,
+    samples INTEGER NOT NULL,
+    window_start TIMESTAMP NOT NULL,
+    window_end TIMESTAMP NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (stream_name, window_days)
+);
+
+-- Backfill from history (safe to re-run)
+INSERT INTO quota_burn_rates
+    (stream_name, window_days, rate_per_day, rate_low, rate_high,
+     nominations_issued, days_covered, samples, window_start, window_end)
+SELECT stream_name, window_days, rate_per_day, rate_low, rate_high,
+       nominations_issued, days_covered, samples, window_start, window_end
+FROM quota_burn_rate_estimates
+ON CONFLICT (stream_name, window_days) DO UPDATE SET
+    rate_per_day = EXCLUDED.rate_per_day,
+    rate_low = EXCLUDED.rate_low,
+    rate_high = EXCLUDED.rate_high,
+    nominations_issued = EXCLUDED.nominations_issued,
+    days_covered = EXCLUDED.days_covered,
+    samples = EXCLUDED.samples,
+    window_start = EXCLUDED.window_start,
+    window_end = EXCLUDED.window_end,
+    updated_at = CURRENT_TIMESTAMP;
+
+COMMENT ON VIEW quota_burn_rate_estimates IS 'Burn rates computed from stream_data history; read only when refreshing quota_burn_rates';
+COMMENT ON TABLE quota_burn_rates IS 'Nominations issued per day per main stream and window, maintained by scraper.py alongside stream_data';
+COMMENT ON COLUMN quota_burn_rates.nominations_issued IS 'Nominations issued within the window';
+COMMENT ON COLUMN quota_burn_rates.rate_low IS '95% band lower bound; NULL with fewer than three samples';
+COMMENT ON COLUMN quota_burn_rates.days_covered IS 'Days between the first and last sample used (less than window_days for short histories)';
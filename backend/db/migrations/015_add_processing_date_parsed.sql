@@ -0,0 +1,59 @@
+-- Typed processing date
+-- stream_data.processing_date is free text like "March 3, 2025 (for applications)".
+-- The processing timeline re-parsed it on every request and cast it with
+-- processing_date::date, which fails on such text. scraper.py now stores the
+-- parsed date alongside the text; this backfills the existing history with the
+-- same rule: the "Month D, YYYY" date before any "(" or " for", else NULL.
+
+ALTER TABLE stream_data ADD COLUMN IF NOT EXISTS processing_date_parsed DATE;
+ALTER TABLE stream_data_latest ADD COLUMN IF NOT EXISTS processing_date_parsed DATE;
+
+-- Each distinct text is parsed once into a lookup table, then applied in a
+-- single UPDATE (an UPDATE per text re-scanned stream_data for every value).
+-- Unparseable values (unknown month name, day out of range) are left NULL
+-- instead of failing the migration.
+CREATE TEMP TABLE processing_date_texts (
+    value TEXT PRIMARY KEY,
+    parsed DATE
+);
+
+DO $$
+DECLARE
+    value TEXT;
+BEGIN
+    FOR value IN
+        SELECT DISTINCT processing_date
+        FROM stream_data
+        WHERE processing_date IS NOT NULL
+        AND processing_date_parsed IS NULL
+    LOOP
+        BEGIN
+            INSERT INTO processing_date_texts (value, parsed)
+            VALUES (value, to_date(
+                substring(
+                    split_part(split_part(value, '(', 1), ' for', 1)
+                    from '[A-Z][a-z]+\s+\d{1,2},\s+\d{4}'
+                ),
+                'FMMonth FMDD, YYYY'
+            ));
+        EXCEPTION WHEN invalid_datetime_format OR datetime_field_overflow THEN
+            RAISE NOTICE 'Unparseable processing_date: %', value;
+        END;
+    END LOOP;
+END $$;
+
+UPDATE stream_data s
+SET processing_date_parsed = t.parsed
+FROM processing_date_texts t
+WHERE s.processing_date = t.value
+AND s.processing_date_parsed IS NULL
+AND t.parsed IS NOT NULL;
+
+DROP TABLE processing_date_texts;
+
+UPDATE stream_data_latest l
+SET processing_date_parsed = s.processing_date_parsed
+FROM stream_data s
+WHERE s.id = l.stream_data_id;
+
+COMMENT ON COLUMN stream_data.processing_date_parsed IS 'processing_date as a DATE, NULL when the text holds no "Month D, YYYY" date';
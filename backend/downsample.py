@@ -0,0 +1,109 @@
+"""
+Time Series Downsampling
+Largest-Triangle-Three-Buckets (LTTB) for chart endpoints
+
+Charts only need as many points as they have pixels, so long histories are
+reduced on the server to at most max_points rows that keep the visual shape
+(peaks, drops, plateaus) instead of a fixed LIMIT that silently cuts the
+oldest data off.
+
+LTTB keeps the first and last points and, for every bucket in between,
+the point forming the largest triangle with the point kept from the
+previous bucket and the average of the next bucket. Rows with several
+series (allocation, issued, remaining, ...) are scored on the sum of the
+per-series areas, each series scaled to [0, 1], so one row selection
+serves every line of the chart.
+"""
+
+import warnings
+
+import numpy as np
+
+# Bounds for the max_points query parameter
+MIN_POINTS = 3
+MAX_POINTS = 5000
+
+
+def lttb_indices(x, y, max_points):
+    """
+    Indices of the points LTTB keeps, in ascending order
+
+    - x: 1-D array, sorted (either direction)
+    - y: 2-D array (points x series), NaN for missing values
+    """
+    n = len(x)
+    if max_points >= n or n <= 2:
+        return np.arange(n)
+
+    # Scale every series to [0, 1] so no single one dominates the area
+    with warnings.catch_warnings():
+        # All-NULL series give NaN bounds; they are neutralized below
+        warnings.simplefilter('ignore', RuntimeWarning)
+        low = np.nanmin(y, axis=0)
+        span = np.nanmax(y, axis=0) - low
+    span[~np.isfinite(span) | (span == 0)] = 1.0
+    y = np.nan_to_num((y - low) / span)
+    x = (x - x[0]) / ((x[-1] - x[0]) or 1.0)
+
+    # Bucket edges for the n - 2 interior points
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+
+    # Next-bucket averages, computed for all buckets at once via prefix sums
+    x_sums = np.concatenate(([0.0], np.cumsum(x)))
+    y_sums = np.vstack((np.zeros(y.shape[1]), np.cumsum(y, axis=0)))
+    next_start = edges[1:]
+    next_end = np.append(edges[2:], n)
+    counts = (next_end - next_start)[:, None]
+    avg_x = (x_sums[next_end] - x_sums[next_start]) / counts[:, 0]
+    avg_y = (y_sums[next_end] - y_sums[next_start]) / counts
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        bx = x[start:end]
+        by = y[start:end]
+        # Twice the triangle area per series, summed over series
+        areas = np.abs(
+            (x[a] - avg_x[bucket]) * (by - y[a])
+            - (x[a] - bx)[:, None] * (avg_y[bucket] - y[a])
+        ).sum(axis=1)
+        a = start + int(np.argmax(areas))
+        selected[bucket + 1] = a
+
+    return selected
+
+
+def downsample_rows(rows, max_points, x_key, y_keys):
+    """
+    Reduce rows (sorted by x_key) to at most max_points rows
+
+    - x_key: timestamp/date column used as the x axis (ascending or descending)
+    - y_keys: numeric columns whose shape should be preserved
+    """
+    if not max_points or len(rows) <= max_points:
+        return rows
+
+    x = np.array([row[x_key].timestamp() if hasattr(row[x_key], 'timestamp') else row[x_key].toordinal() * 86400.0
+                  for row in rows], dtype=float)
+    y = np.array([[np.nan if row[key] is None else float(row[key]) for key in y_keys] for row in rows], dtype=float)
+
+    return [rows[i] for i in lttb_indices(x, y, max_points)]
+
+
+def downsample_groups(rows, max_points, group_key, x_key, y_keys):
+    """downsample_rows() applied to each group_key group separately (rows sorted by group, then x)"""
+    if not max_points:
+        return rows
+
+    result = []
+    group = []
+    for row in rows:
+        if group and row[group_key] != group[0][group_key]:
+            result.extend(downsample_rows(group, max_points, x_key, y_keys))
+            group = []
+        group.append(row)
+    result.extend(downsample_rows(group, max_points, x_key, y_keys))
+    return result
@@ -0,0 +1,68 @@
+"""
+Draw Filter Compiler
+Shared WHERE clause for the /api/draws endpoints
+
+Every condition is written so it can be answered from an aaip_draws index:
+- year becomes a half-open draw_date range instead of
+  EXTRACT(YEAR FROM draw_date), which hides the column from the planner
+- stream_detail is compared through COALESCE(stream_detail, ''), the same
+  normalized form the unique index uses, so "General" (stored as NULL or '')
+  is a plain equality on '' rather than an IS NULL OR = '' disjunction
+
+The matching indexes live in backend/db/migrations/011_add_draw_filter_indexes.sql
+and scripts/check_draw_query_plans.py verifies the plans.
+"""
+
+from datetime import date
+
+# Label the frontend shows for draws without a stream detail
+GENERAL_DETAIL = 'General'
+
+# Normalized stream_detail expression, identical to the index definitions
+DETAIL_EXPRESSION = "COALESCE(stream_detail, '')"
+
+
+def year_range(year):
+    """Half-open [Jan 1, Jan 1 next year) bounds for a year, or None if out of range"""
+    try:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    except (OverflowError, ValueError):
+        return None
+
+
+def draw_filter(stream_category=None, stream_detail=None, year=None, start_date=None, end_date=None):
+    """
+    Compile draw filters into (where_sql, params)
+
+    where_sql is always a valid condition ('TRUE' when nothing is filtered),
+    so callers can write WHERE {where_sql} and append more conditions.
+    """
+    conditions = []
+    params = []
+
+    if stream_category:
+        conditions.append("stream_category = %s")
+        params.append(stream_category)
+
+    if stream_detail:
+        # "General" is displayed in frontend but stored as NULL (or '') in DB
+        conditions.append(f"{DETAIL_EXPRESSION} = %s")
+        params.append('' if stream_detail == GENERAL_DETAIL else stream_detail)
+
+    if year:
+        bounds = year_range(year)
+        if bounds is None:
+            conditions.append("FALSE")
+        else:
+            conditions.append("draw_date >= %s AND draw_date < %s")
+            params.extend(bounds)
+
+    if start_date:
+        conditions.append("draw_date >= %s")
+        params.append(start_date)
+
+    if end_date:
+        conditions.append("draw_date <= %s")
+        params.append(end_date)
+
+    return ' AND '.join(conditions) or 'TRUE', params
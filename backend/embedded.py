@@ -0,0 +1,261 @@
+"""
+Embedded Read-Only Mode
+Serve the read endpoints from an exported SQLite file instead of PostgreSQL
+
+export_embedded.py writes the public tables (and views, as tables holding
+their rows at export time) to one SQLite file after each scrape. With
+EMBEDDED_DB_PATH set, database.get_cursor() hands out cursors on that file
+instead of pooled PostgreSQL connections, so an edge or replica node needs
+no database server and no network round trip per query; scaling out is
+copying the file.
+
+The file is opened read-only and immutable, one connection per thread. A
+new export is installed by renaming it over the old file; every
+EMBEDDED_CHECK_INTERVAL seconds the file's identity is compared and threads
+reopen on their next query, while statements already running finish on the
+old file.
+
+Endpoint SQL stays shared between both backends. The cursor:
+- translates the psycopg2 paramstyle (%s, %%) to SQLite's (?, %), and
+  ILIKE to LIKE (SQLite's LIKE ignores ASCII case)
+- returns rows as dicts with the Python types psycopg2 returns: dates,
+  timestamps, booleans and JSON are decoded from the declared column
+  types; date/timestamp values computed by expressions (MAX(draw_date))
+  carry no declared type and are recognized by their ISO format
+- stores and compares timestamps as ISO strings, so a bare date bound such
+  as timestamp <= '2025-01-31' excludes that day's midnight row
+
+Only routes in EMBEDDED_ROUTES have SQL that runs on both backends and
+were checked to return the same body; every other /api route answers 503
+on an embedded node, as do all writes.
+
+Configuration (environment variables):
+- EMBEDDED_DB_PATH: SQLite file to serve from; unset serves from PostgreSQL (default unset)
+- EMBEDDED_CHECK_INTERVAL: seconds between checks for a replaced file (default 5)
+- EMBEDDED_MMAP_MB: memory-mapped I/O per connection in MB (default 256)
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+
+from metrics import match_route
+
+EMBEDDED_DB_PATH = os.getenv('EMBEDDED_DB_PATH', '')
+EMBEDDED_CHECK_INTERVAL = float(os.getenv('EMBEDDED_CHECK_INTERVAL', '5'))
+EMBEDDED_MMAP_MB = int(os.getenv('EMBEDDED_MMAP_MB', '256'))
+
+# Route templates served on an embedded node (see the module docstring).
+# Left out: endpoints using PostgreSQL-only SQL (INTERVAL arithmetic, ::
+# casts, DISTINCT ON, = ANY, GREATEST, STRING_AGG, date subtraction) and
+# the dashboard, which includes the EOI alerts
+EMBEDDED_ROUTES = frozenset({
+    '/api/stats',
+    '/api/summary',
+    '/api/summary/latest',
+    '/api/streams/list',
+    '/api/streams',
+    '/api/streams/{stream_name}',
+    '/api/logs',
+    '/api/draws',
+    '/api/draws/streams',
+    '/api/draws/trends',
+    '/api/draws/stats',
+    '/api/eoi/latest',
+    '/api/insights/weekly',
+    '/api/insights/history',
+    '/api/tools/competitiveness',
+    '/api/labor-market/quarterly',
+    '/api/express-entry/comparison',
+    '/api/trends/analysis',
+    '/api/news',
+    '/api/news/latest',
+    '/api/success-stories',
+})
+
+# Non-query routes that work the same on an embedded node
+DIAGNOSTIC_ROUTES = frozenset({'/api/cache/stats', '/api/admin/slow-queries'})
+
+# Column types written by export_embedded.py; the first word selects the
+# converter below, the rest gives SQLite the storage affinity
+TIMESTAMP_TYPE = 'TIMESTAMP TEXT'
+DATE_TYPE = 'DATE TEXT'
+BOOLEAN_TYPE = 'BOOLEAN INTEGER'
+JSON_TYPE = 'JSON TEXT'
+
+# Table of every exported column and its PostgreSQL type
+COLUMNS_TABLE = '_embedded_columns'
+EXPORT_TABLE = '_embedded_export'
+
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+ISO_TIMESTAMP = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d{1,6})?([+-]\d{2}:\d{2})?$')
+SPACE_TIMESTAMP = re.compile(r'^(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2})')
+PLACEHOLDER = re.compile(r'%%|%s|\bILIKE\b', re.IGNORECASE)
+
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+sqlite3.register_converter('BOOLEAN', lambda value: value != b'0')
+sqlite3.register_converter('JSON', lambda value: json.loads(value))
+# Parameters are bound in the stored format
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_adapter(date, date.isoformat)
+
+_local = threading.local()
+_lock = threading.Lock()
+_file = {'identity': None, 'generation': 0, 'checked_at': 0.0, 'text_columns': frozenset()}
+_translated = {}
+
+
+def translate(query):
+    """psycopg2 SQL -> SQLite SQL (cached per statement text)"""
+    sql = _translated.get(query)
+    if sql is None:
+        sql = PLACEHOLDER.sub(lambda m: {'%%': '%', '%s': '?'}.get(m.group(0).lower(), 'LIKE'), query)
+        _translated[query] = sql
+    return sql
+
+
+def _bind(value):
+    # Clients send '2025-01-01 10:00'; stored timestamps use 'T'
+    if isinstance(value, str):
+        return SPACE_TIMESTAMP.sub(r'\1T\2', value)
+    return value
+
+
+def _file_identity():
+    stat = os.stat(EMBEDDED_DB_PATH)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _check_file():
+    """Bump the generation when the file was replaced; rate limited"""
+    now = time.monotonic()
+    if now - _file['checked_at'] < EMBEDDED_CHECK_INTERVAL:
+        return
+    with _lock:
+        if now - _file['checked_at'] < EMBEDDED_CHECK_INTERVAL:
+            return
+        identity = _file_identity()
+        if identity != _file['identity']:
+            if _file['identity'] is not None:
+                print(f"✓ Embedded database {EMBEDDED_DB_PATH} was replaced, reopening")
+            _file['identity'] = identity
+            _file['generation'] += 1
+            _file['text_columns'] = _load_text_columns()
+        _file['checked_at'] = now
+
+
+def _open():
+    conn = sqlite3.connect(
+        f"file:{EMBEDDED_DB_PATH}?mode=ro&immutable=1", uri=True, detect_types=sqlite3.PARSE_DECLTYPES
+    )
+    conn.execute(f"PRAGMA mmap_size = {EMBEDDED_MMAP_MB * 1024 * 1024}")
+    return conn
+
+
+def _load_text_columns():
+    """
+    Names of text columns, whose date-like values must stay strings
+
+    Result columns only carry their name, so a name that is text in one
+    table and a date in another is decoded as a date.
+    """
+    conn = _open()
+    try:
+        rows = conn.execute(
+            f"SELECT column_name FROM {COLUMNS_TABLE} GROUP BY column_name HAVING MIN(sqlite_type = 'TEXT') = 1"
+        ).fetchall()
+    finally:
+        conn.close()
+    return frozenset(name for name, in rows)
+
+
+def connection():
+    """This thread's connection to the current file"""
+    _check_file()
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.generation != _file['generation']:
+        if conn is not None:
+            conn.close()
+        _local.conn = conn = _open()
+        _local.generation = _file['generation']
+    return conn
+
+
+def _convert(value, text_column):
+    if isinstance(value, str) and not text_column:
+        if ISO_DATE.match(value):
+            return date.fromisoformat(value)
+        if ISO_TIMESTAMP.match(value):
+            return datetime.fromisoformat(value)
+    return value
+
+
+class EmbeddedCursor:
+    """The part of the psycopg2 RealDictCursor API the endpoints use, on SQLite"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+        self._columns = None
+        # psycopg2 exposes the statement it sent; EXPLAIN of it only works on PostgreSQL
+        self.query = None
+        self.rowcount = -1
+
+    def execute(self, query, vars=None):
+        params = [_bind(value) for value in vars] if vars else ()
+        self._cursor.execute(translate(query), params)
+        text_columns = _file['text_columns']
+        description = self._cursor.description or ()
+        self._columns = [(column[0], column[0] in text_columns) for column in description]
+        self.rowcount = self._cursor.rowcount
+
+    def _row(self, values):
+        return {name: _convert(value, text) for (name, text), value in zip(self._columns, values)}
+
+    def fetchone(self):
+        values = self._cursor.fetchone()
+        return None if values is None else self._row(values)
+
+    def fetchall(self):
+        return [self._row(values) for values in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cursor.close()
+
+
+class EmbeddedModeMiddleware:
+    """
+    ASGI middleware answering 503 for API routes an embedded node cannot serve
+
+    - routes: the application's route list, to find the route template
+    """
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith('/api/'):
+            await self.app(scope, receive, send)
+            return
+
+        route = match_route(self.routes, scope)
+        template = getattr(route, 'path', None)
+        if scope['method'] == 'GET' and (template in EMBEDDED_ROUTES or template in DIAGNOSTIC_ROUTES):
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "Not available on this read-only replica"}).encode('utf-8')
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode('latin-1'))]
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,230 @@
+"""
+Live Scrape Events
+Server-Sent Events fan-out for /api/events
+
+scraper.py sends pg_notify('aaip_events', <json>) in the transaction that
+saves a scrape, so the notification is delivered only once the data is
+committed. Each API worker keeps one LISTEN connection and hands every
+notification to the hub, which fans it out to all open /api/events streams.
+
+Idle subscribers are cheap: there is no per-subscriber queue or timer. The
+hub keeps the last EVENTS_BACKLOG events in a ring and every subscriber
+awaits the same shared future, which is resolved when an event arrives or
+the hub-wide heartbeat ticks. A woken subscriber sends whatever is newer
+than the last event id it delivered, or a keep-alive comment.
+
+Reconnecting clients send Last-Event-ID and get the events they missed
+replayed from the ring; if they fell further behind than the ring reaches,
+a "resync" event tells them to reload everything.
+
+Configuration (environment variables):
+- EVENTS_CHANNEL: Postgres NOTIFY channel (default aaip_events)
+- EVENTS_HEARTBEAT: seconds between keep-alive comments (default 15)
+- EVENTS_BACKLOG: events kept for Last-Event-ID replay (default 100)
+- EVENTS_MAX_SUBSCRIBERS: open streams per worker, 0 for no limit (default 10000)
+- EVENTS_RECONNECT_DELAY: seconds before re-opening a lost LISTEN connection (default 5)
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+
+import psycopg2
+from psycopg2 import extensions
+
+from database import dedicated_connection
+
+EVENTS_CHANNEL = os.getenv('EVENTS_CHANNEL', 'aaip_events')
+EVENTS_HEARTBEAT = float(os.getenv('EVENTS_HEARTBEAT', '15'))
+EVENTS_BACKLOG = int(os.getenv('EVENTS_BACKLOG', '100'))
+EVENTS_MAX_SUBSCRIBERS = int(os.getenv('EVENTS_MAX_SUBSCRIBERS', '10000'))
+EVENTS_RECONNECT_DELAY = float(os.getenv('EVENTS_RECONNECT_DELAY', '5'))
+
+# Client reconnect delay advertised in the stream (milliseconds)
+RETRY_MS = 5000
+
+
+def format_event(event_id, name, data):
+    """One SSE frame; data is a single-line JSON string"""
+    return f"id: {event_id}\nevent: {name}\ndata: {data}\n\n"
+
+
+class EventHub:
+    """Ring of recent events plus one shared wake-up future for every subscriber"""
+
+    def __init__(self, backlog=EVENTS_BACKLOG, heartbeat=EVENTS_HEARTBEAT):
+        self.heartbeat = heartbeat
+        self._events = deque(maxlen=backlog)  # (id, name, data)
+        self._last_id = 0
+        self._wake = None
+        self._heartbeat_task = None
+        self._closed = False
+
+        self.subscribers = 0
+        self.published = 0
+
+    def start(self):
+        """Start the heartbeat; call from the running event loop"""
+        self._closed = False
+        self._wake = asyncio.get_running_loop().create_future()
+        self._heartbeat_task = asyncio.ensure_future(self._tick())
+
+    async def stop(self):
+        """End every open stream and stop the heartbeat"""
+        self._closed = True
+        self._wake_all()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            try:
+                await self._heartbeat_task
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat_task = None
+
+    def publish(self, name, data):
+        """Append an event and wake every subscriber (event loop thread only)"""
+        self._last_id += 1
+        self._events.append((self._last_id, name, data))
+        self.published += 1
+        self._wake_all()
+
+    def is_full(self):
+        return 0 < EVENTS_MAX_SUBSCRIBERS <= self.subscribers
+
+    async def stream(self, last_event_id=None):
+        """Async generator of SSE frames for one subscriber"""
+        self.subscribers += 1
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+
+            last_id = self._last_id
+            if last_event_id is not None and last_event_id <= self._last_id:
+                oldest = self._events[0][0] if self._events else self._last_id + 1
+                if last_event_id < oldest - 1:
+                    yield format_event(self._last_id, 'resync', '{}')
+                else:
+                    last_id = last_event_id
+
+            while not self._closed:
+                # Take the future before yielding: events published while the
+                # frame is being sent resolve it and are picked up below
+                wake = self._wake
+                frames = [format_event(*event) for event in self._events if event[0] > last_id]
+                if frames:
+                    last_id = self._last_id
+                    yield ''.join(frames)
+                await wake
+                if not self._closed and not any(event[0] > last_id for event in self._events):
+                    yield ": ping\n\n"
+        finally:
+            self.subscribers -= 1
+
+    def stats(self):
+        return {
+            'subscribers': self.subscribers,
+            'published': self.published,
+            'last_event_id': self._last_id,
+            'backlog': len(self._events)
+        }
+
+    def _wake_all(self):
+        wake = self._wake
+        if wake is None:
+            return
+        self._wake = wake.get_loop().create_future() if not self._closed else wake
+        if not wake.done():
+            wake.set_result(None)
+
+    async def _tick(self):
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._wake_all()
+
+
+class NotificationListener:
+    """
+    LISTEN on a dedicated connection and publish notifications to the hub
+
+    The socket is watched with loop.add_reader, so no thread is blocked
+    waiting. A lost connection is re-opened after EVENTS_RECONNECT_DELAY.
+    Event types listed in internal are handed to on_event only and not
+    sent to /api/events subscribers.
+    """
+
+    def __init__(self, hub, channel=EVENTS_CHANNEL, on_event=None, internal=()):
+        self.hub = hub
+        self.channel = channel
+        self.on_event = on_event
+        self.internal = frozenset(internal)
+        self._conn = None
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lost = loop.create_future()
+            try:
+                self._conn = await loop.run_in_executor(None, self._listen)
+                fd = self._conn.fileno()
+                loop.add_reader(fd, self._poll, lost)
+                print(f"✓ Listening for scrape events on '{self.channel}'")
+                try:
+                    await lost
+                finally:
+                    loop.remove_reader(fd)
+            except asyncio.CancelledError:
+                self._close()
+                raise
+            except Exception as e:
+                print(f"⚠️  Scrape event listener failed: {e}")
+            self._close()
+            await asyncio.sleep(EVENTS_RECONNECT_DELAY)
+
+    def _listen(self):
+        conn = dedicated_connection()
+        conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        cursor = conn.cursor()
+        cursor.execute(f"LISTEN {self.channel}")
+        cursor.close()
+        return conn
+
+    def _poll(self, lost):
+        try:
+            self._conn.poll()
+        except psycopg2.Error as e:
+            if not lost.done():
+                lost.set_exception(e)
+            return
+
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                name = json.loads(notify.payload).get('type', 'scrape')
+            except (ValueError, AttributeError):
+                print(f"⚠️  Ignoring malformed scrape event: {notify.payload[:100]}")
+                continue
+            if self.on_event is not None:
+                self.on_event(name, notify.payload)
+            if name not in self.internal:
+                self.hub.publish(name, notify.payload)
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except psycopg2.Error:
+                pass
+            self._conn = None
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Embedded Database Exporter
+Copy the PostgreSQL data the read endpoints need into one SQLite file
+
+Produces the file an embedded node serves from (EMBEDDED_DB_PATH, see
+embedded.py). Every table and view of the public schema is exported in one
+REPEATABLE READ snapshot; views become plain tables holding their rows at
+export time, so endpoints reading them need no view support. Columns get
+the SQLite types embedded.py decodes back to what psycopg2 returns.
+
+Indexes are recreated where PostgreSQL's definition is also valid SQLite
+(plain and expression keys, partial predicates) after stripping ::casts;
+the others are skipped with a note. A single integer primary key becomes
+the SQLite rowid.
+
+The file is built next to the target and renamed over it, so a serving
+node sees either the old or the new export. Distribute it to other nodes
+the same way (copy to a temporary name, then rename).
+
+Run by aaip-scraper.service after the collectors finish; can also be run
+on its own:
+    python export_embedded.py [--output FILE]
+
+Configuration (environment variables):
+- EMBEDDED_EXPORT_PATH: file to write (default /var/lib/aaip/aaip.sqlite3)
+- DATABASE_URL / DB_*: the PostgreSQL source, as for the API
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime, timezone
+
+import psycopg2
+
+from database import dedicated_connection
+from embedded import BOOLEAN_TYPE, COLUMNS_TABLE, DATE_TYPE, EXPORT_TABLE, JSON_TYPE, TIMESTAMP_TYPE
+
+EMBEDDED_EXPORT_PATH = os.getenv('EMBEDDED_EXPORT_PATH', '/var/lib/aaip/aaip.sqlite3')
+
+# Never leave the primary: voter IPs and submitter e-mail addresses
+EXCLUDED_TABLES = ('story_helpful_votes',)
+EXCLUDED_COLUMNS = {'success_stories': ('email',)}
+
+BATCH_ROWS = 5000
+
+RELATIONS_QUERY = """
+    SELECT c.oid, c.relname, c.relkind
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'm')
+    ORDER BY c.relname
+"""
+
+COLUMNS_QUERY = """
+    SELECT a.attname, format_type(a.atttypid, a.atttypmod) as pg_type, t.typcategory, t.typname
+    FROM pg_attribute a
+    JOIN pg_type t ON t.oid = a.atttypid
+    WHERE a.attrelid = %s AND a.attnum > 0 AND NOT a.attisdropped
+    ORDER BY a.attnum
+"""
+
+PRIMARY_KEY_QUERY = """
+    SELECT array_agg(a.attname ORDER BY k.ordinality) as columns
+    FROM pg_index i
+    CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY as k(attnum, ordinality)
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+    WHERE i.indrelid = %s AND i.indisprimary
+"""
+
+INDEXES_QUERY = """
+    SELECT ci.relname as name, i.indisunique as is_unique, i.indnkeyatts as key_count,
+           i.indoption::int2[] as options, pg_get_expr(i.indpred, i.indrelid, true) as predicate,
+           i.indexrelid
+    FROM pg_index i
+    JOIN pg_class ci ON ci.oid = i.indexrelid
+    JOIN pg_am am ON am.oid = ci.relam
+    WHERE i.indrelid = %s AND NOT i.indisprimary AND am.amname = 'btree'
+    ORDER BY ci.relname
+"""
+
+CAST = re.compile(r'::[a-z_ ]+(\[\])?')
+
+
+def sqlite_type(typcategory, typname):
+    """SQLite column type for a PostgreSQL type (see embedded.py)"""
+    if typname in ('timestamp', 'timestamptz'):
+        return TIMESTAMP_TYPE
+    if typname == 'date':
+        return DATE_TYPE
+    if typname == 'bool':
+        return BOOLEAN_TYPE
+    if typname in ('json', 'jsonb'):
+        return JSON_TYPE
+    if typname in ('int2', 'int4', 'int8'):
+        return 'INTEGER'
+    if typcategory == 'N':
+        # numeric and floats; psycopg2's Decimals are encoded as floats anyway
+        return 'REAL'
+    return 'TEXT'
+
+
+def value_encoder(column_type):
+    """Function turning a psycopg2 value into what the SQLite column stores"""
+    if column_type in (TIMESTAMP_TYPE, DATE_TYPE):
+        return lambda value: value.isoformat() if value is not None else None
+    if column_type == JSON_TYPE:
+        return lambda value: json.dumps(value) if value is not None else None
+    if column_type == BOOLEAN_TYPE:
+        return lambda value: int(value) if value is not None else None
+    if column_type == 'REAL':
+        return lambda value: float(value) if value is not None else None
+    if column_type == 'TEXT':
+        return lambda value: value if value is None or isinstance(value, str) else str(value)
+    return lambda value: value
+
+
+def quote(name):
+    return '"%s"' % name.replace('"', '""')
+
+
+def export_relation(pg, lite, oid, name, relkind):
+    """Create and fill one table; returns the number of rows"""
+    cursor = pg.cursor()
+    cursor.execute(COLUMNS_QUERY, (oid,))
+    excluded = EXCLUDED_COLUMNS.get(name, ())
+    columns = [
+        (column, pg_type, sqlite_type(category, typname))
+        for column, pg_type, category, typname in cursor.fetchall()
+        if column not in excluded
+    ]
+
+    primary_key = None
+    if relkind in ('r', 'p'):
+        cursor.execute(PRIMARY_KEY_QUERY, (oid,))
+        primary_key = cursor.fetchone()[0]
+
+    rowid_key = primary_key is not None and len(primary_key) == 1 and any(
+        column == primary_key[0] and column_type == 'INTEGER' for column, _, column_type in columns
+    )
+    definitions = []
+    for column, _, column_type in columns:
+        definition = f"{quote(column)} {column_type}"
+        if rowid_key and primary_key == [column]:
+            definition += ' PRIMARY KEY'
+        definitions.append(definition)
+    if primary_key and not rowid_key:
+        definitions.append(f"PRIMARY KEY ({', '.join(quote(column) for column in primary_key)})")
+    lite.execute(f"CREATE TABLE {quote(name)} ({', '.join(definitions)})")
+    lite.executemany(
+        f"INSERT INTO {COLUMNS_TABLE} (table_name, column_name, pg_type, sqlite_type) VALUES (?, ?, ?, ?)",
+        [(name, column, pg_type, column_type) for column, pg_type, column_type in columns]
+    )
+    cursor.close()
+
+    encoders = [value_encoder(column_type) for _, _, column_type in columns]
+    column_list = ', '.join(quote(column) for column, _, _ in columns)
+    insert = f"INSERT INTO {quote(name)} ({column_list}) VALUES ({', '.join('?' * len(columns))})"
+
+    # Server-side cursor: big history tables are streamed, not loaded at once
+    source = pg.cursor(name=f"export_{oid}")
+    source.itersize = BATCH_ROWS
+    source.execute(f"SELECT {column_list} FROM {quote(name)}")
+    count = 0
+    while True:
+        rows = source.fetchmany(BATCH_ROWS)
+        if not rows:
+            break
+        lite.executemany(insert, [[encode(value) for encode, value in zip(encoders, row)] for row in rows])
+        count += len(rows)
+    source.close()
+    return count
+
+
+def export_indexes(pg, lite, oid, name):
+    """Recreate the table's btree indexes that SQLite can express"""
+    cursor = pg.cursor()
+    cursor.execute(INDEXES_QUERY, (oid,))
+    created, skipped = 0, []
+    for index_name, is_unique, key_count, options, predicate, index_oid in cursor.fetchall():
+        keys = []
+        for position in range(key_count):
+            cursor.execute("SELECT pg_get_indexdef(%s, %s, true)", (index_oid, position + 1))
+            key = CAST.sub('', cursor.fetchone()[0])
+            # indoption bit 0 is DESC
+            keys.append(key + (' DESC' if options[position] & 1 else ''))
+        sql = (f"CREATE {'UNIQUE ' if is_unique else ''}INDEX {quote(index_name)} "
+               f"ON {quote(name)} ({', '.join(keys)})")
+        if predicate:
+            sql += f" WHERE {CAST.sub('', predicate)}"
+        try:
+            lite.execute(sql)
+            created += 1
+        except sqlite3.Error as e:
+            skipped.append(f"{index_name} ({e})")
+    cursor.close()
+    return created, skipped
+
+
+def export(output=EMBEDDED_EXPORT_PATH):
+    """Write the export to output; returns {table: rows}"""
+    start = time.perf_counter()
+    building = f"{output}.building"
+    if os.path.exists(building):
+        os.unlink(building)
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    pg = dedicated_connection()
+    # One consistent snapshot for every table
+    pg.set_session(isolation_level='REPEATABLE READ', readonly=True)
+    lite = sqlite3.connect(building)
+    lite.execute("PRAGMA journal_mode = OFF")
+    lite.execute("PRAGMA synchronous = OFF")
+    lite.execute(f"CREATE TABLE {COLUMNS_TABLE} (table_name TEXT, column_name TEXT, pg_type TEXT, sqlite_type TEXT)")
+    lite.execute(f"CREATE TABLE {EXPORT_TABLE} (key TEXT PRIMARY KEY, value TEXT)")
+
+    counts = {}
+    try:
+        cursor = pg.cursor()
+        cursor.execute(RELATIONS_QUERY)
+        relations = [row for row in cursor.fetchall() if row[1] not in EXCLUDED_TABLES]
+        cursor.close()
+
+        for oid, name, relkind in relations:
+            counts[name] = export_relation(pg, lite, oid, name, relkind)
+            note = ''
+            if relkind in ('r', 'p', 'm'):
+                created, skipped = export_indexes(pg, lite, oid, name)
+                note = f", {created} indexes"
+                for index in skipped:
+                    print(f"   ⚠️  {name}: index {index} skipped")
+            kind = 'view' if relkind == 'v' else 'table'
+            print(f"   ✓ {name} ({kind}): {counts[name]} rows{note}")
+        pg.rollback()
+    finally:
+        pg.close()
+
+    lite.executemany(f"INSERT INTO {EXPORT_TABLE} (key, value) VALUES (?, ?)", [
+        ('exported_at', datetime.now(timezone.utc).isoformat()),
+        ('tables', json.dumps(counts))
+    ])
+    lite.commit()
+    lite.execute("ANALYZE")
+    lite.close()
+
+    os.replace(building, output)
+    size_mb = os.path.getsize(output) / 1024 / 1024
+    print(f"✓ Exported {len(counts)} tables to {output} ({size_mb:.1f} MB) in {time.perf_counter() - start:.1f}s")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the API data to an embedded SQLite file')
+    parser.add_argument('--output', default=EMBEDDED_EXPORT_PATH, help=f'file to write (default {EMBEDDED_EXPORT_PATH})')
+    args = parser.parse_args()
+
+    try:
+        export(args.output)
+    except (psycopg2.Error, sqlite3.Error, OSError) as e:
+        print(f"✗ Export failed: {e}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Fast JSON Responses
+Serialize database rows without per-row Pydantic models
+
+The default FastAPI path builds a model per row, validates it again against
+response_model and encodes the result with the stdlib json module. For list
+endpoints returning hundreds of rows that costs more than the query. Here
+the RealDictCursor rows are encoded in one orjson call instead.
+
+The output is byte-for-byte what the model path produces, provided the
+SELECT list names and orders columns like the model fields:
+- compact separators, non-ASCII left unescaped (as FastAPI's JSONResponse)
+- dates/datetimes rendered with .isoformat(), Decimals as floats
+
+Keep response_model on the route so the OpenAPI schema stays documented;
+FastAPI skips response_model serialization when a Response is returned.
+orjson is optional - without it the stdlib encoder is used.
+"""
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the deployment
+    orjson = None
+
+
+def _default(value):
+    """Encode the non-JSON types psycopg2 returns"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """Encode content to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        # Route datetimes through _default so they match .isoformat() exactly
+        return orjson.dumps(content, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(',', ':'),
+        default=_default
+    ).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps()"""
+
+    def render(self, content):
+        return dumps(content)
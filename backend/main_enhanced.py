@@ -3,18 +3,35 @@ Enhanced AAIP Data API with Multi-Stream Support
 FastAPI backend for serving AAIP historical data including individual streams
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
 import psycopg2
-from psycopg2.extras import RealDictCursor
-import os
-import re
+import asyncio
 import json
 from dotenv import load_dotenv
 
+from database import (
+    get_cursor, fetch_all, fetch_one, run_db, shared_lookups, shared_lookup,
+    init_pool, close_pool, pool_status
+)
+from response_cache import ResponseCache, ResponseCacheMiddleware
+from events import EventHub, NotificationListener
+from schema_registry import SCHEMA_EVENT, SchemaRegistry
+from embedded import EMBEDDED_DB_PATH, EmbeddedModeMiddleware
+from admin import require_admin
+import slow_queries
+from profiling import PROFILE_ENABLED, ProfilingMiddleware
+from metrics import METRICS_ENABLED, CONTENT_TYPE as METRICS_CONTENT_TYPE, CallbackMetric, MetricsMiddleware, registry
+from draw_filters import draw_filter
+from fast_json import FastJSONResponse
+from columnar import to_columnar
+from downsample import MIN_POINTS, MAX_POINTS, downsample_rows, downsample_groups
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, seek_condition, order_by, next_cursor
+
 load_dotenv()
 
 app = FastAPI(
@@ -23,6 +40,42 @@ app = FastAPI(
     version="2.0.0"
 )
 
+# Response cache: read endpoints only change when a scrape lands, so cached
+# entries are dropped on every new scrape. Per-prefix TTLs (seconds) cover
+# data written by collectors that do not log to scrape_log; 0 disables.
+RESPONSE_CACHE_TTLS = {
+    '/api/cache': 0,
+    '/api/events': 0,
+    '/api/admin': 0,
+    '/api/logs': 60,
+    '/api/tools/processing-timeline': 3600,
+    '/api/news': 900,
+    '/api/success-stories': 120,
+    '/api/job-bank': 3600,
+    '/api/labor-market': 3600,
+    '/api/alberta-economy': 3600,
+    '/api/express-entry': 900,
+    '/api/trends': 900,
+}
+# Endpoints that take seconds to compute keep serving their last response
+# for up to this many seconds while it is recomputed after a scrape
+RESPONSE_CACHE_STALE = {
+    '/api/insights/weekly': 600,
+    '/api/tools/competitiveness': 600,
+}
+response_cache = ResponseCache()
+
+# Added before CORS so CORS headers are applied to cached responses per request
+app.add_middleware(
+    ResponseCacheMiddleware, cache=response_cache, ttls=RESPONSE_CACHE_TTLS, stale=RESPONSE_CACHE_STALE
+)
+
+# Embedded read-only node: routes that need PostgreSQL answer 503 (outside
+# the cache, so those answers are never cached)
+if EMBEDDED_DB_PATH:
+    app.add_middleware(EmbeddedModeMiddleware, routes=app.routes)
+    print(f"✓ Serving read-only from embedded database {EMBEDDED_DB_PATH}")
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -30,15 +83,76 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
-# Database configuration
-DATABASE_URL = os.getenv('DATABASE_URL')
-DB_HOST = os.getenv('DB_HOST', 'localhost')
-DB_PORT = os.getenv('DB_PORT', '5432')
-DB_NAME = os.getenv('DB_NAME', 'aaip_data')
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
+# Added after the cache and CORS so request timings include those layers
+app.add_middleware(MetricsMiddleware, routes=app.routes)
+
+# Admin-only ?profile=1 request profiles; not installed without ADMIN_TOKEN
+if PROFILE_ENABLED:
+    app.add_middleware(ProfilingMiddleware, routes=app.routes)
+
+
+@app.on_event("startup")
+def open_db_pool():
+    """Open the shared connection pool before serving requests"""
+    try:
+        init_pool()
+    except psycopg2.Error as e:
+        # Keep serving; the pool retries on the first request
+        print(f"⚠️  Database pool could not be opened at startup: {e}")
+
+
+# Which optional tables exist, so endpoints do not probe the catalog per request
+schema_registry = SchemaRegistry()
+
+
+@app.on_event("startup")
+def load_schema_registry():
+    """Load the table list before serving requests"""
+    try:
+        schema_registry.refresh()
+    except psycopg2.Error as e:
+        # Loaded by the first endpoint that needs it instead
+        print(f"⚠️  Schema registry could not be loaded at startup: {e}")
+
+
+@app.on_event("shutdown")
+def close_db_pool():
+    """Close pooled connections on application shutdown"""
+    close_pool()
+
+
+# Live scrape events: the scraper NOTIFYs, every open /api/events stream gets
+# the event, and the response cache re-checks its data version right away.
+# run_migrations.py sends a "schema" event, which also reloads the schema
+# registry and is not forwarded to the streams.
+def on_db_event(name, payload):
+    response_cache.expire_version()
+    if name == SCHEMA_EVENT:
+        schema_registry.expire()
+
+
+event_hub = EventHub()
+event_listener = NotificationListener(event_hub, on_event=on_db_event, internal=(SCHEMA_EVENT,))
+
+
+@app.on_event("startup")
+async def start_event_stream():
+    """Start the event hub heartbeat and the LISTEN connection"""
+    event_hub.start()
+    # An embedded node has no PostgreSQL to LISTEN on; the response cache
+    # notices a new export through its data version check
+    if not EMBEDDED_DB_PATH:
+        event_listener.start()
+
+
+@app.on_event("shutdown")
+async def stop_event_stream():
+    """Close open event streams so shutdown does not wait on them"""
+    await event_listener.stop()
+    await event_hub.stop()
 
 
 # Pydantic models
@@ -123,21 +237,88 @@ class DrawTrendData(BaseModel):
     stream_detail: Optional[str]
 
 
-def get_db_connection():
-    """Get PostgreSQL database connection"""
-    try:
-        if DATABASE_URL:
-            return psycopg2.connect(DATABASE_URL)
-        else:
-            return psycopg2.connect(
-                host=DB_HOST,
-                port=DB_PORT,
-                database=DB_NAME,
-                user=DB_USER,
-                password=DB_PASSWORD
+# ============================================
+# Shared "latest" lookups
+# ============================================
+# Used by several endpoints; when composed into /api/dashboard each one
+# runs once per request (see database.shared_lookups)
+
+def fetch_latest_summary(cursor):
+    """Most recent aaip_summary row (or None)"""
+    def load():
+        cursor.execute("""
+            SELECT id, timestamp, nomination_allocation, nominations_issued,
+                   nomination_spaces_remaining, applications_to_process, last_updated
+            FROM aaip_summary
+            ORDER BY timestamp DESC
+            LIMIT 1
+        """)
+        return cursor.fetchone()
+    return shared_lookup('latest_summary', load)
+
+
+def fetch_latest_main_streams(cursor):
+    """Quota figures of every main stream from the latest scrape"""
+    def load():
+        cursor.execute("""
+            SELECT 
+                stream_name,
+                nomination_allocation,
+                nominations_issued,
+                nomination_spaces_remaining,
+                applications_to_process,
+                timestamp
+            FROM stream_data_latest
+            WHERE stream_type = 'main'
+            ORDER BY stream_name
+        """)
+        return cursor.fetchall()
+    return shared_lookup('latest_main_streams', load)
+
+
+def fetch_eoi_changes(cursor):
+    """
+    Latest vs previous EOI pool size for every stream with two samples,
+    largest absolute change first
+    """
+    def load():
+        cursor.execute("""
+            WITH ranked_data AS (
+                SELECT
+                    stream_name,
+                    candidate_count,
+                    timestamp,
+                    ROW_NUMBER() OVER (PARTITION BY stream_name ORDER BY timestamp DESC) as rn
+                FROM eoi_pool
+            ),
+            latest_data AS (
+                SELECT
+                    a.stream_name,
+                    a.candidate_count as current_count,
+                    a.timestamp as current_timestamp,
+                    b.candidate_count as previous_count
+                FROM ranked_data a
+                LEFT JOIN ranked_data b
+                    ON a.stream_name = b.stream_name AND b.rn = 2
+                WHERE a.rn = 1
             )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
+            SELECT
+                stream_name,
+                current_count,
+                previous_count,
+                current_count - COALESCE(previous_count, current_count) as change,
+                CASE
+                    WHEN previous_count > 0
+                    THEN ROUND(((current_count - previous_count)::numeric / previous_count * 100), 2)
+                    ELSE 0
+                END as change_percentage,
+                current_timestamp
+            FROM latest_data
+            WHERE previous_count IS NOT NULL
+            ORDER BY ABS(current_count - previous_count) DESC
+        """)
+        return cursor.fetchall()
+    return shared_lookup('eoi_changes', load)
 
 
 @app.get("/")
@@ -157,78 +338,215 @@ def root():
             "draw_streams": "/api/draws/streams",
             "draw_trends": "/api/draws/trends",
             "draw_stats": "/api/draws/stats",
-            "logs": "/api/logs"
+            "logs": "/api/logs",
+            "dashboard": "/api/dashboard",
+            "cache_stats": "/api/cache/stats"
         }
     }
 
 
-@app.get("/api/stats", response_model=Stats)
-def get_stats():
-    """Get database statistics"""
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """
+    Server-Sent Events stream announcing new scrape results
+
+    One "scrape" event per scrape that changed something, with the new
+    draws, EOI pool changes and quota changes. Keep-alive comments are sent
+    every EVENTS_HEARTBEAT seconds; reconnecting clients (Last-Event-ID)
+    get missed events replayed.
+    """
+    if event_hub.is_full():
+        raise HTTPException(status_code=503, detail="Too many event subscribers, retry later")
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get total records
-        cursor.execute("SELECT COUNT(*) as count FROM aaip_summary")
-        total = cursor.fetchone()['count']
-        
-        # Get first and last record timestamps
-        cursor.execute("SELECT timestamp FROM aaip_summary ORDER BY timestamp ASC LIMIT 1")
-        first = cursor.fetchone()
-        first_timestamp = first['timestamp'].isoformat() if first else None
-        
-        cursor.execute("SELECT timestamp FROM aaip_summary ORDER BY timestamp DESC LIMIT 1")
-        last = cursor.fetchone()
-        last_timestamp = last['timestamp'].isoformat() if last else None
-        
-        # Get latest data
-        cursor.execute("""
-            SELECT id, timestamp, nomination_allocation, nominations_issued,
-                   nomination_spaces_remaining, applications_to_process, last_updated
-            FROM aaip_summary
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """)
-        latest_row = cursor.fetchone()
-        
-        latest_data = None
-        if latest_row:
-            latest_data = AAIPSummary(
-                id=latest_row['id'],
-                timestamp=latest_row['timestamp'].isoformat(),
-                nomination_allocation=latest_row['nomination_allocation'],
-                nominations_issued=latest_row['nominations_issued'],
-                nomination_spaces_remaining=latest_row['nomination_spaces_remaining'],
-                applications_to_process=latest_row['applications_to_process'],
-                last_updated=latest_row['last_updated']
-            )
-        
-        # Get stream statistics
-        try:
-            cursor.execute("SELECT COUNT(DISTINCT stream_name) as count FROM stream_data")
-            total_streams = cursor.fetchone()['count']
+        last_event_id = int(request.headers.get('last-event-id', ''))
+    except ValueError:
+        last_event_id = None
+
+    return StreamingResponse(
+        event_hub.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/events/stats")
+def get_event_stats():
+    """Open event streams and events published by this worker"""
+    return event_hub.stats()
+
+
+registry.register(CallbackMetric(
+    'db_pool_idle_connections', 'Idle connections in the database pool', lambda: pool_status()['idle']
+))
+registry.register(CallbackMetric(
+    'response_cache_lookups_total', 'Response cache lookups by result',
+    lambda: {('hit',): response_cache.hits, ('stale',): response_cache.stale_hits, ('miss',): response_cache.misses},
+    ('result',), kind='counter'
+))
+registry.register(CallbackMetric(
+    'response_cache_coalesced_requests_total', 'Cache misses served by a render already in flight for the same response',
+    lambda: response_cache.coalesced, kind='counter'
+))
+registry.register(CallbackMetric(
+    'response_cache_revalidations_total', 'Background re-renders of stale responses',
+    lambda: response_cache.revalidations, kind='counter'
+))
+registry.register(CallbackMetric(
+    'event_stream_subscribers', 'Open /api/events streams', lambda: event_hub.subscribers
+))
+registry.register(CallbackMetric(
+    'schema_registry_refreshes_total', 'Reloads of the optional table list',
+    lambda: schema_registry.refreshes, kind='counter'
+))
+
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Request, query and pool metrics in the Prometheus text format"""
+    if not METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/admin/slow-queries", dependencies=[Depends(require_admin)])
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Statements that exceeded SLOW_QUERY_MS, newest first, with their
+    EXPLAIN (ANALYZE, BUFFERS) plans once captured
+    """
+    return {
+        "enabled": slow_queries.threshold_seconds() is not None,
+        "threshold_ms": slow_queries.SLOW_QUERY_MS,
+        "sample_rate": slow_queries.SLOW_QUERY_SAMPLE_RATE,
+        "entries": slow_queries.entries(limit)
+    }
+
+
+@app.delete("/api/admin/slow-queries", dependencies=[Depends(require_admin)])
+def clear_slow_queries():
+    """Empty the slow query log"""
+    slow_queries.clear()
+    return {"cleared": True}
 
-            cursor.execute("SELECT DISTINCT stream_name FROM stream_data ORDER BY stream_name")
-            available_streams = [row['stream_name'] for row in cursor.fetchall()]
-        except:
-            total_streams = 0
-            available_streams = []
 
-        # Get draws stats
-        try:
-            cursor.execute("SELECT COUNT(*) as count FROM aaip_draws")
-            total_draws = cursor.fetchone()['count']
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    """Response cache hit/miss counters and usage"""
+    return response_cache.stats()
 
-            cursor.execute("SELECT draw_date FROM aaip_draws ORDER BY draw_date DESC LIMIT 1")
-            latest_draw = cursor.fetchone()
-            latest_draw_date = latest_draw['draw_date'].isoformat() if latest_draw else None
-        except:
-            total_draws = 0
-            latest_draw_date = None
 
-        cursor.close()
-        conn.close()
+# Sections of /api/dashboard - each one is the matching endpoint's handler
+DASHBOARD_SECTIONS = {
+    "stats": lambda params: get_stats(),
+    "summary": lambda params: get_summary(
+        Response(), limit=params["summary_limit"], offset=0, page_cursor=None, start=None, end=None, max_points=None
+    ),
+    "streams": lambda params: get_stream_list(),
+    "eoi_latest": lambda params: get_latest_eoi_pool(),
+    "eoi_alerts": lambda params: get_eoi_alerts(threshold_percentage=5.0),
+    "insights": lambda params: get_weekly_insights(),
+    "draw_streams": lambda params: get_draw_streams(),
+    "quota": lambda params: calculate_quota_exhaustion(stream_name=None, window_days=30),
+    "competitiveness": lambda params: get_stream_competitiveness()
+}
+
+
+@app.get("/api/dashboard")
+async def get_dashboard(
+    include: Optional[str] = Query(None, description="Comma-separated sections, default all"),
+    summary_limit: int = Query(30, ge=1, le=1000)
+):
+    """
+    Everything the dashboard needs in one round trip
+
+    Sections run concurrently on the database executor and share the common
+    "latest" lookups. A failing section is reported under "errors" instead
+    of failing the whole response.
+    """
+    if include:
+        names = [name.strip() for name in include.split(',') if name.strip()]
+        unknown = [name for name in names if name not in DASHBOARD_SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(DASHBOARD_SECTIONS)}"
+            )
+    else:
+        names = list(DASHBOARD_SECTIONS)
+
+    params = {"summary_limit": summary_limit}
+    with shared_lookups():
+        results = await asyncio.gather(
+            *(run_db(DASHBOARD_SECTIONS[name], params) for name in names),
+            return_exceptions=True
+        )
+
+    response = {"generated_at": datetime.now().isoformat(), "errors": {}}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            response[name] = None
+            response["errors"][name] = result.detail if isinstance(result, HTTPException) else str(result)
+        else:
+            response[name] = result
+    return response
+
+
+@app.get("/api/stats", response_model=Stats)
+def get_stats():
+    """Get database statistics"""
+    try:
+        with get_cursor() as cursor:
+            # Get total records
+            cursor.execute("SELECT COUNT(*) as count FROM aaip_summary")
+            total = cursor.fetchone()['count']
+        
+            # Get first and last record timestamps
+            cursor.execute("SELECT timestamp FROM aaip_summary ORDER BY timestamp ASC LIMIT 1")
+            first = cursor.fetchone()
+            first_timestamp = first['timestamp'].isoformat() if first else None
+        
+            cursor.execute("SELECT timestamp FROM aaip_summary ORDER BY timestamp DESC LIMIT 1")
+            last = cursor.fetchone()
+            last_timestamp = last['timestamp'].isoformat() if last else None
+        
+            # Get latest data
+            latest_row = fetch_latest_summary(cursor)
+        
+            latest_data = None
+            if latest_row:
+                latest_data = AAIPSummary(
+                    id=latest_row['id'],
+                    timestamp=latest_row['timestamp'].isoformat(),
+                    nomination_allocation=latest_row['nomination_allocation'],
+                    nominations_issued=latest_row['nominations_issued'],
+                    nomination_spaces_remaining=latest_row['nomination_spaces_remaining'],
+                    applications_to_process=latest_row['applications_to_process'],
+                    last_updated=latest_row['last_updated']
+                )
+        
+            # Get stream statistics
+            try:
+                cursor.execute("SELECT COUNT(DISTINCT stream_name) as count FROM stream_data")
+                total_streams = cursor.fetchone()['count']
+
+                cursor.execute("SELECT DISTINCT stream_name FROM stream_data ORDER BY stream_name")
+                available_streams = [row['stream_name'] for row in cursor.fetchall()]
+            except:
+                total_streams = 0
+                available_streams = []
+
+            # Get draws stats
+            try:
+                cursor.execute("SELECT COUNT(*) as count FROM aaip_draws")
+                total_draws = cursor.fetchone()['count']
+
+                cursor.execute("SELECT draw_date FROM aaip_draws ORDER BY draw_date DESC LIMIT 1")
+                latest_draw = cursor.fetchone()
+                latest_draw_date = latest_draw['draw_date'].isoformat() if latest_draw else None
+            except:
+                total_draws = 0
+                latest_draw_date = None
 
         return Stats(
             total_records=total,
@@ -245,25 +563,79 @@ def get_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Sort keys of the cursor-paged list endpoints, see pagination.py
+SUMMARY_PAGE_KEYS = [("timestamp", "DESC"), ("id", "DESC")]
+STREAMS_PAGE_KEYS = [("timestamp", "DESC"), ("stream_name", "ASC"), ("id", "DESC")]
+DRAWS_PAGE_KEYS = [("draw_date", "DESC"), ("id", "DESC")]
+NEWS_PAGE_KEYS = [("published_date", "DESC"), ("id", "DESC")]
+STORIES_PAGE_KEYS = [("COALESCE(approved_at, created_at)", "DESC"), ("id", "DESC")]
+# Types of those keys, to reject tampered cursors with a 400
+SUMMARY_CURSOR_TYPES = (datetime, int)
+STREAMS_CURSOR_TYPES = (datetime, str, int)
+DRAWS_CURSOR_TYPES = (date, int)
+NEWS_CURSOR_TYPES = (date, int)
+STORIES_CURSOR_TYPES = (datetime, int)
+
+# Chart series preserved when downsampling (?max_points=), see downsample.py
+QUOTA_SERIES = ["nomination_allocation", "nominations_issued", "nomination_spaces_remaining", "applications_to_process"]
+
+# Windows maintained in quota_burn_rates (migration 014)
+BURN_RATE_WINDOWS = (7, 30, 90)
+
+
 @app.get("/api/summary", response_model=List[AAIPSummary])
-def get_summary(limit: Optional[int] = 100, offset: Optional[int] = 0):
-    """Get all summary data with pagination"""
+def get_summary(
+    response: Response,
+    limit: Optional[int] = 100,
+    offset: Optional[int] = 0,
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page"),
+    start: Optional[str] = Query(None, description="Only records at or after this time (ISO date/datetime)"),
+    end: Optional[str] = Query(None, description="Only records at or before this time (ISO date/datetime)"),
+    max_points: Optional[int] = Query(None, ge=MIN_POINTS, le=MAX_POINTS, description="Downsample the start..end window to at most this many points")
+):
+    """
+    Get all summary data with pagination
+
+    Pass the X-Next-Cursor header of a page as ?cursor= to get the next one
+    (constant cost at any depth); offset is ignored when a cursor is given.
+
+    With max_points the whole start..end window is returned, downsampled
+    with LTTB (limit, offset and cursor do not apply).
+    """
+    position = decode_cursor(page_cursor, SUMMARY_CURSOR_TYPES) if page_cursor else None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT id, timestamp, nomination_allocation, nominations_issued,
-                   nomination_spaces_remaining, applications_to_process, last_updated
-            FROM aaip_summary
-            ORDER BY timestamp DESC
-            LIMIT %s OFFSET %s
-        """, (limit, offset))
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
+        with get_cursor() as cursor:
+            query = """
+                SELECT id, timestamp, nomination_allocation, nominations_issued,
+                       nomination_spaces_remaining, applications_to_process, last_updated
+                FROM aaip_summary
+                WHERE TRUE
+            """
+            params = []
+            if start:
+                query += " AND timestamp >= %s"
+                params.append(start)
+            if end:
+                query += " AND timestamp <= %s"
+                params.append(end)
+            if position and not max_points:
+                condition, seek_params = seek_condition(SUMMARY_PAGE_KEYS, position)
+                query += f" AND {condition}"
+                params.extend(seek_params)
+            query += f" ORDER BY {order_by(SUMMARY_PAGE_KEYS)}"
+            if not max_points:
+                query += " LIMIT %s OFFSET %s"
+                params.extend([limit + 1, 0 if position else offset])
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        if max_points:
+            rows = downsample_rows(rows, max_points, "timestamp", QUOTA_SERIES)
+        else:
+            cursor_next = next_cursor(rows, limit, ["timestamp", "id"])
+            if cursor_next:
+                response.headers[NEXT_CURSOR_HEADER] = cursor_next
         return [
             AAIPSummary(
                 id=row['id'],
@@ -285,20 +657,8 @@ def get_summary(limit: Optional[int] = 100, offset: Optional[int] = 0):
 def get_latest_summary():
     """Get the most recent summary data"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT id, timestamp, nomination_allocation, nominations_issued,
-                   nomination_spaces_remaining, applications_to_process, last_updated
-            FROM aaip_summary
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """)
-        
-        row = cursor.fetchone()
-        cursor.close()
-        conn.close()
+        with get_cursor() as cursor:
+            row = fetch_latest_summary(cursor)
         
         if not row:
             raise HTTPException(status_code=404, detail="No data found")
@@ -321,18 +681,14 @@ def get_latest_summary():
 def get_stream_list():
     """Get list of available streams"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT DISTINCT stream_name, stream_type, parent_stream
-            FROM stream_data
-            ORDER BY stream_type, stream_name
-        """)
+        with get_cursor() as cursor:
+            cursor.execute("""
+                SELECT DISTINCT stream_name, stream_type, parent_stream
+                FROM stream_data
+                ORDER BY stream_type, stream_name
+            """)
         
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            rows = cursor.fetchall()
         
         return {
             "streams": [
@@ -353,55 +709,45 @@ def get_stream_list():
 def get_all_streams(
     limit: Optional[int] = Query(100, ge=1, le=1000),
     offset: Optional[int] = Query(0, ge=0),
-    stream_type: Optional[str] = Query(None, description="Filter by stream type: 'main' or 'sub-pathway'")
+    stream_type: Optional[str] = Query(None, description="Filter by stream type: 'main' or 'sub-pathway'"),
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page")
 ):
-    """Get all stream data with optional filtering"""
+    """
+    Get all stream data with optional filtering
+
+    Cursor pagination as for /api/summary (X-Next-Cursor header, ?cursor=).
+    """
+    position = decode_cursor(page_cursor, STREAMS_CURSOR_TYPES) if page_cursor else None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        if stream_type:
-            cursor.execute("""
-                SELECT id, timestamp, stream_name, stream_type, parent_stream,
-                       nomination_allocation, nominations_issued, 
-                       nomination_spaces_remaining, applications_to_process,
-                       processing_date, last_updated
-                FROM stream_data
-                WHERE stream_type = %s
-                ORDER BY timestamp DESC, stream_name
-                LIMIT %s OFFSET %s
-            """, (stream_type, limit, offset))
-        else:
-            cursor.execute("""
+        with get_cursor() as cursor:
+            query = """
                 SELECT id, timestamp, stream_name, stream_type, parent_stream,
                        nomination_allocation, nominations_issued, 
                        nomination_spaces_remaining, applications_to_process,
                        processing_date, last_updated
                 FROM stream_data
-                ORDER BY timestamp DESC, stream_name
-                LIMIT %s OFFSET %s
-            """, (limit, offset))
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
-        
-        return [
-            StreamData(
-                id=row['id'],
-                timestamp=row['timestamp'].isoformat(),
-                stream_name=row['stream_name'],
-                stream_type=row['stream_type'],
-                parent_stream=row['parent_stream'],
-                nomination_allocation=row['nomination_allocation'],
-                nominations_issued=row['nominations_issued'],
-                nomination_spaces_remaining=row['nomination_spaces_remaining'],
-                applications_to_process=row['applications_to_process'],
-                processing_date=row['processing_date'],
-                last_updated=row['last_updated']
-            )
-            for row in rows
-        ]
+                WHERE 1=1
+            """
+            params = []
+
+            if stream_type:
+                query += " AND stream_type = %s"
+                params.append(stream_type)
+
+            if position:
+                condition, seek_params = seek_condition(STREAMS_PAGE_KEYS, position)
+                query += f" AND {condition}"
+                params.extend(seek_params)
+
+            query += f" ORDER BY {order_by(STREAMS_PAGE_KEYS)} LIMIT %s OFFSET %s"
+            params.extend([limit + 1, 0 if position else offset])
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        cursor_next = next_cursor(rows, limit, ["timestamp", "stream_name", "id"])
+        # Columns are selected in StreamData field order, so rows encode as-is
+        return FastJSONResponse(rows, headers={NEXT_CURSOR_HEADER: cursor_next} if cursor_next else None)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -410,47 +756,51 @@ def get_all_streams(
 @app.get("/api/streams/{stream_name}", response_model=List[StreamData])
 def get_stream_by_name(
     stream_name: str,
-    limit: Optional[int] = Query(100, ge=1, le=1000)
+    limit: Optional[int] = Query(100, ge=1, le=1000),
+    response_format: Optional[str] = Query(None, alias="format", pattern="^columnar$", description="'columnar' for the compact chart format"),
+    start: Optional[str] = Query(None, description="Only records at or after this time (ISO date/datetime)"),
+    end: Optional[str] = Query(None, description="Only records at or before this time (ISO date/datetime)"),
+    max_points: Optional[int] = Query(None, ge=MIN_POINTS, le=MAX_POINTS, description="Downsample the start..end window to at most this many points")
 ):
-    """Get historical data for a specific stream"""
+    """
+    Get historical data for a specific stream
+
+    format=columnar returns {columns, data, epoch_days} instead of row objects.
+    With max_points the whole start..end window is returned, downsampled
+    with LTTB instead of cut at limit.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT id, timestamp, stream_name, stream_type, parent_stream,
-                   nomination_allocation, nominations_issued, 
-                   nomination_spaces_remaining, applications_to_process,
-                   processing_date, last_updated
-            FROM stream_data
-            WHERE stream_name = %s
-            ORDER BY timestamp DESC
-            LIMIT %s
-        """, (stream_name, limit))
-        
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with get_cursor() as cursor:
+            query = """
+                SELECT id, timestamp, stream_name, stream_type, parent_stream,
+                       nomination_allocation, nominations_issued, 
+                       nomination_spaces_remaining, applications_to_process,
+                       processing_date, last_updated
+                FROM stream_data
+                WHERE stream_name = %s
+            """
+            params = [stream_name]
+            if start:
+                query += " AND timestamp >= %s"
+                params.append(start)
+            if end:
+                query += " AND timestamp <= %s"
+                params.append(end)
+            query += " ORDER BY timestamp DESC"
+            if not max_points:
+                query += " LIMIT %s"
+                params.append(limit)
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
         
         if not rows:
             raise HTTPException(status_code=404, detail=f"Stream '{stream_name}' not found")
-        
-        return [
-            StreamData(
-                id=row['id'],
-                timestamp=row['timestamp'].isoformat(),
-                stream_name=row['stream_name'],
-                stream_type=row['stream_type'],
-                parent_stream=row['parent_stream'],
-                nomination_allocation=row['nomination_allocation'],
-                nominations_issued=row['nominations_issued'],
-                nomination_spaces_remaining=row['nomination_spaces_remaining'],
-                applications_to_process=row['applications_to_process'],
-                processing_date=row['processing_date'],
-                last_updated=row['last_updated']
-            )
-            for row in rows
-        ]
+
+        rows = downsample_rows(rows, max_points, "timestamp", QUOTA_SERIES)
+        if response_format == "columnar":
+            return FastJSONResponse(to_columnar(rows, list(StreamData.model_fields)))
+        return FastJSONResponse(rows)
         
     except psycopg2.Error as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -460,20 +810,16 @@ def get_stream_by_name(
 def get_scrape_logs(limit: Optional[int] = 50):
     """Get scrape logs"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cursor.execute("""
-            SELECT id, timestamp, status, message, 
-                   COALESCE(streams_collected, 0) as streams_collected
-            FROM scrape_log
-            ORDER BY timestamp DESC
-            LIMIT %s
-        """, (limit,))
+        with get_cursor() as cursor:
+            cursor.execute("""
+                SELECT id, timestamp, status, message, 
+                       COALESCE(streams_collected, 0) as streams_collected
+                FROM scrape_log
+                ORDER BY timestamp DESC
+                LIMIT %s
+            """, (limit,))
         
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            rows = cursor.fetchall()
         
         return [
             ScrapeLog(
@@ -498,79 +844,47 @@ def get_draws(
     stream_detail: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    year: Optional[int] = None
+    year: Optional[int] = None,
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page")
 ):
     """
     Get draw records with optional filtering
 
     - **limit**: Maximum number of records to return
-    - **offset**: Number of records to skip
+    - **offset**: Number of records to skip (ignored when cursor is given)
+    - **cursor**: X-Next-Cursor header of the previous page
     - **stream_category**: Filter by stream category
     - **stream_detail**: Filter by stream detail/pathway
     - **start_date**: Filter draws on or after this date (YYYY-MM-DD)
     - **end_date**: Filter draws on or before this date (YYYY-MM-DD)
     - **year**: Filter draws by year (e.g., 2024, 2025)
     """
+    position = decode_cursor(page_cursor, DRAWS_CURSOR_TYPES) if page_cursor else None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        query = """
-            SELECT id, draw_date, draw_number, stream_category, stream_detail,
-                   min_score, invitations_issued, selection_parameters,
-                   created_at, updated_at
-            FROM aaip_draws
-            WHERE 1=1
-        """
-        params = []
-
-        if stream_category:
-            query += " AND stream_category = %s"
-            params.append(stream_category)
-
-        if stream_detail:
-            # "General" is displayed in frontend but stored as NULL in DB
-            if stream_detail == "General":
-                query += " AND (stream_detail IS NULL OR stream_detail = '')"
-            else:
-                query += " AND stream_detail = %s"
-                params.append(stream_detail)
-        
-        if year:
-            query += " AND EXTRACT(YEAR FROM draw_date) = %s"
-            params.append(year)
-
-        if start_date:
-            query += " AND draw_date >= %s"
-            params.append(start_date)
+        with get_cursor() as cursor:
+            where, params = draw_filter(stream_category, stream_detail, year, start_date, end_date)
+            query = f"""
+                SELECT id, draw_date, draw_number, stream_category, stream_detail,
+                       min_score, invitations_issued, selection_parameters,
+                       created_at, updated_at
+                FROM aaip_draws
+                WHERE {where}
+            """
 
-        if end_date:
-            query += " AND draw_date <= %s"
-            params.append(end_date)
+            if position:
+                condition, seek_params = seek_condition(DRAWS_PAGE_KEYS, position)
+                query += f" AND {condition}"
+                params.extend(seek_params)
 
-        query += " ORDER BY draw_date DESC LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
+            query += f" ORDER BY {order_by(DRAWS_PAGE_KEYS)} LIMIT %s OFFSET %s"
+            params.extend([limit + 1, 0 if position else offset])
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
-        return [
-            DrawRecord(
-                id=row['id'],
-                draw_date=row['draw_date'].isoformat(),
-                draw_number=row['draw_number'],
-                stream_category=row['stream_category'],
-                stream_detail=row['stream_detail'],
-                min_score=row['min_score'],
-                invitations_issued=row['invitations_issued'],
-                selection_parameters=row['selection_parameters'],
-                created_at=row['created_at'].isoformat(),
-                updated_at=row['updated_at'].isoformat()
-            )
-            for row in rows
-        ]
+        cursor_next = next_cursor(rows, limit, ["draw_date", "id"])
+        # Columns are selected in DrawRecord field order, so rows encode as-is
+        return FastJSONResponse(rows, headers={NEXT_CURSOR_HEADER: cursor_next} if cursor_next else None)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -580,37 +894,32 @@ def get_draws(
 def get_draw_streams():
     """Get list of all stream categories and their details"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Get unique categories
-        cursor.execute("""
-            SELECT DISTINCT stream_category
-            FROM aaip_draws
-            ORDER BY stream_category
-        """)
-        categories = [row['stream_category'] for row in cursor.fetchall()]
-
-        # Get category-detail combinations
-        cursor.execute("""
-            SELECT DISTINCT stream_category, 
-                   CASE 
-                       WHEN stream_detail IS NULL OR stream_detail = '' THEN 'General'
-                       ELSE stream_detail
-                   END as stream_detail
-            FROM aaip_draws
-            ORDER BY stream_category, stream_detail
-        """)
-        streams = [
-            {
-                'category': row['stream_category'],
-                'detail': row['stream_detail']
-            }
-            for row in cursor.fetchall()
-        ]
+        with get_cursor() as cursor:
+            # Get unique categories
+            cursor.execute("""
+                SELECT DISTINCT stream_category
+                FROM aaip_draws
+                ORDER BY stream_category
+            """)
+            categories = [row['stream_category'] for row in cursor.fetchall()]
 
-        cursor.close()
-        conn.close()
+            # Get category-detail combinations
+            cursor.execute("""
+                SELECT DISTINCT stream_category, 
+                       CASE 
+                           WHEN stream_detail IS NULL OR stream_detail = '' THEN 'General'
+                           ELSE stream_detail
+                       END as stream_detail
+                FROM aaip_draws
+                ORDER BY stream_category, stream_detail NULLS LAST
+            """)
+            streams = [
+                {
+                    'category': row['stream_category'],
+                    'detail': row['stream_detail']
+                }
+                for row in cursor.fetchall()
+            ]
 
         return StreamList(categories=categories, streams=streams)
 
@@ -623,7 +932,8 @@ def get_draw_trends(
     stream_category: Optional[str] = None,
     stream_detail: Optional[str] = None,
     year: Optional[int] = None,
-    limit: Optional[int] = 365
+    limit: Optional[int] = 365,
+    response_format: Optional[str] = Query(None, alias="format", pattern="^columnar$", description="'columnar' for the compact chart format")
 ):
     """
     Get draw trend data for visualization
@@ -632,53 +942,29 @@ def get_draw_trends(
     - **stream_detail**: Filter by stream detail
     - **year**: Filter by year (e.g., 2025)
     - **limit**: Maximum number of records
+    - **format**: 'columnar' returns {columns, data, epoch_days} with dates as epoch days
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        query = """
-            SELECT draw_date, stream_category, stream_detail,
-                   min_score, invitations_issued
-            FROM aaip_draws
-            WHERE 1=1
-        """
-        params = []
-
-        if stream_category:
-            query += " AND stream_category = %s"
-            params.append(stream_category)
-
-        if stream_detail:
-            # "General" is displayed in frontend but stored as NULL in DB
-            if stream_detail == "General":
-                query += " AND (stream_detail IS NULL OR stream_detail = '')"
-            else:
-                query += " AND stream_detail = %s"
-                params.append(stream_detail)
-
-        if year:
-            query += " AND EXTRACT(YEAR FROM draw_date) = %s"
-            params.append(year)
+        with get_cursor() as cursor:
+            where, params = draw_filter(stream_category, stream_detail, year)
+            # Shaped like DrawTrendData so rows encode as-is
+            query = f"""
+                SELECT draw_date as date, min_score, invitations_issued as invitations,
+                       stream_category, COALESCE(NULLIF(stream_detail, ''), 'General') as stream_detail
+                FROM aaip_draws
+                WHERE {where}
+            """
 
-        query += " ORDER BY draw_date ASC LIMIT %s"
-        params.append(limit)
+            # id breaks ties between same-day draws, so both backends return one order
+            query += " ORDER BY draw_date ASC, id ASC LIMIT %s"
+            params.append(limit)
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
-        return [
-            DrawTrendData(
-                date=row['draw_date'].isoformat(),
-                min_score=row['min_score'],
-                invitations=row['invitations_issued'],
-                stream_category=row['stream_category'],
-                stream_detail=row['stream_detail'] or 'General'
-            )
-            for row in rows
-        ]
+        if response_format == "columnar":
+            return FastJSONResponse(to_columnar(rows, list(DrawTrendData.model_fields)))
+        return FastJSONResponse(rows)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -697,50 +983,30 @@ def get_draw_stats(
     - **year**: Filter by year (e.g., 2025, 2024)
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        query = """
-            SELECT
-                stream_category,
-                stream_detail,
-                COUNT(*) as total_draws,
-                SUM(invitations_issued) as total_invitations,
-                AVG(min_score) as avg_score,
-                MIN(min_score) as min_score,
-                MAX(min_score) as max_score,
-                MAX(draw_date) as latest_draw_date,
-                MIN(draw_date) as earliest_draw_date
-            FROM aaip_draws
-            WHERE 1=1
-        """
-        params = []
-
-        if stream_category:
-            query += " AND stream_category = %s"
-            params.append(stream_category)
-
-        if stream_detail:
-            # "General" is displayed in frontend but stored as NULL in DB
-            if stream_detail == "General":
-                query += " AND (stream_detail IS NULL OR stream_detail = '')"
-            else:
-                query += " AND stream_detail = %s"
-                params.append(stream_detail)
-
-        if year:
-            query += " AND EXTRACT(YEAR FROM draw_date) = %s"
-            params.append(year)
+        with get_cursor() as cursor:
+            where, params = draw_filter(stream_category, stream_detail, year)
+            query = f"""
+                SELECT
+                    stream_category,
+                    stream_detail,
+                    COUNT(*) as total_draws,
+                    SUM(invitations_issued) as total_invitations,
+                    AVG(min_score) as avg_score,
+                    MIN(min_score) as min_score,
+                    MAX(min_score) as max_score,
+                    MAX(draw_date) as latest_draw_date,
+                    MIN(draw_date) as earliest_draw_date
+                FROM aaip_draws
+                WHERE {where}
+            """
 
-        query += """
-            GROUP BY stream_category, stream_detail
-            ORDER BY stream_category, stream_detail
-        """
+            query += """
+                GROUP BY stream_category, stream_detail
+                ORDER BY stream_category, stream_detail NULLS LAST
+            """
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
         return [
             DrawStats(
@@ -800,6 +1066,27 @@ class SmartInsight(BaseModel):
     generated_at: str
 
 
+class InsightRecord(BaseModel):
+    id: int
+    type: str
+    title: str
+    detail: str
+    action: Optional[str] = None
+    reasoning: Optional[str] = None
+    generated_at: str
+    valid_from: str
+    valid_to: Optional[str] = None
+
+
+class BurnRate(BaseModel):
+    window_days: int
+    rate_per_day: float
+    rate_low: Optional[float]  # 95% band, None with fewer than three samples
+    rate_high: Optional[float]
+    days_covered: float
+    samples: int
+
+
 class QuotaCalculation(BaseModel):
     stream_name: str
     current_remaining: int
@@ -807,8 +1094,15 @@ class QuotaCalculation(BaseModel):
     usage_rate_per_day: float
     estimated_days_to_exhaust: Optional[int]
     estimated_exhaustion_date: Optional[str]
-    confidence_level: str  # 'high', 'medium', 'low'
+    confidence_level: str  # 'high', 'medium', 'low', from quota usage
     warning_level: Optional[str] = None  # 'critical', 'warning', 'normal'
+    window_days: int = 30
+    rate_confidence: str = "low"  # 'high', 'medium', 'low', from the width of the rate's 95% band
+    usage_rate_low: Optional[float] = None
+    usage_rate_high: Optional[float] = None
+    earliest_exhaustion_date: Optional[str] = None  # at usage_rate_high
+    latest_exhaustion_date: Optional[str] = None  # at usage_rate_low, None if it may never run out
+    burn_rates: List[BurnRate] = []
 
 
 class ProcessingTimeline(BaseModel):
@@ -829,6 +1123,14 @@ class CompetitivenessScore(BaseModel):
     recommendation: str
 
 
+class CompetitivenessHistoryPoint(BaseModel):
+    stream_name: str
+    timestamp: str
+    competitiveness_score: float
+    level: str
+    factors: Dict[str, Any]
+
+
 # Job Bank labor market data models
 class JobBankOccupation(BaseModel):
     noc_code: str
@@ -853,32 +1155,26 @@ class LaborMarketInsight(BaseModel):
 
 
 @app.get("/api/eoi/latest", response_model=List[EOIPool])
-async def get_latest_eoi_pool():
+def get_latest_eoi_pool():
     """Get the most recent EOI pool data for all streams"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with get_cursor() as cursor:
+            # Get the most recent timestamp
+            cursor.execute("SELECT MAX(timestamp) as latest FROM eoi_pool")
+            latest = cursor.fetchone()
 
-        # Get the most recent timestamp
-        cursor.execute("SELECT MAX(timestamp) as latest FROM eoi_pool")
-        latest = cursor.fetchone()
-
-        if not latest or not latest['latest']:
-            cursor.close()
-            conn.close()
-            return []
+            if not latest or not latest['latest']:
+                return []
 
-        # Get all streams for the latest timestamp
-        cursor.execute("""
-            SELECT stream_name, candidate_count, timestamp, last_updated
-            FROM eoi_pool
-            WHERE timestamp = %s
-            ORDER BY candidate_count DESC
-        """, (latest['latest'],))
+            # Get all streams for the latest timestamp
+            cursor.execute("""
+                SELECT stream_name, candidate_count, timestamp, last_updated
+                FROM eoi_pool
+                WHERE timestamp = %s
+                ORDER BY candidate_count DESC
+            """, (latest['latest'],))
 
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            rows = cursor.fetchall()
 
         return [
             EOIPool(
@@ -895,53 +1191,76 @@ async def get_latest_eoi_pool():
 
 
 @app.get("/api/eoi/trends", response_model=List[EOITrend])
-async def get_eoi_trends(
+def get_eoi_trends(
     stream_name: Optional[str] = None,
-    days: int = 7
+    days: int = 7,
+    response_format: Optional[str] = Query(None, alias="format", pattern="^columnar$", description="'columnar' for the compact chart format"),
+    start: Optional[str] = Query(None, description="Only samples at or after this time (ISO date/datetime), replaces days"),
+    end: Optional[str] = Query(None, description="Only samples at or before this time (ISO date/datetime)"),
+    max_points: Optional[int] = Query(None, ge=MIN_POINTS, le=MAX_POINTS, description="Downsample each stream to at most this many points")
 ):
-    """Get EOI pool trends over time for a specific stream or all streams"""
+    """
+    Get EOI pool trends over time for a specific stream or all streams
+
+    format=columnar returns {columns, data, epoch_days} instead of row objects.
+    max_points downsamples every stream's series with LTTB; change columns
+    still describe the change from the previous raw sample.
+    """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with get_cursor() as cursor:
+            # Build query
+            query = """
+                WITH ordered_data AS (
+                    SELECT
+                        stream_name,
+                        timestamp,
+                        candidate_count,
+                        LAG(candidate_count) OVER (PARTITION BY stream_name ORDER BY timestamp) as prev_count
+                    FROM eoi_pool
+                    WHERE TRUE
+            """
+
+            params = []
+
+            if start:
+                query += " AND timestamp >= %s"
+                params.append(start)
+            else:
+                query += " AND timestamp >= NOW() - INTERVAL '%s days'"
+                params.append(days)
 
-        # Build query
-        query = """
-            WITH ordered_data AS (
+            if end:
+                query += " AND timestamp <= %s"
+                params.append(end)
+
+            if stream_name:
+                query += " AND stream_name = %s"
+                params.append(stream_name)
+
+            query += """
+                )
                 SELECT
                     stream_name,
                     timestamp,
                     candidate_count,
-                    LAG(candidate_count) OVER (PARTITION BY stream_name ORDER BY timestamp) as prev_count
-                FROM eoi_pool
-                WHERE timestamp >= NOW() - INTERVAL '%s days'
-        """
-
-        params = [days]
-
-        if stream_name:
-            query += " AND stream_name = %s"
-            params.append(stream_name)
-
-        query += """
-            )
-            SELECT
-                stream_name,
-                timestamp,
-                candidate_count,
-                candidate_count - prev_count as change_from_previous,
-                CASE
-                    WHEN prev_count > 0
-                    THEN ROUND(((candidate_count - prev_count)::numeric / prev_count * 100), 2)
-                    ELSE NULL
-                END as change_percentage
-            FROM ordered_data
-            ORDER BY stream_name, timestamp DESC
-        """
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+                    candidate_count - prev_count as change_from_previous,
+                    CASE
+                        WHEN prev_count > 0
+                        THEN ROUND(((candidate_count - prev_count)::numeric / prev_count * 100), 2)
+                        ELSE NULL
+                    END as change_percentage
+                FROM ordered_data
+                ORDER BY stream_name, timestamp DESC
+            """
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        rows = downsample_groups(rows, max_points, "stream_name", "timestamp", ["candidate_count"])
+        if response_format == "columnar":
+            for row in rows:
+                row['change_percentage'] = float(row['change_percentage']) if row['change_percentage'] else None
+            return FastJSONResponse(to_columnar(rows, list(EOITrend.model_fields)))
 
         return [
             EOITrend(
@@ -959,55 +1278,15 @@ async def get_eoi_trends(
 
 
 @app.get("/api/eoi/alerts", response_model=List[EOIAlert])
-async def get_eoi_alerts(threshold_percentage: float = 5.0):
+def get_eoi_alerts(threshold_percentage: float = 5.0):
     """
     Get EOI pool alerts for significant changes
     threshold_percentage: Minimum percentage change to trigger alert (default 5%)
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Get latest two data points for each stream
-        cursor.execute("""
-            WITH ranked_data AS (
-                SELECT
-                    stream_name,
-                    candidate_count,
-                    timestamp,
-                    ROW_NUMBER() OVER (PARTITION BY stream_name ORDER BY timestamp DESC) as rn
-                FROM eoi_pool
-            ),
-            latest_data AS (
-                SELECT
-                    a.stream_name,
-                    a.candidate_count as current_count,
-                    a.timestamp as current_timestamp,
-                    b.candidate_count as previous_count
-                FROM ranked_data a
-                LEFT JOIN ranked_data b
-                    ON a.stream_name = b.stream_name AND b.rn = 2
-                WHERE a.rn = 1
-            )
-            SELECT
-                stream_name,
-                current_count,
-                previous_count,
-                current_count - COALESCE(previous_count, current_count) as change,
-                CASE
-                    WHEN previous_count > 0
-                    THEN ROUND(((current_count - previous_count)::numeric / previous_count * 100), 2)
-                    ELSE 0
-                END as change_percentage,
-                current_timestamp
-            FROM latest_data
-            WHERE previous_count IS NOT NULL
-            ORDER BY ABS(current_count - previous_count) DESC
-        """)
-
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        with get_cursor() as cursor:
+            # Get latest two data points for each stream
+            rows = fetch_eoi_changes(cursor)
 
         alerts = []
         for row in rows:
@@ -1046,279 +1325,168 @@ async def get_eoi_alerts(threshold_percentage: float = 5.0):
 # ============================================================================
 
 @app.get("/api/insights/weekly", response_model=List[SmartInsight])
-async def get_weekly_insights():
+def get_weekly_insights():
     """
-    Generate smart insights based on recent data patterns
+    Smart insights based on recent data patterns
     Analyzes: quota usage, draw frequency, score trends, EOI pool changes
+
+    Generated after every scrape by scraper/insights_generator.py; this only
+    reads the currently valid ones.
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        insights = []
-        current_time = datetime.now()
-
-        # Insight 1: Check quota usage warnings
-        cursor.execute("""
-            SELECT 
-                stream_name,
-                nomination_allocation,
-                nominations_issued,
-                nomination_spaces_remaining,
-                timestamp
-            FROM stream_data
-            WHERE timestamp = (SELECT MAX(timestamp) FROM stream_data)
-            AND stream_type = 'main'
-            ORDER BY stream_name
-        """)
-        
-        streams = cursor.fetchall()
-        for stream in streams:
-            if stream['nomination_allocation'] and stream['nomination_allocation'] > 0:
-                usage_rate = (stream['nominations_issued'] or 0) / stream['nomination_allocation']
-                
-                if usage_rate > 0.85:
-                    insights.append({
-                        "type": "warning",
-                        "title": f"{stream['stream_name']} - Quota Nearly Exhausted",
-                        "detail": f"Currently at {int(usage_rate * 100)}% quota usage ({stream['nominations_issued']}/{stream['nomination_allocation']})",
-                        "action": "If you qualify for this stream, consider submitting your EOI soon",
-                        "reasoning": "Historical data shows remaining 15% typically depletes within 4-6 weeks",
-                        "generated_at": current_time.isoformat()
-                    })
-                elif usage_rate > 0.70:
-                    insights.append({
-                        "type": "info",
-                        "title": f"{stream['stream_name']} - Steady Quota Consumption",
-                        "detail": f"Currently at {int(usage_rate * 100)}% quota usage",
-                        "reasoning": "Stream is on track to exhaust quota by year-end",
-                        "generated_at": current_time.isoformat()
-                    })
-
-        # Insight 2: Draw frequency analysis
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as draw_count,
-                MIN(draw_date) as earliest,
-                MAX(draw_date) as latest
-            FROM aaip_draws
-            WHERE draw_date >= CURRENT_DATE - INTERVAL '30 days'
-        """)
-        
-        draw_freq = cursor.fetchone()
-        if draw_freq and draw_freq['draw_count']:
-            # Compare with previous 30 days
+        with get_cursor() as cursor:
             cursor.execute("""
-                SELECT COUNT(*) as prev_count
-                FROM aaip_draws
-                WHERE draw_date >= CURRENT_DATE - INTERVAL '60 days'
-                AND draw_date < CURRENT_DATE - INTERVAL '30 days'
+                SELECT insight_type, title, detail, action, reasoning, generated_at
+                FROM insights
+                WHERE valid_to IS NULL
+                ORDER BY priority, position
             """)
-            prev_freq = cursor.fetchone()
-            
-            if prev_freq and prev_freq['prev_count']:
-                change_pct = ((draw_freq['draw_count'] - prev_freq['prev_count']) / prev_freq['prev_count']) * 100
-                
-                if change_pct > 50:
-                    insights.append({
-                        "type": "positive",
-                        "title": "Draw Frequency Significantly Increased",
-                        "detail": f"{draw_freq['draw_count']} draws in past 30 days (vs {prev_freq['prev_count']} previously)",
-                        "reasoning": f"Draw frequency increased by {int(change_pct)}%. Possible reasons: approaching year-end quota deadline or policy adjustment",
-                        "generated_at": current_time.isoformat()
-                    })
-                elif change_pct < -30:
-                    insights.append({
-                        "type": "warning",
-                        "title": "Draw Frequency Decreased",
-                        "detail": f"Only {draw_freq['draw_count']} draws in past 30 days (vs {prev_freq['prev_count']} previously)",
-                        "reasoning": "May indicate quota constraints or policy review period",
-                        "generated_at": current_time.isoformat()
-                    })
-
-        # Insight 3: Score trend analysis for Express Entry
-        cursor.execute("""
-            SELECT 
-                min_score,
-                draw_date
-            FROM aaip_draws
-            WHERE stream_category = 'Alberta Express Entry Stream'
-            AND min_score IS NOT NULL
-            ORDER BY draw_date DESC
-            LIMIT 3
-        """)
-        
-        recent_scores = cursor.fetchall()
-        if len(recent_scores) >= 3:
-            avg_recent = sum(s['min_score'] for s in recent_scores) / len(recent_scores)
-            
-            cursor.execute("""
-                SELECT AVG(min_score) as avg_score
-                FROM (
-                    SELECT min_score
-                    FROM aaip_draws
-                    WHERE stream_category = 'Alberta Express Entry Stream'
-                    AND min_score IS NOT NULL
-                    AND draw_date < %s
-                    ORDER BY draw_date DESC
-                    LIMIT 3
-                ) as prev_draws
-            """, (recent_scores[-1]['draw_date'],))
-            
-            prev_avg = cursor.fetchone()
-            if prev_avg and prev_avg['avg_score']:
-                score_change = avg_recent - float(prev_avg['avg_score'])
-                
-                if score_change < -10:
-                    insights.append({
-                        "type": "opportunity",
-                        "title": "Express Entry Invitation Scores Declining",
-                        "detail": f"Recent average score: {int(avg_recent)} (down {int(abs(score_change))} points)",
-                        "reasoning": "Score drops may indicate pool depletion of high-score candidates or increased invitation volumes",
-                        "action": "Good time for mid-range score candidates to stay ready",
-                        "generated_at": current_time.isoformat()
-                    })
-                elif score_change > 10:
-                    insights.append({
-                        "type": "info",
-                        "title": "Express Entry Scores Trending Higher",
-                        "detail": f"Recent average score: {int(avg_recent)} (up {int(score_change)} points)",
-                        "reasoning": "May indicate influx of high-score candidates or reduced invitation volumes",
-                        "generated_at": current_time.isoformat()
-                    })
+            rows = cursor.fetchall()
 
-        # Insight 4: EOI Pool significant changes
-        cursor.execute("""
-            WITH latest_two AS (
-                SELECT 
-                    stream_name,
-                    candidate_count,
-                    timestamp,
-                    ROW_NUMBER() OVER (PARTITION BY stream_name ORDER BY timestamp DESC) as rn
-                FROM eoi_pool
+        return [
+            SmartInsight(
+                type=row['insight_type'],
+                title=row['title'],
+                detail=row['detail'],
+                action=row['action'],
+                reasoning=row['reasoning'],
+                generated_at=row['generated_at'].isoformat()
             )
-            SELECT 
-                a.stream_name,
-                a.candidate_count as current_count,
-                b.candidate_count as previous_count
-            FROM latest_two a
-            LEFT JOIN latest_two b ON a.stream_name = b.stream_name AND b.rn = 2
-            WHERE a.rn = 1
-            AND b.candidate_count IS NOT NULL
-            AND ABS(a.candidate_count - b.candidate_count) > 50
-            ORDER BY ABS(a.candidate_count - b.candidate_count) DESC
-            LIMIT 3
-        """)
-        
-        pool_changes = cursor.fetchall()
-        for change in pool_changes:
-            delta = change['current_count'] - change['previous_count']
-            change_pct = (delta / change['previous_count']) * 100 if change['previous_count'] > 0 else 0
-            
-            if delta > 0:
-                insights.append({
-                    "type": "info",
-                    "title": f"{change['stream_name']} - EOI Pool Increased",
-                    "detail": f"Pool size: {change['current_count']} (up {delta} candidates, +{int(change_pct)}%)",
-                    "reasoning": "Increased competition may affect future draw scores",
-                    "generated_at": current_time.isoformat()
-                })
-            else:
-                insights.append({
-                    "type": "positive",
-                    "title": f"{change['stream_name']} - EOI Pool Decreased",
-                    "detail": f"Pool size: {change['current_count']} (down {abs(delta)} candidates, {int(change_pct)}%)",
-                    "reasoning": "Reduced pool size may indicate recent draws or candidate withdrawals",
-                    "generated_at": current_time.isoformat()
-                })
+            for row in rows
+        ]
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
-        cursor.close()
-        conn.close()
+@app.get("/api/insights/history", response_model=List[InsightRecord])
+def get_insights_history(
+    start: Optional[str] = Query(None, description="Insights valid at or after this time (ISO date/datetime)"),
+    end: Optional[str] = Query(None, description="Insights valid at or before this time (ISO date/datetime)"),
+    insight_type: Optional[str] = Query(None, alias="type", description="warning, opportunity, positive or info"),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Past and current insights with their validity windows, newest first
 
-        # Sort by type priority: warning > opportunity > positive > info
-        type_priority = {'warning': 0, 'opportunity': 1, 'positive': 2, 'info': 3}
-        insights.sort(key=lambda x: type_priority.get(x['type'], 99))
+    valid_to is null while an insight is still current.
+    """
+    try:
+        with get_cursor() as cursor:
+            query = """
+                SELECT id, insight_type, title, detail, action, reasoning,
+                       generated_at, valid_from, valid_to
+                FROM insights
+                WHERE TRUE
+            """
+            params = []
+            if start:
+                query += " AND (valid_to IS NULL OR valid_to > %s)"
+                params.append(start)
+            if end:
+                query += " AND valid_from <= %s"
+                params.append(end)
+            if insight_type:
+                query += " AND insight_type = %s"
+                params.append(insight_type)
+            query += " ORDER BY valid_from DESC, id DESC LIMIT %s"
+            params.append(limit)
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
-        return [SmartInsight(**insight) for insight in insights]
+        return [
+            InsightRecord(
+                id=row['id'],
+                type=row['insight_type'],
+                title=row['title'],
+                detail=row['detail'],
+                action=row['action'],
+                reasoning=row['reasoning'],
+                generated_at=row['generated_at'].isoformat(),
+                valid_from=row['valid_from'].isoformat(),
+                valid_to=row['valid_to'].isoformat() if row['valid_to'] else None
+            )
+            for row in rows
+        ]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/tools/quota-calculator")
-async def calculate_quota_exhaustion(stream_name: Optional[str] = None):
+@app.get("/api/tools/quota-calculator", response_model=List[QuotaCalculation])
+def calculate_quota_exhaustion(
+    stream_name: Optional[str] = None,
+    window_days: int = Query(30, description="Burn rate window: 7, 30 or 90 days")
+):
     """
     Calculate estimated quota exhaustion date based on historical usage rate
     Returns calculations for all streams or a specific stream
+
+    Burn rates are maintained by the scraper in quota_burn_rates; the
+    exhaustion date range comes from the rate's 95% confidence band.
+    confidence_level keeps its original, quota-usage-based meaning;
+    rate_confidence rates how tight that band is.
     """
+    if window_days not in BURN_RATE_WINDOWS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"window_days must be one of {', '.join(map(str, BURN_RATE_WINDOWS))}"
+        )
+
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        results = []
+        with get_cursor() as cursor:
+            streams = fetch_latest_main_streams(cursor)
+            if stream_name:
+                streams = [stream for stream in streams if stream['stream_name'] == stream_name]
 
-        # Build query based on stream_name filter
-        where_clause = "AND s1.stream_name = %s" if stream_name else ""
-        params = [stream_name] if stream_name else []
+            cursor.execute("""
+                SELECT stream_name, window_days, rate_per_day, rate_low, rate_high, days_covered, samples
+                FROM quota_burn_rates
+                WHERE stream_name = ANY(%s)
+                ORDER BY stream_name, window_days
+            """, ([stream['stream_name'] for stream in streams],))
 
-        cursor.execute(f"""
-            WITH latest_data AS (
-                SELECT 
-                    stream_name,
-                    nomination_allocation,
-                    nominations_issued,
-                    nomination_spaces_remaining,
-                    timestamp
-                FROM stream_data
-                WHERE timestamp = (SELECT MAX(timestamp) FROM stream_data)
-                AND stream_type = 'main'
-                {where_clause}
-            ),
-            usage_rate AS (
-                SELECT 
-                    s1.stream_name,
-                    s1.nominations_issued - COALESCE(s2.nominations_issued, 0) as issued_in_period,
-                    EXTRACT(EPOCH FROM (s1.timestamp - s2.timestamp)) / 86400 as days_elapsed
-                FROM stream_data s1
-                LEFT JOIN LATERAL (
-                    SELECT nominations_issued, timestamp
-                    FROM stream_data s3
-                    WHERE s3.stream_name = s1.stream_name
-                    AND s3.timestamp < s1.timestamp
-                    AND s3.stream_type = 'main'
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                    OFFSET 29
-                ) s2 ON true
-                WHERE s1.timestamp = (SELECT MAX(timestamp) FROM stream_data)
-                AND s1.stream_type = 'main'
-                {where_clause}
-            )
-            SELECT 
-                l.stream_name,
-                l.nomination_allocation,
-                l.nominations_issued,
-                l.nomination_spaces_remaining,
-                l.timestamp,
-                CASE 
-                    WHEN u.days_elapsed > 0 THEN u.issued_in_period / u.days_elapsed
-                    ELSE 0
-                END as usage_rate_per_day
-            FROM latest_data l
-            LEFT JOIN usage_rate u ON l.stream_name = u.stream_name
-        """, params * 2 if stream_name else [])
+            # Unrounded rows: small rates must not round down to zero before
+            # the exhaustion math; only the response values are rounded
+            burn_rates = {}
+            for row in cursor.fetchall():
+                burn_rates.setdefault(row['stream_name'], {})[row['window_days']] = row
 
-        streams = cursor.fetchall()
-        cursor.close()
-        conn.close()
+        today = datetime.now().date()
 
+        def exhaustion_date(remaining, rate):
+            return (today + timedelta(days=int(remaining / rate))).isoformat() if rate and rate > 0 else None
+
+        results = []
         for stream in streams:
             remaining = stream['nomination_spaces_remaining'] or 0
-            rate = stream['usage_rate_per_day'] or 0
-            
+            rates = burn_rates.get(stream['stream_name'], {})
+            selected = rates.get(window_days)
+            rate = selected['rate_per_day'] if selected else 0
+            rate_low = selected['rate_low'] if selected else None
+            rate_high = selected['rate_high'] if selected else None
+
             if rate > 0 and remaining > 0:
                 days_to_exhaust = int(remaining / rate)
-                exhaustion_date = (datetime.now() + timedelta(days=days_to_exhaust)).date()
-                
-                # Determine confidence and warning level
+                estimated_date = exhaustion_date(remaining, rate)
+                earliest_date = exhaustion_date(remaining, rate_high)
+                latest_date = exhaustion_date(remaining, rate_low)
+
+                # Rate confidence from how tight the band is around the rate
+                if rate_high is None:
+                    rate_confidence = "low"
+                else:
+                    band_width = (rate_high - (rate_low or 0)) / rate
+                    if band_width <= 0.5:
+                        rate_confidence = "high"
+                    elif band_width <= 1.0:
+                        rate_confidence = "medium"
+                    else:
+                        rate_confidence = "low"
+
+                # Confidence and warning level from quota usage (unchanged
+                # meaning of confidence_level for existing clients)
                 if stream['nominations_issued'] and stream['nomination_allocation']:
                     usage_pct = stream['nominations_issued'] / stream['nomination_allocation']
                     if usage_pct > 0.85:
@@ -1335,8 +1503,8 @@ async def calculate_quota_exhaustion(stream_name: Optional[str] = None):
                     warning = "normal"
             else:
                 days_to_exhaust = None
-                exhaustion_date = None
-                confidence = "low"
+                estimated_date = earliest_date = latest_date = None
+                confidence = rate_confidence = "low"
                 warning = "normal"
 
             results.append(QuotaCalculation(
@@ -1345,9 +1513,26 @@ async def calculate_quota_exhaustion(stream_name: Optional[str] = None):
                 current_allocation=stream['nomination_allocation'] or 0,
                 usage_rate_per_day=round(rate, 2),
                 estimated_days_to_exhaust=days_to_exhaust,
-                estimated_exhaustion_date=exhaustion_date.isoformat() if exhaustion_date else None,
+                estimated_exhaustion_date=estimated_date,
                 confidence_level=confidence,
-                warning_level=warning
+                warning_level=warning,
+                window_days=window_days,
+                rate_confidence=rate_confidence,
+                usage_rate_low=round(rate_low, 2) if rate_low is not None else None,
+                usage_rate_high=round(rate_high, 2) if rate_high is not None else None,
+                earliest_exhaustion_date=earliest_date,
+                latest_exhaustion_date=latest_date,
+                burn_rates=[
+                    BurnRate(
+                        window_days=row['window_days'],
+                        rate_per_day=round(row['rate_per_day'], 2),
+                        rate_low=round(row['rate_low'], 2) if row['rate_low'] is not None else None,
+                        rate_high=round(row['rate_high'], 2) if row['rate_high'] is not None else None,
+                        days_covered=round(row['days_covered'], 1),
+                        samples=row['samples']
+                    )
+                    for row in rates.values()
+                ]
             ))
 
         return results
@@ -1357,7 +1542,7 @@ async def calculate_quota_exhaustion(stream_name: Optional[str] = None):
 
 
 @app.get("/api/tools/processing-timeline")
-async def estimate_processing_timeline(
+def estimate_processing_timeline(
     submission_date: str = Query(..., description="Submission date in YYYY-MM-DD format"),
     stream_name: Optional[str] = Query(None, description="Stream name (optional)")
 ):
@@ -1365,245 +1550,208 @@ async def estimate_processing_timeline(
     Estimate processing timeline based on current processing dates and historical speed
     """
     try:
-        from datetime import datetime, timedelta
-        from dateutil.relativedelta import relativedelta
-        
         submission = datetime.strptime(submission_date, "%Y-%m-%d").date()
-        
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        results = []
-
-        # Build query
-        where_clause = "AND stream_name = %s" if stream_name else ""
-        params = [stream_name] if stream_name else []
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
 
-        cursor.execute(f"""
-            WITH latest_processing AS (
-                SELECT 
+    try:
+        with get_cursor() as cursor:
+            # Build query
+            where_clause = "AND stream_name = %s" if stream_name else ""
+            params = [stream_name] if stream_name else []
+
+            # processing_date_parsed is filled by the scraper, so the
+            # timeline is plain date arithmetic (days_behind in days, speed in
+            # processing days per calendar day, 0.5 when there is no history)
+            cursor.execute(f"""
+                WITH latest_processing AS (
+                    SELECT
+                        stream_name,
+                        processing_date,
+                        processing_date_parsed,
+                        processing_date_parsed - %s::date as days_behind
+                    FROM stream_data_latest
+                    WHERE processing_date IS NOT NULL
+                    AND stream_type = 'main'
+                    {where_clause}
+                ),
+                processing_speed AS (
+                    SELECT
+                        s1.stream_name,
+                        (s1.processing_date_parsed - s2.processing_date_parsed)
+                            / (EXTRACT(EPOCH FROM (s1.timestamp - s2.timestamp))::float8 / 86400) as days_per_real_day
+                    FROM stream_data_latest s1
+                    JOIN LATERAL (
+                        SELECT processing_date_parsed, timestamp
+                        FROM stream_data s3
+                        WHERE s3.stream_name = s1.stream_name
+                        AND s3.processing_date_parsed IS NOT NULL
+                        AND s3.timestamp < s1.timestamp
+                        AND s3.stream_type = 'main'
+                        ORDER BY timestamp DESC
+                        LIMIT 1
+                        OFFSET 14
+                    ) s2 ON true
+                    WHERE s1.processing_date_parsed IS NOT NULL
+                    AND s1.stream_type = 'main'
+                    {where_clause}
+                ),
+                timeline AS (
+                    SELECT
+                        l.stream_name,
+                        l.processing_date,
+                        l.days_behind,
+                        COALESCE(NULLIF(s.days_per_real_day, 0), 0.5) as speed
+                    FROM latest_processing l
+                    LEFT JOIN processing_speed s ON l.stream_name = s.stream_name
+                ),
+                waits AS (
+                    SELECT
+                        *,
+                        CASE
+                            WHEN days_behind = 0 THEN 15
+                            WHEN days_behind < 0 OR speed > 0 THEN abs(days_behind) / speed
+                        END as wait_days
+                    FROM timeline
+                )
+                SELECT
                     stream_name,
-                    processing_date,
-                    timestamp
-                FROM stream_data
-                WHERE timestamp = (SELECT MAX(timestamp) FROM stream_data)
-                AND processing_date IS NOT NULL
-                AND stream_type = 'main'
-                {where_clause}
-            ),
-            processing_speed AS (
-                SELECT 
-                    s1.stream_name,
-                    s1.processing_date as current_date,
-                    s2.processing_date as past_date,
-                    EXTRACT(EPOCH FROM (s1.timestamp - s2.timestamp)) / 86400 as real_days,
-                    s1.processing_date::date - s2.processing_date::date as processing_days_advanced
-                FROM stream_data s1
-                LEFT JOIN LATERAL (
-                    SELECT processing_date, timestamp
-                    FROM stream_data s3
-                    WHERE s3.stream_name = s1.stream_name
-                    AND s3.processing_date IS NOT NULL
-                    AND s3.timestamp < s1.timestamp
-                    AND s3.stream_type = 'main'
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                    OFFSET 14
-                ) s2 ON true
-                WHERE s1.timestamp = (SELECT MAX(timestamp) FROM stream_data)
-                AND s1.processing_date IS NOT NULL
-                AND s1.stream_type = 'main'
-                {where_clause}
-            )
-            SELECT 
-                l.stream_name,
-                l.processing_date,
-                l.timestamp,
-                CASE 
-                    WHEN s.real_days > 0 THEN s.processing_days_advanced / s.real_days
-                    ELSE 0
-                END as days_per_real_day
-            FROM latest_processing l
-            LEFT JOIN processing_speed s ON l.stream_name = s.stream_name
-        """, params * 2 if stream_name else [])
-
-        streams = cursor.fetchall()
-        cursor.close()
-        conn.close()
-
-        for stream in streams:
-            # Extract just the date part before any parentheses or "for"
-            processing_date_str = stream['processing_date']
-            current_processing = None
-            
-            if processing_date_str:
-                # Remove everything after '(' or 'for'
-                processing_date_str = processing_date_str.split('(')[0].split(' for')[0].strip()
-                
-                # Try to find a date pattern like "Month Day, Year"
-                date_pattern = r'([A-Z][a-z]+)\s+(\d{1,2}),\s+(\d{4})'
-                match = re.search(date_pattern, processing_date_str)
-                
-                if match:
-                    try:
-                        current_processing = datetime.strptime(match.group(0), "%B %d, %Y").date()
-                    except ValueError:
-                        pass
-            
-            if current_processing:
-                days_behind = (current_processing - submission).days
-                speed = stream['days_per_real_day'] or 0.5  # Default to 0.5 if no data
-                
-                if days_behind < 0:
-                    # Submission is after current processing date
-                    estimated_months = abs(days_behind) / (speed * 30)
-                    estimated_date = datetime.now().date() + timedelta(days=int(abs(days_behind) / speed))
-                    notes = f"Your submission is ahead of current processing queue. Estimated wait based on processing speed of {speed:.2f} days/day."
-                elif days_behind == 0:
-                    estimated_months = 0.5
-                    estimated_date = datetime.now().date() + timedelta(days=15)
-                    notes = "Your application is near the current processing date. Processing may begin soon."
-                else:
-                    estimated_months = days_behind / (speed * 30)
-                    estimated_date = datetime.now().date() + timedelta(days=int(days_behind / speed)) if speed > 0 else None
-                    notes = f"Processing speed: approximately {speed:.2f} processing days per calendar day."
-            else:
-                estimated_months = None
-                estimated_date = None
+                    processing_date,
+                    days_behind,
+                    speed,
+                    CASE WHEN days_behind = 0 THEN 0.5 ELSE abs(days_behind) / (speed * 30) END as wait_months,
+                    CURRENT_DATE + trunc(wait_days)::int as estimated_date
+                FROM waits
+            """, [submission] + params * 2)
+
+            streams = cursor.fetchall()
+
+        results = []
+        for stream in streams:
+            days_behind = stream['days_behind']
+            speed = stream['speed']
+
+            if days_behind is None:
                 notes = "Processing date information not available for this stream."
+            elif days_behind < 0:
+                # Submission is after current processing date
+                notes = f"Your submission is ahead of current processing queue. Estimated wait based on processing speed of {speed:.2f} days/day."
+            elif days_behind == 0:
+                notes = "Your application is near the current processing date. Processing may begin soon."
+            else:
+                notes = f"Processing speed: approximately {speed:.2f} processing days per calendar day."
 
             results.append(ProcessingTimeline(
                 stream_name=stream['stream_name'],
                 submission_date=submission_date,
                 current_processing_date=stream['processing_date'],
-                estimated_wait_months=round(estimated_months, 1) if estimated_months else None,
-                estimated_processing_date=estimated_date.isoformat() if estimated_date else None,
+                estimated_wait_months=round(stream['wait_months'], 1) if stream['wait_months'] else None,
+                estimated_processing_date=stream['estimated_date'].isoformat() if stream['estimated_date'] else None,
                 notes=notes
             ))
 
         return results
 
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid date format: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Advice shown for each competitiveness level
+COMPETITIVENESS_RECOMMENDATIONS = {
+    "Very High": "Extremely competitive. Ensure your application is perfect and consider improving qualifications.",
+    "High": "Highly competitive. Strong applications recommended. Consider timing carefully.",
+    "Medium": "Moderate competition. Good chance with solid qualifications.",
+    "Low": "Favorable conditions. Good opportunity to apply if eligible."
+}
+
+
 @app.get("/api/tools/competitiveness", response_model=List[CompetitivenessScore])
-async def get_stream_competitiveness():
+def get_stream_competitiveness():
     """
     Calculate competitiveness score for each stream based on multiple factors:
     - Quota utilization rate
-    - EOI pool size changes
-    - Draw frequency
-    - Average invitation scores
+    - Applications backlog
+    - EOI pool size
+
+    Scored for all streams at once by the stream_competitiveness view
+    (see db/migrations/013_create_competitiveness.sql).
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        results = []
-
-        # Get latest stream data with quota info
-        cursor.execute("""
-            SELECT 
-                stream_name,
-                nomination_allocation,
-                nominations_issued,
-                nomination_spaces_remaining,
-                applications_to_process
-            FROM stream_data
-            WHERE timestamp = (SELECT MAX(timestamp) FROM stream_data)
-            AND stream_type = 'main'
-        """)
-        
-        streams = cursor.fetchall()
-
-        for stream in streams:
-            factors = {}
-            score = 50  # Base score
-            
-            # Factor 1: Quota utilization (higher = more competitive)
-            if stream['nomination_allocation'] and stream['nomination_allocation'] > 0:
-                usage_rate = (stream['nominations_issued'] or 0) / stream['nomination_allocation']
-                factors['quota_usage'] = f"{int(usage_rate * 100)}%"
-                
-                if usage_rate > 0.90:
-                    score += 25
-                    factors['quota_pressure'] = "Critical - nearly exhausted"
-                elif usage_rate > 0.75:
-                    score += 15
-                    factors['quota_pressure'] = "High - limited spaces"
-                elif usage_rate > 0.50:
-                    score += 5
-                    factors['quota_pressure'] = "Moderate"
-                else:
-                    score -= 10
-                    factors['quota_pressure'] = "Low - ample spaces available"
-
-            # Factor 2: Applications backlog
-            if stream['applications_to_process']:
-                backlog = stream['applications_to_process']
-                factors['backlog'] = f"{backlog} applications"
-                
-                if backlog > 500:
-                    score += 15
-                    factors['backlog_impact'] = "High processing volume"
-                elif backlog > 200:
-                    score += 5
-                    factors['backlog_impact'] = "Moderate volume"
-
-            # Factor 3: EOI pool size (if available)
+        with get_cursor() as cursor:
             cursor.execute("""
-                SELECT candidate_count
-                FROM eoi_pool
-                WHERE stream_name = %s
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (stream['stream_name'],))
-            
-            eoi_data = cursor.fetchone()
-            if eoi_data:
-                pool_size = eoi_data['candidate_count']
-                factors['eoi_pool_size'] = f"{pool_size} candidates"
-                
-                if pool_size > 300:
-                    score += 20
-                    factors['pool_pressure'] = "Very high competition"
-                elif pool_size > 150:
-                    score += 10
-                    factors['pool_pressure'] = "High competition"
-                elif pool_size > 50:
-                    score += 5
-                    factors['pool_pressure'] = "Moderate competition"
-
-            # Determine level and recommendation
-            if score >= 80:
-                level = "Very High"
-                recommendation = "Extremely competitive. Ensure your application is perfect and consider improving qualifications."
-            elif score >= 65:
-                level = "High"
-                recommendation = "Highly competitive. Strong applications recommended. Consider timing carefully."
-            elif score >= 50:
-                level = "Medium"
-                recommendation = "Moderate competition. Good chance with solid qualifications."
-            else:
-                level = "Low"
-                recommendation = "Favorable conditions. Good opportunity to apply if eligible."
+                SELECT stream_name, competitiveness_score, level, factors
+                FROM stream_competitiveness
+                ORDER BY competitiveness_score DESC, stream_name
+            """)
+            rows = cursor.fetchall()
 
-            results.append(CompetitivenessScore(
-                stream_name=stream['stream_name'],
+        return [
+            CompetitivenessScore(
+                stream_name=row['stream_name'],
                 stream_category="AAIP",
-                competitiveness_score=min(100, max(0, score)),
-                level=level,
-                factors=factors,
-                recommendation=recommendation
-            ))
+                competitiveness_score=row['competitiveness_score'],
+                level=row['level'],
+                factors=row['factors'],
+                recommendation=COMPETITIVENESS_RECOMMENDATIONS[row['level']]
+            )
+            for row in rows
+        ]
 
-        cursor.close()
-        conn.close()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Sort by score descending
-        results.sort(key=lambda x: x.competitiveness_score, reverse=True)
-        return results
+
+@app.get("/api/tools/competitiveness/history", response_model=List[CompetitivenessHistoryPoint])
+def get_competitiveness_history(
+    stream_name: Optional[str] = None,
+    start: Optional[str] = Query(None, description="Only scores for data at or after this time (ISO date/datetime)"),
+    end: Optional[str] = Query(None, description="Only scores for data at or before this time (ISO date/datetime)"),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Competitiveness score series, oldest first
+
+    One point per stream each time a scrape changed its inputs; timestamp
+    is the time of the newest stream/EOI data the score is based on. The
+    GREATEST() filters and sort are answered by the expression indexes of
+    migration 013.
+    """
+    try:
+        with get_cursor() as cursor:
+            query = """
+                SELECT stream_name,
+                       GREATEST(stream_timestamp, eoi_timestamp) as timestamp,
+                       competitiveness_score, level, factors
+                FROM competitiveness_scores
+                WHERE TRUE
+            """
+            params = []
+            if stream_name:
+                query += " AND stream_name = %s"
+                params.append(stream_name)
+            if start:
+                query += " AND GREATEST(stream_timestamp, eoi_timestamp) >= %s"
+                params.append(start)
+            if end:
+                query += " AND GREATEST(stream_timestamp, eoi_timestamp) <= %s"
+                params.append(end)
+            query += " ORDER BY timestamp DESC, stream_name LIMIT %s"
+            params.append(limit)
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+        rows.reverse()
+        return [
+            CompetitivenessHistoryPoint(
+                stream_name=row['stream_name'],
+                timestamp=row['timestamp'].isoformat(),
+                competitiveness_score=row['competitiveness_score'],
+                level=row['level'],
+                factors=row['factors']
+            )
+            for row in rows
+        ]
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1614,37 +1762,33 @@ async def get_stream_competitiveness():
 # ============================================================================
 
 @app.get("/api/job-bank/occupations", response_model=List[JobBankOccupation])
-async def get_job_bank_occupations(stream_name: Optional[str] = None):
+def get_job_bank_occupations(stream_name: Optional[str] = None):
     """
     Get latest Job Bank labor market data for occupations relevant to AAIP streams
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        where_clause = "AND aaip_stream = %s" if stream_name else ""
-        params = [stream_name] if stream_name else []
-        
-        cursor.execute(f"""
-            SELECT DISTINCT ON (noc_code)
-                noc_code,
-                occupation_title,
-                outlook,
-                job_openings,
-                job_seekers,
-                median_wage,
-                outlook_description,
-                aaip_stream,
-                timestamp
-            FROM job_bank_data
-            WHERE timestamp = (SELECT MAX(timestamp) FROM job_bank_data)
-            {where_clause}
-            ORDER BY noc_code, timestamp DESC
-        """, params)
+        with get_cursor() as cursor:
+            where_clause = "AND aaip_stream = %s" if stream_name else ""
+            params = [stream_name] if stream_name else []
+        
+            cursor.execute(f"""
+                SELECT DISTINCT ON (noc_code)
+                    noc_code,
+                    occupation_title,
+                    outlook,
+                    job_openings,
+                    job_seekers,
+                    median_wage,
+                    outlook_description,
+                    aaip_stream,
+                    timestamp
+                FROM job_bank_data
+                WHERE timestamp = (SELECT MAX(timestamp) FROM job_bank_data)
+                {where_clause}
+                ORDER BY noc_code, timestamp DESC
+            """, params)
         
-        rows = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            rows = cursor.fetchall()
         
         if not rows:
             # Return empty list if no data yet
@@ -1673,152 +1817,138 @@ async def get_job_bank_occupations(stream_name: Optional[str] = None):
 
 
 @app.get("/api/job-bank/insights", response_model=List[LaborMarketInsight])
-async def get_labor_market_insights():
+def get_labor_market_insights():
     """
     Generate insights by correlating Job Bank labor market data with AAIP streams
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        insights = []
-        current_time = datetime.now()
-        
-        # Check if table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'job_bank_data'
-            )
-        """)
-        
-        if not cursor.fetchone()['exists']:
-            cursor.close()
-            conn.close()
+        if not schema_registry.has_table('job_bank_data'):
             return []
+
+        with get_cursor() as cursor:
+            insights = []
+            current_time = datetime.now()
         
-        # Get latest Job Bank data grouped by stream
-        cursor.execute("""
-            SELECT 
-                aaip_stream,
-                COUNT(*) as occupation_count,
-                AVG(CASE WHEN outlook = 'Good' THEN 1 
-                         WHEN outlook = 'Fair' THEN 0.5 
-                         ELSE 0 END) as avg_outlook_score,
-                SUM(job_openings) as total_openings,
-                SUM(job_seekers) as total_seekers,
-                STRING_AGG(occupation_title, ', ' ORDER BY job_openings DESC) as top_occupations
-            FROM job_bank_data
-            WHERE timestamp = (SELECT MAX(timestamp) FROM job_bank_data)
-            GROUP BY aaip_stream
-            HAVING COUNT(*) > 0
-        """)
-        
-        streams_data = cursor.fetchall()
-        
-        for stream in streams_data:
-            stream_name = stream['aaip_stream']
-            outlook_score = float(stream['avg_outlook_score']) if stream['avg_outlook_score'] else 0
-            openings = stream['total_openings'] or 0
-            seekers = stream['total_seekers'] or 1  # Avoid division by zero
-            
-            # Calculate supply/demand ratio
-            supply_demand_ratio = openings / seekers if seekers > 0 else 0
-            
-            # Generate insights based on data
-            if outlook_score > 0.7:  # Good outlook
-                insights.append({
-                    "insight_type": "high_demand",
-                    "stream_affected": stream_name,
-                    "occupation_category": "Multiple occupations",
-                    "trend_description": f"Labor market outlook is positive for {stream_name} occupations",
-                    "impact_analysis": f"With {openings} job openings and strong outlook, this stream may see continued demand for nominations.",
-                    "recommendation": "Good time to prepare applications for this stream if you have relevant experience.",
-                    "generated_at": current_time.isoformat()
-                })
-            elif supply_demand_ratio > 1.2:  # More openings than seekers
-                insights.append({
-                    "insight_type": "growth",
-                    "stream_affected": stream_name,
-                    "occupation_category": "Multiple occupations",
-                    "trend_description": f"Strong labor demand in {stream_name} related occupations",
-                    "impact_analysis": f"Job openings ({openings}) exceed job seekers ({seekers}), indicating labor shortage.",
-                    "recommendation": "Stream may prioritize these occupations in future draws.",
-                    "generated_at": current_time.isoformat()
-                })
-            elif supply_demand_ratio < 0.8 and seekers > 100:  # More seekers than openings
-                insights.append({
-                    "insight_type": "decline",
-                    "stream_affected": stream_name,
-                    "occupation_category": "Multiple occupations",
-                    "trend_description": f"Increased competition in {stream_name} labor market",
-                    "impact_analysis": f"Job seekers ({seekers}) outnumber openings ({openings}), suggesting higher competition.",
-                    "recommendation": "Consider strengthening your profile with additional qualifications.",
-                    "generated_at": current_time.isoformat()
-                })
-        
-        # Compare with previous period if available
-        cursor.execute("""
-            SELECT DISTINCT timestamp
-            FROM job_bank_data
-            ORDER BY timestamp DESC
-            LIMIT 2
-        """)
-        
-        timestamps = cursor.fetchall()
-        
-        if len(timestamps) >= 2:
-            # Trend analysis between two time periods
+            # Get latest Job Bank data grouped by stream
             cursor.execute("""
-                WITH current_data AS (
-                    SELECT aaip_stream, SUM(job_openings) as openings
-                    FROM job_bank_data
-                    WHERE timestamp = %s
-                    GROUP BY aaip_stream
-                ),
-                previous_data AS (
-                    SELECT aaip_stream, SUM(job_openings) as openings
-                    FROM job_bank_data
-                    WHERE timestamp = %s
-                    GROUP BY aaip_stream
-                )
                 SELECT 
-                    c.aaip_stream,
-                    c.openings as current_openings,
-                    p.openings as previous_openings,
-                    ROUND(((c.openings - p.openings)::numeric / p.openings * 100), 1) as change_pct
-                FROM current_data c
-                JOIN previous_data p ON c.aaip_stream = p.aaip_stream
-                WHERE p.openings > 0
-                AND ABS((c.openings - p.openings)::numeric / p.openings) > 0.15
-            """, (timestamps[0]['timestamp'], timestamps[1]['timestamp']))
+                    aaip_stream,
+                    COUNT(*) as occupation_count,
+                    AVG(CASE WHEN outlook = 'Good' THEN 1 
+                             WHEN outlook = 'Fair' THEN 0.5 
+                             ELSE 0 END) as avg_outlook_score,
+                    SUM(job_openings) as total_openings,
+                    SUM(job_seekers) as total_seekers,
+                    STRING_AGG(occupation_title, ', ' ORDER BY job_openings DESC) as top_occupations
+                FROM job_bank_data
+                WHERE timestamp = (SELECT MAX(timestamp) FROM job_bank_data)
+                GROUP BY aaip_stream
+                HAVING COUNT(*) > 0
+            """)
+        
+            streams_data = cursor.fetchall()
+        
+            for stream in streams_data:
+                stream_name = stream['aaip_stream']
+                outlook_score = float(stream['avg_outlook_score']) if stream['avg_outlook_score'] else 0
+                openings = stream['total_openings'] or 0
+                seekers = stream['total_seekers'] or 1  # Avoid division by zero
             
-            trends = cursor.fetchall()
+                # Calculate supply/demand ratio
+                supply_demand_ratio = openings / seekers if seekers > 0 else 0
             
-            for trend in trends:
-                change_pct = float(trend['change_pct'])
-                if change_pct > 15:
+                # Generate insights based on data
+                if outlook_score > 0.7:  # Good outlook
+                    insights.append({
+                        "insight_type": "high_demand",
+                        "stream_affected": stream_name,
+                        "occupation_category": "Multiple occupations",
+                        "trend_description": f"Labor market outlook is positive for {stream_name} occupations",
+                        "impact_analysis": f"With {openings} job openings and strong outlook, this stream may see continued demand for nominations.",
+                        "recommendation": "Good time to prepare applications for this stream if you have relevant experience.",
+                        "generated_at": current_time.isoformat()
+                    })
+                elif supply_demand_ratio > 1.2:  # More openings than seekers
                     insights.append({
                         "insight_type": "growth",
-                        "stream_affected": trend['aaip_stream'],
-                        "occupation_category": "Tracked occupations",
-                        "trend_description": f"Job openings increased by {int(change_pct)}% in recent period",
-                        "impact_analysis": f"Growth from {trend['previous_openings']} to {trend['current_openings']} openings indicates expanding labor demand.",
-                        "recommendation": f"{trend['aaip_stream']} may see increased nomination activity.",
+                        "stream_affected": stream_name,
+                        "occupation_category": "Multiple occupations",
+                        "trend_description": f"Strong labor demand in {stream_name} related occupations",
+                        "impact_analysis": f"Job openings ({openings}) exceed job seekers ({seekers}), indicating labor shortage.",
+                        "recommendation": "Stream may prioritize these occupations in future draws.",
                         "generated_at": current_time.isoformat()
                     })
-                elif change_pct < -15:
+                elif supply_demand_ratio < 0.8 and seekers > 100:  # More seekers than openings
                     insights.append({
                         "insight_type": "decline",
-                        "stream_affected": trend['aaip_stream'],
-                        "occupation_category": "Tracked occupations",
-                        "trend_description": f"Job openings decreased by {int(abs(change_pct))}% in recent period",
-                        "impact_analysis": f"Decline from {trend['previous_openings']} to {trend['current_openings']} openings may affect nomination priorities.",
-                        "recommendation": "Monitor for potential changes in draw frequency or eligibility.",
+                        "stream_affected": stream_name,
+                        "occupation_category": "Multiple occupations",
+                        "trend_description": f"Increased competition in {stream_name} labor market",
+                        "impact_analysis": f"Job seekers ({seekers}) outnumber openings ({openings}), suggesting higher competition.",
+                        "recommendation": "Consider strengthening your profile with additional qualifications.",
                         "generated_at": current_time.isoformat()
                     })
         
-        cursor.close()
-        conn.close()
+            # Compare with previous period if available
+            cursor.execute("""
+                SELECT DISTINCT timestamp
+                FROM job_bank_data
+                ORDER BY timestamp DESC
+                LIMIT 2
+            """)
+        
+            timestamps = cursor.fetchall()
+        
+            if len(timestamps) >= 2:
+                # Trend analysis between two time periods
+                cursor.execute("""
+                    WITH current_data AS (
+                        SELECT aaip_stream, SUM(job_openings) as openings
+                        FROM job_bank_data
+                        WHERE timestamp = %s
+                        GROUP BY aaip_stream
+                    ),
+                    previous_data AS (
+                        SELECT aaip_stream, SUM(job_openings) as openings
+                        FROM job_bank_data
+                        WHERE timestamp = %s
+                        GROUP BY aaip_stream
+                    )
+                    SELECT 
+                        c.aaip_stream,
+                        c.openings as current_openings,
+                        p.openings as previous_openings,
+                        ROUND(((c.openings - p.openings)::numeric / p.openings * 100), 1) as change_pct
+                    FROM current_data c
+                    JOIN previous_data p ON c.aaip_stream = p.aaip_stream
+                    WHERE p.openings > 0
+                    AND ABS((c.openings - p.openings)::numeric / p.openings) > 0.15
+                """, (timestamps[0]['timestamp'], timestamps[1]['timestamp']))
+            
+                trends = cursor.fetchall()
+            
+                for trend in trends:
+                    change_pct = float(trend['change_pct'])
+                    if change_pct > 15:
+                        insights.append({
+                            "insight_type": "growth",
+                            "stream_affected": trend['aaip_stream'],
+                            "occupation_category": "Tracked occupations",
+                            "trend_description": f"Job openings increased by {int(change_pct)}% in recent period",
+                            "impact_analysis": f"Growth from {trend['previous_openings']} to {trend['current_openings']} openings indicates expanding labor demand.",
+                            "recommendation": f"{trend['aaip_stream']} may see increased nomination activity.",
+                            "generated_at": current_time.isoformat()
+                        })
+                    elif change_pct < -15:
+                        insights.append({
+                            "insight_type": "decline",
+                            "stream_affected": trend['aaip_stream'],
+                            "occupation_category": "Tracked occupations",
+                            "trend_description": f"Job openings decreased by {int(abs(change_pct))}% in recent period",
+                            "impact_analysis": f"Decline from {trend['previous_openings']} to {trend['current_openings']} openings may affect nomination priorities.",
+                            "recommendation": "Monitor for potential changes in draw frequency or eligibility.",
+                            "generated_at": current_time.isoformat()
+                        })
         
         return [LaborMarketInsight(**insight) for insight in insights]
         
@@ -1830,69 +1960,53 @@ async def get_labor_market_insights():
 
 
 @app.get("/api/labor-market/quarterly")
-async def get_quarterly_labor_market():
+def get_quarterly_labor_market():
     """
     Get quarterly labor market context data for all streams
     Returns the most recent quarterly update
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'labor_market_quarterly'
-            )
-        """)
-        
-        if not cursor.fetchone()['exists']:
-            cursor.close()
-            conn.close()
+        if not schema_registry.has_table('labor_market_quarterly'):
             return {
                 "quarter": None,
                 "update_date": None,
                 "streams": [],
                 "message": "No quarterly data available yet. Run quarterly collector first."
             }
+
+        with get_cursor() as cursor:
+            # Get the latest quarter
+            cursor.execute("""
+                SELECT quarter, update_date
+                FROM labor_market_quarterly
+                ORDER BY generated_at DESC
+                LIMIT 1
+            """)
         
-        # Get the latest quarter
-        cursor.execute("""
-            SELECT quarter, update_date
-            FROM labor_market_quarterly
-            ORDER BY generated_at DESC
-            LIMIT 1
-        """)
-        
-        latest = cursor.fetchone()
-        if not latest:
-            cursor.close()
-            conn.close()
-            return {
-                "quarter": None,
-                "update_date": None,
-                "streams": [],
-                "message": "No data available"
-            }
-        
-        # Get all streams for the latest quarter
-        cursor.execute("""
-            SELECT 
-                stream_name,
-                demand_level,
-                trend,
-                sectors,
-                noc_codes,
-                generated_at
-            FROM labor_market_quarterly
-            WHERE quarter = %s
-            ORDER BY stream_name
-        """, (latest['quarter'],))
+            latest = cursor.fetchone()
+            if not latest:
+                return {
+                    "quarter": None,
+                    "update_date": None,
+                    "streams": [],
+                    "message": "No data available"
+                }
         
-        streams = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            # Get all streams for the latest quarter
+            cursor.execute("""
+                SELECT 
+                    stream_name,
+                    demand_level,
+                    trend,
+                    sectors,
+                    noc_codes,
+                    generated_at
+                FROM labor_market_quarterly
+                WHERE quarter = %s
+                ORDER BY stream_name
+            """, (latest['quarter'],))
+        
+            streams = cursor.fetchall()
         
         return {
             "quarter": latest['quarter'],
@@ -1921,74 +2035,58 @@ async def get_quarterly_labor_market():
 
 
 @app.get("/api/alberta-economy/indicators")
-async def get_alberta_economy_indicators():
+def get_alberta_economy_indicators():
     """
     Get latest Alberta economic indicators
     Returns current snapshot and recent trends
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'alberta_economy'
-            )
-        """)
-        
-        if not cursor.fetchone()['exists']:
-            cursor.close()
-            conn.close()
+        if not schema_registry.has_table('alberta_economy'):
             return {
                 "current": None,
                 "trends": [],
                 "message": "No economic data available yet. Run alberta_economy_collector.py first."
             }
+
+        with get_cursor() as cursor:
+            # Get latest data point
+            cursor.execute("""
+                SELECT 
+                    timestamp,
+                    unemployment_rate,
+                    gdp_growth,
+                    population_growth,
+                    oil_price,
+                    oil_price_trend,
+                    insights
+                FROM alberta_economy
+                ORDER BY timestamp DESC
+                LIMIT 1
+            """)
         
-        # Get latest data point
-        cursor.execute("""
-            SELECT 
-                timestamp,
-                unemployment_rate,
-                gdp_growth,
-                population_growth,
-                oil_price,
-                oil_price_trend,
-                insights
-            FROM alberta_economy
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """)
-        
-        latest = cursor.fetchone()
+            latest = cursor.fetchone()
         
-        if not latest:
-            cursor.close()
-            conn.close()
-            return {
-                "current": None,
-                "trends": [],
-                "message": "No data available"
-            }
+            if not latest:
+                return {
+                    "current": None,
+                    "trends": [],
+                    "message": "No data available"
+                }
         
-        # Get historical data for trends (last 6 months)
-        cursor.execute("""
-            SELECT 
-                timestamp,
-                unemployment_rate,
-                gdp_growth,
-                population_growth,
-                oil_price
-            FROM alberta_economy
-            WHERE timestamp >= CURRENT_DATE - INTERVAL '6 months'
-            ORDER BY timestamp ASC
-        """)
+            # Get historical data for trends (last 6 months)
+            cursor.execute("""
+                SELECT 
+                    timestamp,
+                    unemployment_rate,
+                    gdp_growth,
+                    population_growth,
+                    oil_price
+                FROM alberta_economy
+                WHERE timestamp >= CURRENT_DATE - INTERVAL '6 months'
+                ORDER BY timestamp ASC
+            """)
         
-        trends = cursor.fetchall()
-        cursor.close()
-        conn.close()
+            trends = cursor.fetchall()
         
         return {
             "current": {
@@ -2022,64 +2120,49 @@ async def get_alberta_economy_indicators():
 
 
 @app.get("/api/express-entry/comparison")
-async def get_express_entry_comparison():
+def get_express_entry_comparison():
     """
     Get Express Entry vs AAIP comparison data
     Returns latest EE draws and comparison insights
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if table exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'express_entry_draws'
-            )
-        """)
-        
-        if not cursor.fetchone()['exists']:
-            cursor.close()
-            conn.close()
+        if not schema_registry.has_table('express_entry_draws'):
             return {
                 "express_entry": [],
                 "aaip": [],
                 "comparison": None,
                 "message": "No Express Entry data available. Run express_entry_collector.py first."
             }
+
+        with get_cursor() as cursor:
+            # Get latest EE draws (separate PNP and general)
+            cursor.execute("""
+                SELECT 
+                    draw_date,
+                    draw_number,
+                    program,
+                    invitations_issued,
+                    crs_cutoff
+                FROM express_entry_draws
+                ORDER BY draw_date DESC
+                LIMIT 20
+            """)
         
-        # Get latest EE draws (separate PNP and general)
-        cursor.execute("""
-            SELECT 
-                draw_date,
-                draw_number,
-                program,
-                invitations_issued,
-                crs_cutoff
-            FROM express_entry_draws
-            ORDER BY draw_date DESC
-            LIMIT 20
-        """)
-        
-        ee_draws = cursor.fetchall()
-        
-        # Get latest AAIP draws for comparison
-        cursor.execute("""
-            SELECT 
-                draw_date,
-                stream_category,
-                min_score as crs_score,
-                invitations_issued
-            FROM aaip_draws
-            ORDER BY draw_date DESC
-            LIMIT 10
-        """)
+            ee_draws = cursor.fetchall()
         
-        aaip_draws = cursor.fetchall()
+            # Get latest AAIP draws for comparison
+            cursor.execute("""
+                SELECT 
+                    draw_date,
+                    stream_category,
+                    min_score as crs_score,
+                    invitations_issued
+                FROM aaip_draws
+                ORDER BY draw_date DESC
+                LIMIT 10
+            """)
         
-        cursor.close()
-        conn.close()
+            aaip_draws = cursor.fetchall()
         
         # Separate EE draws by type
         pnp_draws = [d for d in ee_draws if 'Provincial' in d['program']]
@@ -2190,42 +2273,28 @@ async def get_express_entry_comparison():
 
 
 @app.get("/api/trends/analysis")
-async def get_trend_analysis():
+def get_trend_analysis():
     """
     Get comprehensive historical trend analysis
     Returns draw frequency, CRS trends, seasonal patterns, and success probabilities
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Check if trend analysis exists
-        cursor.execute("""
-            SELECT EXISTS (
-                SELECT FROM information_schema.tables 
-                WHERE table_name = 'trend_analysis'
-            )
-        """)
-        
-        if not cursor.fetchone()['exists']:
-            cursor.close()
-            conn.close()
+        if not schema_registry.has_table('trend_analysis'):
             return {
                 "message": "No trend analysis available. Run trend_analysis_engine.py first.",
                 "data": None
             }
+
+        with get_cursor() as cursor:
+            # Get latest trend analysis
+            cursor.execute("""
+                SELECT report_data, analysis_date, created_at
+                FROM trend_analysis
+                ORDER BY analysis_date DESC
+                LIMIT 1
+            """)
         
-        # Get latest trend analysis
-        cursor.execute("""
-            SELECT report_data, analysis_date, created_at
-            FROM trend_analysis
-            ORDER BY analysis_date DESC
-            LIMIT 1
-        """)
-        
-        result = cursor.fetchone()
-        cursor.close()
-        conn.close()
+            result = cursor.fetchone()
         
         if not result:
             return {
@@ -2247,40 +2316,36 @@ async def get_trend_analysis():
 
 
 @app.get("/api/trends/prediction")
-async def get_draw_prediction():
+def get_draw_prediction():
     """
     Predict next draw date and CRS range based on historical patterns
     Note: This is an ESTIMATE based on patterns, not a guarantee
     """
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Get latest draws per stream
-        cursor.execute("""
-            SELECT DISTINCT ON (stream_category)
-                stream_category,
-                draw_date,
-                min_score,
-                invitations_issued
-            FROM aaip_draws
-            WHERE draw_date IS NOT NULL
-            ORDER BY stream_category, draw_date DESC
-        """)
+        with get_cursor() as cursor:
+            # Get latest draws per stream
+            cursor.execute("""
+                SELECT DISTINCT ON (stream_category)
+                    stream_category,
+                    draw_date,
+                    min_score,
+                    invitations_issued
+                FROM aaip_draws
+                WHERE draw_date IS NOT NULL
+                ORDER BY stream_category, draw_date DESC
+            """)
         
-        latest_draws = cursor.fetchall()
+            latest_draws = cursor.fetchall()
         
-        # Get trend analysis for frequency data
-        cursor.execute("""
-            SELECT report_data
-            FROM trend_analysis
-            ORDER BY analysis_date DESC
-            LIMIT 1
-        """)
+            # Get trend analysis for frequency data
+            cursor.execute("""
+                SELECT report_data
+                FROM trend_analysis
+                ORDER BY analysis_date DESC
+                LIMIT 1
+            """)
         
-        trend_result = cursor.fetchone()
-        cursor.close()
-        conn.close()
+            trend_result = cursor.fetchone()
         
         if not trend_result:
             return {
@@ -2358,9 +2423,11 @@ class AAIPNews(BaseModel):
 
 @app.get("/api/news")
 async def get_aaip_news(
+    response: Response,
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
-    lang: Optional[str] = Query(None, regex="^(en|zh)$")
+    lang: Optional[str] = Query(None, regex="^(en|zh)$"),
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page")
 ):
     """
     Get AAIP news/updates from official government website
@@ -2368,32 +2435,34 @@ async def get_aaip_news(
 
     Parameters:
     - limit: Maximum number of articles to return (default: 20, max: 100)
-    - offset: Number of articles to skip (for pagination)
+    - offset: Number of articles to skip (for pagination, ignored when cursor is given)
     - lang: Optional language filter ('en' or 'zh') - doesn't filter, just for client reference
+    - cursor: next_cursor of the previous page
     """
+    position = decode_cursor(page_cursor, NEWS_CURSOR_TYPES) if page_cursor else None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        # Get news articles
         query = """
             SELECT
                 id, title_en, title_zh, content_en, content_zh,
                 published_date, source_url, scraped_at, updated_at
             FROM aaip_news
-            ORDER BY published_date DESC
-            LIMIT %s OFFSET %s
         """
-
-        cursor.execute(query, (limit, offset))
-        news = cursor.fetchall()
-
-        # Get total count
-        cursor.execute("SELECT COUNT(*) as total FROM aaip_news")
-        total = cursor.fetchone()['total']
-
-        cursor.close()
-        conn.close()
+        params = []
+        if position:
+            condition, params = seek_condition(NEWS_PAGE_KEYS, position)
+            query += f" WHERE {condition}"
+        query += f" ORDER BY {order_by(NEWS_PAGE_KEYS)} LIMIT %s OFFSET %s"
+        params.extend([limit + 1, 0 if position else offset])
+
+        # Page and total count are independent, so fetch them concurrently
+        news, count = await asyncio.gather(
+            fetch_all(query, params, label='get_aaip_news.page'),
+            fetch_one("SELECT COUNT(*) as total FROM aaip_news", label='get_aaip_news.count')
+        )
+        total = count['total']
+        cursor_next = next_cursor(news, limit, ["published_date", "id"])
+        if cursor_next:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_next
 
         # Convert dates to strings for JSON serialization
         for article in news:
@@ -2405,6 +2474,7 @@ async def get_aaip_news(
             "total": total,
             "limit": limit,
             "offset": offset,
+            "next_cursor": cursor_next,
             "news": news
         }
 
@@ -2416,26 +2486,21 @@ async def get_aaip_news(
 
 
 @app.get("/api/news/latest")
-async def get_latest_news(count: int = Query(5, ge=1, le=20)):
+def get_latest_news(count: int = Query(5, ge=1, le=20)):
     """Get the most recent AAIP news articles"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-
-        query = """
-            SELECT
-                id, title_en, title_zh, content_en, content_zh,
-                published_date, source_url, scraped_at
-            FROM aaip_news
-            ORDER BY published_date DESC
-            LIMIT %s
-        """
-
-        cursor.execute(query, (count,))
-        news = cursor.fetchall()
+        with get_cursor() as cursor:
+            query = """
+                SELECT
+                    id, title_en, title_zh, content_en, content_zh,
+                    published_date, source_url, scraped_at
+                FROM aaip_news
+                ORDER BY published_date DESC
+                LIMIT %s
+            """
 
-        cursor.close()
-        conn.close()
+            cursor.execute(query, (count,))
+            news = cursor.fetchall()
 
         # Convert dates to strings
         for article in news:
@@ -2474,73 +2539,83 @@ class SuccessStorySubmit(BaseModel):
 
 
 @app.get("/api/success-stories")
-async def get_success_stories(
+def get_success_stories(
+    response: Response,
     stream: Optional[str] = None,
     story_type: Optional[str] = None,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    page_cursor: Optional[str] = Query(None, alias="cursor", description="next_cursor of the previous page")
 ):
-    """Get approved success stories from community members"""
+    """
+    Get approved success stories from community members
+
+    Pass next_cursor as ?cursor= for the next page; offset is ignored then.
+    """
+    position = decode_cursor(page_cursor, STORIES_CURSOR_TYPES) if page_cursor else None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        query = """
-            SELECT 
-                id, story_type, aaip_stream, timeline_submitted, timeline_nominated,
-                timeline_pr_approved, noc_code, crs_score, work_permit_type, city,
-                story_text, tips, challenges,
-                CASE WHEN is_anonymous THEN 'Anonymous' ELSE author_name END as author_name,
-                helpful_count, created_at, approved_at
-            FROM success_stories
-            WHERE status = 'approved'
-        """
-        params = []
-        param_count = 1
-        
-        if stream:
-            query += f" AND aaip_stream = ${param_count}"
-            params.append(stream)
-            param_count += 1
+        with get_cursor() as cursor:
+            query = """
+                SELECT 
+                    id, story_type, aaip_stream, timeline_submitted, timeline_nominated,
+                    timeline_pr_approved, noc_code, crs_score, work_permit_type, city,
+                    story_text, tips, challenges,
+                    CASE WHEN is_anonymous THEN 'Anonymous' ELSE author_name END as author_name,
+                    helpful_count, created_at, approved_at,
+                    COALESCE(approved_at, created_at) as page_key
+                FROM success_stories
+                WHERE status = 'approved'
+            """
+            params = []
+        
+            if stream:
+                query += " AND aaip_stream = %s"
+                params.append(stream)
             
-        if story_type:
-            query += f" AND story_type = ${param_count}"
-            params.append(story_type)
-            param_count += 1
-        
-        query += f" ORDER BY approved_at DESC LIMIT ${param_count} OFFSET ${param_count + 1}"
-        params.extend([limit, offset])
-        
-        cursor.execute(query, params)
-        stories = cursor.fetchall()
-        
-        # Get total count
-        count_query = "SELECT COUNT(*) as total FROM success_stories WHERE status = 'approved'"
-        count_params = []
-        if stream:
-            count_query += " AND aaip_stream = %s"
-            count_params.append(stream)
-        if story_type:
-            count_query += " AND story_type = %s"
-            count_params.append(story_type)
+            if story_type:
+                query += " AND story_type = %s"
+                params.append(story_type)
+
+            if position:
+                condition, seek_params = seek_condition(STORIES_PAGE_KEYS, position)
+                query += f" AND {condition}"
+                params.extend(seek_params)
+        
+            query += f" ORDER BY {order_by(STORIES_PAGE_KEYS)} LIMIT %s OFFSET %s"
+            params.extend([limit + 1, 0 if position else offset])
+        
+            cursor.execute(query, params)
+            stories = cursor.fetchall()
+            cursor_next = next_cursor(stories, limit, ["page_key", "id"])
+        
+            # Get total count
+            count_query = "SELECT COUNT(*) as total FROM success_stories WHERE status = 'approved'"
+            count_params = []
+            if stream:
+                count_query += " AND aaip_stream = %s"
+                count_params.append(stream)
+            if story_type:
+                count_query += " AND story_type = %s"
+                count_params.append(story_type)
             
-        cursor.execute(count_query, count_params)
-        total = cursor.fetchone()['total']
-        
-        cursor.close()
-        conn.close()
+            cursor.execute(count_query, count_params)
+            total = cursor.fetchone()['total']
         
         # Convert dates to strings
         for story in stories:
+            del story['page_key']
             for date_field in ['timeline_submitted', 'timeline_nominated', 'timeline_pr_approved', 'created_at', 'approved_at']:
                 if story.get(date_field):
                     story[date_field] = story[date_field].isoformat()
         
+        if cursor_next:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_next
         return {
             "stories": stories,
             "total": total,
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": cursor_next
         }
         
     except Exception as e:
@@ -2548,35 +2623,30 @@ async def get_success_stories(
 
 
 @app.post("/api/success-stories")
-async def submit_success_story(story: SuccessStorySubmit):
+def submit_success_story(story: SuccessStorySubmit):
     """Submit a new success story (auto-approved for now)"""
     try:
         # Validation
         if not story.story_text or len(story.story_text) < 50:
             raise HTTPException(status_code=400, detail="Story text must be at least 50 characters")
         
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with get_cursor(commit=True) as cursor:
+            cursor.execute("""
+                INSERT INTO success_stories (
+                    story_type, aaip_stream, timeline_submitted, timeline_nominated,
+                    timeline_pr_approved, noc_code, crs_score, work_permit_type, city,
+                    story_text, tips, challenges, author_name, is_anonymous, email, status,
+                    approved_at
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'approved', NOW())
+                RETURNING id
+            """, (
+                story.story_type, story.aaip_stream, story.timeline_submitted, 
+                story.timeline_nominated, story.timeline_pr_approved, story.noc_code,
+                story.crs_score, story.work_permit_type, story.city, story.story_text,
+                story.tips, story.challenges, story.author_name, story.is_anonymous, story.email
+            ))
         
-        cursor.execute("""
-            INSERT INTO success_stories (
-                story_type, aaip_stream, timeline_submitted, timeline_nominated,
-                timeline_pr_approved, noc_code, crs_score, work_permit_type, city,
-                story_text, tips, challenges, author_name, is_anonymous, email, status,
-                approved_at
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'approved', NOW())
-            RETURNING id
-        """, (
-            story.story_type, story.aaip_stream, story.timeline_submitted, 
-            story.timeline_nominated, story.timeline_pr_approved, story.noc_code,
-            story.crs_score, story.work_permit_type, story.city, story.story_text,
-            story.tips, story.challenges, story.author_name, story.is_anonymous, story.email
-        ))
-        
-        result = cursor.fetchone()
-        conn.commit()
-        cursor.close()
-        conn.close()
+            result = cursor.fetchone()
         
         return {
             "message": "Success story submitted and approved!",
@@ -2588,30 +2658,22 @@ async def submit_success_story(story: SuccessStorySubmit):
 
 
 @app.post("/api/success-stories/{story_id}/helpful")
-async def mark_story_helpful(story_id: int):
+def mark_story_helpful(story_id: int):
     """Mark a story as helpful"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Increment helpful count
-        cursor.execute("""
-            UPDATE success_stories 
-            SET helpful_count = helpful_count + 1 
-            WHERE id = %s 
-            RETURNING helpful_count
-        """, (story_id,))
-        
-        result = cursor.fetchone()
+        with get_cursor(commit=True) as cursor:
+            # Increment helpful count
+            cursor.execute("""
+                UPDATE success_stories 
+                SET helpful_count = helpful_count + 1 
+                WHERE id = %s 
+                RETURNING helpful_count
+            """, (story_id,))
         
-        if not result:
-            cursor.close()
-            conn.close()
-            raise HTTPException(status_code=404, detail="Story not found")
+            result = cursor.fetchone()
         
-        conn.commit()
-        cursor.close()
-        conn.close()
+            if not result:
+                raise HTTPException(status_code=404, detail="Story not found")
         
         return {"helpful_count": result['helpful_count']}
         
@@ -2622,48 +2684,43 @@ async def mark_story_helpful(story_id: int):
 
 
 @app.get("/api/success-stories/stats")
-async def get_success_stories_stats():
+def get_success_stories_stats():
     """Get statistics about success stories"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        # Overall stats
-        cursor.execute("""
-            SELECT 
-                COUNT(*) as total_stories,
-                COUNT(DISTINCT aaip_stream) as streams_covered,
-                AVG(
-                    CASE 
-                        WHEN timeline_nominated IS NOT NULL AND timeline_submitted IS NOT NULL 
-                        THEN EXTRACT(DAY FROM (timeline_nominated - timeline_submitted))
-                    END
-                ) as avg_days_to_nomination,
-                AVG(
-                    CASE 
-                        WHEN timeline_pr_approved IS NOT NULL AND timeline_nominated IS NOT NULL 
-                        THEN EXTRACT(DAY FROM (timeline_pr_approved - timeline_nominated))
-                    END
-                ) as avg_days_to_pr
-            FROM success_stories
-            WHERE status = 'approved'
-        """)
-        
-        overall = cursor.fetchone()
+        with get_cursor() as cursor:
+            # Overall stats
+            cursor.execute("""
+                SELECT 
+                    COUNT(*) as total_stories,
+                    COUNT(DISTINCT aaip_stream) as streams_covered,
+                    AVG(
+                        CASE 
+                            WHEN timeline_nominated IS NOT NULL AND timeline_submitted IS NOT NULL 
+                            THEN timeline_nominated - timeline_submitted
+                        END
+                    ) as avg_days_to_nomination,
+                    AVG(
+                        CASE 
+                            WHEN timeline_pr_approved IS NOT NULL AND timeline_nominated IS NOT NULL 
+                            THEN timeline_pr_approved - timeline_nominated
+                        END
+                    ) as avg_days_to_pr
+                FROM success_stories
+                WHERE status = 'approved'
+            """)
         
-        # By stream
-        cursor.execute("""
-            SELECT aaip_stream, COUNT(*) as count
-            FROM success_stories
-            WHERE status = 'approved'
-            GROUP BY aaip_stream
-            ORDER BY count DESC
-        """)
+            overall = cursor.fetchone()
         
-        by_stream = cursor.fetchall()
+            # By stream
+            cursor.execute("""
+                SELECT aaip_stream, COUNT(*) as count
+                FROM success_stories
+                WHERE status = 'approved'
+                GROUP BY aaip_stream
+                ORDER BY count DESC
+            """)
         
-        cursor.close()
-        conn.close()
+            by_stream = cursor.fetchall()
         
         return {
             "overall": overall,
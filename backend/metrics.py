@@ -0,0 +1,287 @@
+"""
+Prometheus Metrics
+Request, query and connection pool timings for /metrics
+
+Collected in-process with plain counters and fixed-bucket histograms (no
+client library needed) and rendered in the Prometheus text format:
+
+- http_request_duration_seconds{method, route, status}: latency per route
+  template ("/api/streams/{stream_name}", not the concrete path)
+- http_stream_duration_seconds{route, status}: how long Server-Sent Events
+  streams (/api/events) stayed open; kept out of the latency histogram,
+  where minutes-long connections would swamp p95/p99
+- http_requests_in_flight{method}: requests being handled right now
+- db_query_duration_seconds{statement}: every cursor.execute(), labelled
+  with the function that ran it (see database.TimedCursor)
+- db_query_errors_total{statement}: statements that raised
+- db_pool_wait_seconds: time spent waiting for a pooled connection
+
+Recording a sample is a bisect and two additions under a per-metric lock,
+so it is cheap enough for every request and every query.
+
+Configuration (environment variables):
+- METRICS_ENABLED: set to 0 to stop recording and disable /metrics (default 1)
+"""
+
+import bisect
+import os
+import threading
+import time
+
+from starlette.routing import Match
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') != '0'
+
+# Seconds; covers cached hits (sub-millisecond) up to slow analytical queries
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Responses of this type are long-lived streams, timed separately
+STREAM_CONTENT_TYPE = b'text/event-stream'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base class: a named family of samples keyed by label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.extend(self._render_sample(labels, value))
+        return lines
+
+    def _render_sample(self, labels, value):
+        return [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class CallbackMetric(Metric):
+    """
+    Value read at scrape time from state kept elsewhere
+
+    - callback: returns a number or {label tuple: number}
+    - kind: 'gauge', or 'counter' for values that only grow
+    """
+
+    def __init__(self, name, documentation, callback, labelnames=(), kind='gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.kind = kind
+
+    def render(self):
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        self._values = value if isinstance(value, dict) else {(): value}
+        return super().render()
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket counts (last one is +Inf), then sum
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    def _render_sample(self, labels, state):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', _number(bound))])} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(state[-1])}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template', ('method', 'route', 'status')
+))
+STREAM_DURATION = registry.register(Histogram(
+    'http_stream_duration_seconds', 'Lifetime of event stream responses by route template', ('route', 'status'),
+    buckets=(1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0, 7200.0, 21600.0)
+))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled', ('method',)
+))
+QUERY_DURATION = registry.register(Histogram(
+    'db_query_duration_seconds', 'SQL statement execution time by statement label', ('statement',)
+))
+QUERY_ERRORS = registry.register(Counter(
+    'db_query_errors_total', 'SQL statements that raised, by statement label', ('statement',)
+))
+POOL_WAIT = registry.register(Histogram(
+    'db_pool_wait_seconds', 'Time spent waiting for a pooled database connection', (),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+))
+
+
+def observe_query(statement, seconds, failed=False):
+    if METRICS_ENABLED:
+        QUERY_DURATION.observe(seconds, statement)
+        if failed:
+            QUERY_ERRORS.inc(statement)
+
+
+def observe_pool_wait(seconds):
+    if METRICS_ENABLED:
+        POOL_WAIT.observe(seconds)
+
+
+# (routes, method, path) -> matched route, so requests that never reach the
+# router (cache hits, middleware running before it) are matched once per
+# path instead of once per request and middleware. Cleared when full, so
+# scanners probing random paths cannot grow it without bound.
+ROUTE_CACHE_SIZE = 4096
+_route_cache = {}
+
+
+def match_route(routes, scope):
+    """The route handling scope, None when nothing matches"""
+    route = scope.get('route')
+    if route is not None:
+        return route
+    # Not routed (yet, or answered by the response cache) - match it ourselves
+    key = (id(routes), scope['method'], scope['path'])
+    try:
+        return _route_cache[key]
+    except KeyError:
+        pass
+    found = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            found = route
+            break
+    if len(_route_cache) >= ROUTE_CACHE_SIZE:
+        _route_cache.clear()
+    _route_cache[key] = found
+    return found
+
+
+def route_template(routes, scope):
+    """Path template of the route handling scope, '<unmatched>' for 404s"""
+    route = match_route(routes, scope)
+    if route is None:
+        return '<unmatched>'
+    return getattr(route, 'path', scope['path'])
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request
+
+    - routes: the application's route list, used to label requests that
+      never reached the router (cached responses)
+    Add it last so it wraps every other middleware.
+    """
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        status = {'code': 500, 'stream': False}
+
+        async def record_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+                for name, value in message.get('headers', ()):
+                    if name.lower() == b'content-type' and value.startswith(STREAM_CONTENT_TYPE):
+                        status['stream'] = True
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, record_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method)
+            elapsed = time.perf_counter() - start
+            route = route_template(self.routes, scope)
+            if status['stream']:
+                STREAM_DURATION.observe(elapsed, route, str(status['code']))
+            else:
+                REQUEST_DURATION.observe(elapsed, method, route, str(status['code']))
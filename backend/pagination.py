@@ -0,0 +1,114 @@
+"""
+Keyset (Cursor) Pagination
+Helpers for paging through history tables without OFFSET
+
+OFFSET makes PostgreSQL produce and throw away every earlier row, so page N
+costs O(N). A keyset page instead continues strictly after the last row of
+the previous page ("seek"), which an index on the sort keys answers in
+constant time however deep the page is.
+
+The position is handed to clients as an opaque cursor: the sort-key values
+of the last row, JSON-encoded and base64url'd. Clients send it back as
+?cursor=... and must not parse it.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+
+# Header carrying the cursor of the next page (left out on the last page)
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+
+def encode_cursor(values):
+    """Opaque cursor for a tuple of sort-key values"""
+    plain = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps(plain, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _cursor_value(value, kind):
+    """A decoded cursor value as the sort key's type, ValueError when it is not one"""
+    if value is None:
+        return None
+    if kind in (datetime, date):
+        if not isinstance(value, str):
+            raise ValueError(value)
+        return kind.fromisoformat(value)
+    if kind is int and (isinstance(value, bool) or not isinstance(value, int)):
+        raise ValueError(value)
+    if kind is str and not isinstance(value, str):
+        raise ValueError(value)
+    return value
+
+
+def decode_cursor(cursor, types):
+    """
+    Sort-key values from a cursor, raises HTTPException 400 when malformed
+
+    - types: type of each sort key the endpoint pages on (datetime, date,
+      int or str); a value of another type is malformed, so a tampered
+      cursor is a client error instead of a database error
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(values)
+        return [_cursor_value(value, kind) for value, kind in zip(values, types)]
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def seek_condition(keys, values):
+    """
+    SQL condition selecting rows strictly after a cursor position
+
+    - keys: (sql expression, 'ASC' | 'DESC') pairs in ORDER BY order
+    - values: cursor values for those keys
+    Returns (sql, params). Mixed directions are supported, so existing sort
+    orders can be kept as they are.
+    """
+    directions = {direction for _, direction in keys}
+    if len(directions) == 1:
+        # Row comparison - a single btree range on a matching index
+        op = '<' if directions.pop() == 'DESC' else '>'
+        columns = ', '.join(expression for expression, _ in keys)
+        placeholders = ', '.join(['%s'] * len(keys))
+        return f"({columns}) {op} ({placeholders})", list(values)
+
+    # Mixed directions need the expanded form; the inclusive bound on the
+    # leading key keeps it an index range rather than a filter
+    leading, direction = keys[0]
+    clauses = []
+    params = [values[0]]
+    for i, (expression, direction_i) in enumerate(keys):
+        parts = [f"{prev} = %s" for prev, _ in keys[:i]]
+        parts.append(f"{expression} {'<' if direction_i == 'DESC' else '>'} %s")
+        clauses.append('(' + ' AND '.join(parts) + ')')
+        params.extend(values[:i + 1])
+    bound = f"{leading} {'<=' if direction == 'DESC' else '>='} %s"
+    return f"({bound} AND ({' OR '.join(clauses)}))", params
+
+
+def order_by(keys):
+    """ORDER BY clause body for the keys"""
+    return ', '.join(f"{expression} {direction}" for expression, direction in keys)
+
+
+def next_cursor(rows, limit, keys):
+    """
+    Cursor after the last row of a page fetched with LIMIT limit + 1
+
+    Returns None on the last page. The extra look-ahead row is dropped from
+    rows in place.
+    - keys: result column names holding the sort-key values
+    """
+    if len(rows) <= limit:
+        return None
+    del rows[limit:]
+    last = rows[-1]
+    return encode_cursor([last[key] for key in keys])
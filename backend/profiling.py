@@ -0,0 +1,335 @@
+"""
+Request Profiling
+Opt-in sampling profile of a single API request
+
+An admin sends a request with ?profile=1 (or an X-Profile: 1 header) plus
+the X-Admin-Token header. The request is served as usual, bypassing the
+response cache, while a background thread samples the stacks of the threads
+working on it every PROFILE_INTERVAL_MS. The response body is replaced by a
+JSON report:
+
+- wall_ms and a breakdown into db_ms (measured around every execute()),
+  serialization_ms and python_ms (estimated from the samples); these are
+  summed over threads, so endpoints that fan out (the dashboard) can
+  report more than wall_ms
+- per-statement query counts and times
+- folded stacks ("frame;frame;frame count"), the input format of
+  flamegraph.pl, speedscope and inferno
+
+?profile=folded returns only the folded stacks as text/plain, e.g.
+    curl -H 'X-Admin-Token: ...' '.../api/draws/stats?profile=folded' | flamegraph.pl > draws.svg
+
+Samples are attributed to the request from the event loop thread while its
+middleware coroutine is running, from database executor threads while they
+run work handed over by database.run_db(), and from threadpool threads while
+they run the route's endpoint function (concurrent requests to the same sync
+endpoint are sampled too).
+
+Without ADMIN_TOKEN the middleware is not installed at all; otherwise
+requests without the profile flag only pay a scan of the query string and
+headers. While a profile is active, other requests pay one context variable
+lookup per statement.
+
+Configuration (environment variables):
+- PROFILE_ENABLED: set to 0 to disable profiling even with ADMIN_TOKEN (default 1)
+- PROFILE_INTERVAL_MS: sampling interval in milliseconds (default 1)
+"""
+
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode
+
+from admin import ADMIN_TOKEN, ADMIN_TOKEN_HEADER, is_admin_token
+from metrics import match_route
+
+PROFILE_ENABLED = os.getenv('PROFILE_ENABLED', '1') != '0' and bool(ADMIN_TOKEN)
+PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', '1'))
+
+PROFILE_PARAM = 'profile'
+PROFILE_HEADER = b'x-profile'
+
+# Streaming responses never finish, so they cannot be profiled
+UNPROFILED_PATHS = ('/api/events',)
+
+# Frames deeper than this are cut off (recursion)
+MAX_DEPTH = 200
+
+# Functions whose samples count as serialization rather than Python logic
+SERIALIZATION_FUNCTIONS = {'serialize_response', 'jsonable_encoder', 'render', 'dumps', 'to_columnar'}
+SERIALIZATION_FILES = ('/pydantic/', '/pydantic_core/', '/json/', 'fast_json.py', 'encoders.py')
+
+# Number of profiles running in this process; database.TimedCursor only
+# looks up the current profile while this is non-zero
+active = 0
+_active_lock = threading.Lock()
+_current = contextvars.ContextVar('profile', default=None)
+
+
+def _run_traced(profile, func, *args, **kwargs):
+    thread_id = threading.get_ident()
+    profile.threads.add(thread_id)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profile.threads.discard(thread_id)
+
+
+def traced(func):
+    """
+    func wrapped so the thread running it is sampled for the current profile
+
+    Used by database.run_db() while a profile is active; returns func
+    unchanged outside a profiled request.
+    """
+    profile = _current.get()
+    if profile is None:
+        return func
+    return functools.partial(_run_traced, profile, func)
+
+
+def record_query(label, seconds):
+    """Called by database.TimedCursor for every statement while a profile is active"""
+    profile = _current.get()
+    if profile is not None:
+        profile.add_query(label, seconds)
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    marker = filename.rfind('site-packages/')
+    if marker >= 0:
+        filename = filename[marker + len('site-packages/'):]
+    else:
+        filename = os.path.basename(filename)
+    name = getattr(code, 'co_qualname', code.co_name)
+    # ';' separates frames in the folded format
+    return f"{name} ({filename}:{code.co_firstlineno})".replace(';', ':')
+
+
+def _is_serialization(codes):
+    for code in codes:
+        if code.co_name in SERIALIZATION_FUNCTIONS or any(part in code.co_filename for part in SERIALIZATION_FILES):
+            return True
+    return False
+
+
+def _is_db(codes):
+    for code in codes:
+        if code.co_filename.endswith(('psycopg2/extras.py', 'database.py')) and code.co_name != 'get_cursor':
+            return True
+    return False
+
+
+class Profile:
+    """Samples and query timings of one request"""
+
+    def __init__(self, anchor, endpoint_code, interval):
+        self.anchor = anchor  # middleware coroutine frame, on the loop thread's stack while the request runs
+        self.endpoint_code = endpoint_code
+        self.interval = interval
+        self.threads = set()  # threads running traced() work for the request
+        self.stacks = {}  # folded stack -> samples
+        self.seconds = {'db': 0.0, 'serialization': 0.0, 'python': 0.0}
+        self.samples = 0
+        self.queries = {}  # label -> [count, seconds]
+        self.query_seconds = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_query(self, label, seconds):
+        with self._lock:
+            entry = self.queries.setdefault(label, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+            self.query_seconds += seconds
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != me:
+                    self._sample(frame, weight, thread_id in self.threads)
+
+    def _sample(self, frame, weight, traced_thread):
+        """Record the stack if it belongs to this request; frame is the innermost frame"""
+        codes = []
+        root = None
+        depth = 0
+        while frame is not None and depth < MAX_DEPTH:
+            if frame is self.anchor:
+                root = 'request'
+                break
+            if traced_thread and frame.f_code is _run_traced.__code__:
+                root = 'executor'
+                break
+            if frame.f_code.co_filename == __file__:
+                # The middleware itself, stopping the profile
+                return
+            codes.append(frame.f_code)
+            if frame.f_code is self.endpoint_code:
+                root = 'threadpool'
+                break
+            frame = frame.f_back
+            depth += 1
+        if root is None:
+            return
+
+        codes.reverse()
+        folded = ';'.join([root] + [_frame_label(code) for code in codes])
+        kind = 'db' if _is_db(codes) else 'serialization' if _is_serialization(codes) else 'python'
+        self.stacks[folded] = self.stacks.get(folded, 0) + 1
+        self.seconds[kind] += weight
+        self.samples += 1
+
+    def folded(self):
+        """Folded stacks, heaviest first"""
+        return [f"{stack} {count}" for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])]
+
+    def report(self, route, status, body_bytes, wall):
+        ms = lambda seconds: round(seconds * 1000, 2)
+        sampled = sum(self.seconds.values())
+        return {
+            'route': route,
+            'status': status,
+            'response_bytes': body_bytes,
+            'wall_ms': ms(wall),
+            'timings': {
+                'db_ms': ms(self.query_seconds),
+                'db_queries': sum(count for count, _ in self.queries.values()),
+                'serialization_ms': ms(self.seconds['serialization']),
+                'python_ms': ms(self.seconds['python']),
+                # Thread hand-offs and the event loop serving other requests
+                'unsampled_ms': ms(max(wall - sampled, 0))
+            },
+            'queries': [
+                {'statement': label, 'count': count, 'total_ms': ms(seconds)}
+                for label, (count, seconds) in sorted(self.queries.items(), key=lambda item: -item[1][1])
+            ],
+            'sampler': {
+                'interval_ms': PROFILE_INTERVAL_MS,
+                'samples': self.samples,
+                'sampled_db_ms': ms(self.seconds['db'])
+            },
+            'folded': self.folded()
+        }
+
+
+def profile_mode(scope):
+    """'json' or 'folded' when the request asks for a profile, else None"""
+    query = scope.get('query_string', b'')
+    if PROFILE_PARAM.encode() in query:
+        for name, value in parse_qsl(query.decode('latin-1'), keep_blank_values=True):
+            if name == PROFILE_PARAM and value not in ('', '0'):
+                return 'folded' if value == 'folded' else 'json'
+    for name, value in scope.get('headers', ()):
+        if name == PROFILE_HEADER and value not in (b'', b'0'):
+            return 'folded' if value == b'folded' else 'json'
+    return None
+
+
+def _admin_token(scope):
+    header = ADMIN_TOKEN_HEADER.lower().encode('latin-1')
+    for name, value in scope.get('headers', ()):
+        if name == header:
+            return value.decode('latin-1')
+    return None
+
+
+def _without_profile_param(scope, bypass_key):
+    query = [
+        (name, value)
+        for name, value in parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True)
+        if name != PROFILE_PARAM
+    ]
+    return dict(scope, query_string=urlencode(query).encode('latin-1'), **{bypass_key: True})
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware answering profiled requests with a profile report
+
+    - routes: the application's route list, to find the endpoint function
+    Add it last (outermost) so the profile covers every other layer.
+    """
+
+    def __init__(self, app, routes):
+        # Imported here: response_cache imports database, which imports this module
+        from response_cache import BYPASS_SCOPE_KEY
+
+        self.app = app
+        self.routes = routes
+        self.bypass_key = BYPASS_SCOPE_KEY
+
+    async def __call__(self, scope, receive, send):
+        global active
+        if scope['type'] != 'http' or scope['path'].startswith(UNPROFILED_PATHS):
+            await self.app(scope, receive, send)
+            return
+        mode = profile_mode(scope)
+        if mode is None or not is_admin_token(_admin_token(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        scope = _without_profile_param(scope, self.bypass_key)
+        route = match_route(self.routes, scope)
+        endpoint = getattr(route, 'endpoint', None)
+        profile = Profile(sys._getframe(), getattr(endpoint, '__code__', None), PROFILE_INTERVAL_MS / 1000)
+
+        response = {'status': 500, 'bytes': 0}
+
+        async def discard(message):
+            # The report replaces the response; only keep its size and status
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['bytes'] += len(message.get('body', b''))
+
+        token = _current.set(profile)
+        with _active_lock:
+            active += 1
+        start = time.perf_counter()
+        profile.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            wall = time.perf_counter() - start
+            profile.stop()
+            with _active_lock:
+                active -= 1
+            _current.reset(token)
+
+        template = getattr(route, 'path', scope['path'])
+        if mode == 'folded':
+            body = ('\n'.join(profile.folded()) + '\n').encode('utf-8')
+            content_type = b'text/plain; charset=utf-8'
+        else:
+            body = json.dumps(profile.report(template, response['status'], response['bytes'], wall)).encode('utf-8')
+            content_type = b'application/json'
+
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', content_type),
+                (b'content-length', str(len(body)).encode('latin-1')),
+                (b'cache-control', b'no-store')
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Static Snapshot Publisher
+Pre-rendered JSON files for the read-mostly endpoints
+
+Most public endpoints are a pure function of the latest scrape, so after
+each collection run this script renders them once, in-process through the
+ASGI app (bypassing the response cache), and writes each body next to
+pre-compressed .gz and .br copies:
+
+    SNAPSHOT_ROOT/versions/<version>/api/stats.json
+    SNAPSHOT_ROOT/versions/<version>/api/stats.json.gz
+    SNAPSHOT_ROOT/versions/<version>/api/stats.json.br
+    SNAPSHOT_ROOT/current -> versions/<version>
+
+The `current` symlink is swapped atomically (rename over the old link), so
+nginx never sees a half-written snapshot. nginx serves GET requests without
+a query string from current/<path>.json with gzip_static/brotli_static and
+falls back to the live API for everything else - parameterized queries,
+endpoints that are not published, or a snapshot that is missing a file (see
+deployment/nginx-aaip-test.conf).
+
+A run whose bodies are identical to the current snapshot publishes nothing.
+Only the newest SNAPSHOT_KEEP versions are kept.
+
+Run by aaip-scraper.service and aaip-extended-collectors.service after the
+collectors finish; can also be run on its own:
+    python publish_snapshots.py [--root DIR] [--force]
+
+Configuration (environment variables):
+- SNAPSHOT_ROOT: directory holding versions/ and the current symlink (default /var/www/aaip-snapshots)
+- SNAPSHOT_KEEP: published versions kept on disk (default 3)
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+from datetime import datetime, timezone
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the deployment
+    brotli = None
+
+SNAPSHOT_ROOT = os.getenv('SNAPSHOT_ROOT', '/var/www/aaip-snapshots')
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', '3'))
+
+# Parameterless GETs the frontend loads on every visit. Anything here must
+# depend only on the scraped data (no per-user state, no POST-able resource)
+# and must not need response headers beyond Content-Type. /api/dashboard is
+# left out: it embeds its render time, so every run would look like new data.
+PUBLISHED_PATHS = (
+    '/api/stats',
+    '/api/summary/latest',
+    '/api/streams/list',
+    '/api/eoi/latest',
+    '/api/draws/streams',
+    '/api/draws/stats',
+    '/api/draws/trends',
+    '/api/insights/weekly',
+    '/api/tools/quota-calculator',
+    '/api/tools/competitiveness',
+    '/api/trends/analysis',
+    '/api/express-entry/comparison',
+    '/api/alberta-economy/indicators',
+    '/api/labor-market/quarterly',
+    '/api/job-bank/insights',
+)
+
+# Headers a static file can reproduce
+STATIC_HEADERS = {b'content-type', b'content-length'}
+
+MANIFEST = 'manifest.json'
+
+
+async def render(app, path, bypass_key):
+    """GET path through the ASGI app; returns (status, headers, body)"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('latin-1'),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'snapshot'), (b'accept', b'application/json')],
+        'client': ('127.0.0.1', 0),
+        'server': ('snapshot', 80),
+        bypass_key: True
+    }
+    response = {'status': None, 'headers': [], 'body': []}
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = message.get('headers', [])
+        elif message['type'] == 'http.response.body':
+            response['body'].append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return response['status'], response['headers'], b''.join(response['body'])
+
+
+async def render_all(paths):
+    """Render every path; returns ({path: body}, [failed paths])"""
+    # Imported here: main_enhanced builds the whole app on import, which --help does not need
+    from main_enhanced import app
+    from response_cache import BYPASS_SCOPE_KEY
+    from database import close_pool
+
+    bodies = {}
+    failed = []
+    try:
+        for path in paths:
+            try:
+                status, headers, body = await render(app, path, BYPASS_SCOPE_KEY)
+            except Exception as e:
+                print(f"   ✗ {path}: {e}")
+                failed.append(path)
+                continue
+
+            extra = sorted(name.decode('latin-1') for name, _ in headers if name.lower() not in STATIC_HEADERS)
+            content_type = dict(headers).get(b'content-type', b'')
+            if status != 200:
+                print(f"   ✗ {path}: HTTP {status}")
+                failed.append(path)
+            elif not content_type.startswith(b'application/json'):
+                print(f"   ✗ {path}: not JSON ({content_type.decode('latin-1')})")
+                failed.append(path)
+            elif extra:
+                print(f"   ✗ {path}: response sets headers a static file cannot ({', '.join(extra)})")
+                failed.append(path)
+            elif error_body(body) is not None:
+                print(f"   ✗ {path}: error response ({error_body(body)})")
+                failed.append(path)
+            else:
+                bodies[path] = body
+    finally:
+        close_pool()
+    return bodies, failed
+
+
+def error_body(body):
+    """
+    The error of a 200 response that reports a failure in its body, else None
+
+    Several endpoints (trends, Express Entry, economy, labor market) answer
+    database errors with HTTP 200 and {"error": ...}; publishing that would
+    serve the error until the next run.
+    """
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    if isinstance(data, dict) and 'error' in data:
+        return str(data['error'])[:200]
+    return None
+
+
+def digest(bodies):
+    """Content hash of a whole snapshot"""
+    h = hashlib.sha256()
+    for path in sorted(bodies):
+        h.update(path.encode('utf-8') + b'\0' + hashlib.sha256(bodies[path]).digest())
+    return h.hexdigest()
+
+
+def current_digest(root):
+    try:
+        with open(os.path.join(root, 'current', MANIFEST)) as f:
+            return json.load(f).get('digest')
+    except (OSError, ValueError):
+        return None
+
+
+def write_file(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def write_version(root, bodies, snapshot_digest):
+    """Write every body with its compressed copies into a new version directory"""
+    published_at = datetime.now(timezone.utc)
+    version = f"{published_at.strftime('%Y%m%dT%H%M%SZ')}-{snapshot_digest[:8]}"
+    final = os.path.join(root, 'versions', version)
+    staging = final + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+
+    files = {}
+    for path, body in bodies.items():
+        target = os.path.join(staging, path.lstrip('/') + '.json')
+        write_file(target, body)
+        # mtime=0 keeps the .gz bytes identical for identical bodies
+        write_file(target + '.gz', gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            write_file(target + '.br', brotli.compress(body, quality=11))
+        files[path] = {'bytes': len(body), 'sha256': hashlib.sha256(body).hexdigest()}
+
+    manifest = {
+        'version': version,
+        'published_at': published_at.isoformat(),
+        'digest': snapshot_digest,
+        'brotli': brotli is not None,
+        'files': files
+    }
+    write_file(os.path.join(staging, MANIFEST), json.dumps(manifest, indent=2).encode('utf-8'))
+    os.rename(staging, final)
+    return version
+
+
+def activate(root, version):
+    """Point root/current at the version with an atomic rename"""
+    link = os.path.join(root, 'current')
+    staging = link + '.tmp'
+    if os.path.lexists(staging):
+        os.unlink(staging)
+    os.symlink(os.path.join('versions', version), staging)
+    os.replace(staging, link)
+
+
+def prune(root, keep):
+    """Remove all but the newest keep versions, never the current one"""
+    versions_dir = os.path.join(root, 'versions')
+    current = os.path.basename(os.path.realpath(os.path.join(root, 'current')))
+    # Version names start with the UTC publish time, so they sort by age
+    versions = sorted(name for name in os.listdir(versions_dir) if not name.endswith('.tmp'))
+    for name in versions[:-keep] if keep > 0 else versions:
+        if name != current:
+            shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+            print(f"   Removed old snapshot {name}")
+
+
+def publish(root=SNAPSHOT_ROOT, keep=SNAPSHOT_KEEP, force=False, paths=PUBLISHED_PATHS):
+    """Render, write and activate a snapshot; returns the number of failed paths"""
+    print(f"📦 Publishing {len(paths)} endpoint snapshots to {root}")
+    if brotli is None:
+        print("⚠️  brotli is not installed - writing .json and .json.gz only")
+
+    bodies, failed = asyncio.run(render_all(paths))
+    if not bodies:
+        print("✗ Nothing rendered, keeping the current snapshot")
+        return len(failed)
+
+    snapshot_digest = digest(bodies)
+    if not force and snapshot_digest == current_digest(root):
+        print("✓ Data unchanged since the current snapshot, nothing to publish")
+        return len(failed)
+
+    version = write_version(root, bodies, snapshot_digest)
+    activate(root, version)
+    print(f"✓ Published snapshot {version} ({len(bodies)} endpoints, {sum(map(len, bodies.values()))} bytes)")
+    if failed:
+        print(f"⚠️  {len(failed)} endpoint(s) not published, nginx serves them from the API: {', '.join(failed)}")
+    prune(root, keep)
+    return len(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render hot API endpoints to static, pre-compressed files')
+    parser.add_argument('--root', default=SNAPSHOT_ROOT, help=f'snapshot directory (default {SNAPSHOT_ROOT})')
+    parser.add_argument('--keep', type=int, default=SNAPSHOT_KEEP, help=f'versions to keep (default {SNAPSHOT_KEEP})')
+    parser.add_argument('--force', action='store_true', help='publish even if nothing changed')
+    args = parser.parse_args()
+
+    sys.exit(1 if publish(args.root, args.keep, args.force) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,477 @@
+"""
+Scrape-Aware Response Cache
+In-process LRU cache for the read-only GET endpoints
+
+The AAIP tables only change when the scraper runs, so responses are cached
+by path + query string and the whole cache is dropped as soon as a new
+scrape lands (new scrape_log row or a new MAX(timestamp) in the data tables).
+Entries also expire after a per-endpoint TTL, which covers tables written by
+collectors that do not log to scrape_log.
+
+Cached responses carry a strong ETag (hash of the body) and a Last-Modified
+date, so If-None-Match / If-Modified-Since revalidations are answered with
+304 straight from memory. Cache-Control max-age runs until the next expected
+scrape so browsers and nginx can serve repeat views themselves.
+
+Concurrent misses for the same key are coalesced: the first request renders
+the response and the others wait for it instead of running the endpoint
+again (single flight). Expensive endpoints can additionally opt into
+stale-while-revalidate: once their entry is outdated, by a new scrape or by
+its TTL, it is kept for a grace period and served with X-Cache: STALE while
+one background render replaces it, so a burst of visitors right after a
+scrape never waits on or piles onto the recompute.
+
+Configuration (environment variables):
+- RESPONSE_CACHE_ENABLED: set to 0 to bypass the cache (default 1)
+- RESPONSE_CACHE_TTL: default entry lifetime in seconds (default 300)
+- RESPONSE_CACHE_MAX_ENTRIES: LRU entry limit (default 512)
+- RESPONSE_CACHE_MAX_BYTES: LRU body size limit (default 32 MB)
+- RESPONSE_CACHE_VERSION_INTERVAL: seconds between data-version checks (default 5)
+- SCRAPE_INTERVAL_SECONDS: scraper cadence used for max-age (default 3600)
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode
+
+from database import fetch_one
+
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', '1') != '0'
+RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '512'))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+RESPONSE_CACHE_VERSION_INTERVAL = float(os.getenv('RESPONSE_CACHE_VERSION_INTERVAL', '5'))
+SCRAPE_INTERVAL_SECONDS = int(os.getenv('SCRAPE_INTERVAL_SECONDS', '3600'))
+
+# Set in the ASGI scope by outer middleware to serve a request uncached
+BYPASS_SCOPE_KEY = 'response_cache.bypass'
+
+# Methods that change a resource; HEAD and OPTIONS pass through untouched
+WRITE_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+
+# One cheap, index-backed probe; any new scrape changes at least one column
+DATA_VERSION_QUERY = """
+    SELECT
+        (SELECT MAX(id) FROM scrape_log) as scrape_id,
+        (SELECT MAX(timestamp) FROM scrape_log) as scraped_at,
+        (SELECT MAX(timestamp) FROM aaip_summary) as summary_ts,
+        (SELECT MAX(timestamp) FROM stream_data) as stream_ts,
+        (SELECT MAX(timestamp) FROM eoi_pool) as eoi_ts
+"""
+
+
+class CachedResponse:
+    """A fully rendered response ready to be replayed"""
+
+    __slots__ = ('status', 'headers', 'body', 'version', 'expires_at', 'stale_for', 'stale_until', 'etag', 'last_modified')
+
+    def __init__(self, status, headers, body, version, expires_at, stale_for=0):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.version = version
+        self.expires_at = expires_at
+        # Grace period in which the outdated entry may still be served
+        self.stale_for = stale_for
+        self.stale_until = expires_at + stale_for
+        self.etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        # Rendering time: nothing the body depends on changed after it
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class ResponseCache:
+    """LRU store of rendered responses tagged with the data version they came from"""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.version = None
+        self.scraped_at = None
+        self._version_checked_at = 0.0
+        self._version_lock = None
+        self._inflight = {}  # (version, key) -> future of the entry being rendered
+
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.coalesced = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def refresh_version(self):
+        """
+        Re-read the data version at most every RESPONSE_CACHE_VERSION_INTERVAL
+        seconds and drop every entry when it has moved
+        """
+        if time.monotonic() - self._version_checked_at < RESPONSE_CACHE_VERSION_INTERVAL:
+            return self.version
+
+        if self._version_lock is None:
+            self._version_lock = asyncio.Lock()
+
+        async with self._version_lock:
+            # Another request may have refreshed while we waited
+            if time.monotonic() - self._version_checked_at < RESPONSE_CACHE_VERSION_INTERVAL:
+                return self.version
+
+            try:
+                row = await fetch_one(DATA_VERSION_QUERY, label='response_cache.data_version')
+            except Exception:
+                # Database unavailable - serve uncached until it comes back
+                self.version = None
+                self.clear()
+                self._version_checked_at = time.monotonic()
+                return None
+
+            version = '|'.join(str(row[key]) for key in ('scrape_id', 'summary_ts', 'stream_ts', 'eoi_ts'))
+            self.scraped_at = row['scraped_at']
+            if version != self.version:
+                if self.version is not None:
+                    self.invalidations += 1
+                self._retire()
+                self.version = version
+            self._version_checked_at = time.monotonic()
+
+        return self.version
+
+    def expire_version(self):
+        """Re-check the data version on the next request, e.g. when a scrape event arrives"""
+        self._version_checked_at = 0.0
+
+    def get(self, key):
+        """
+        Return (entry, fresh) for key
+
+        fresh is False for an outdated entry still inside its stale grace
+        period; (None, False) when there is nothing to serve.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                now = time.monotonic()
+                if entry.version == self.version and entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry, True
+                if entry.stale_until > now:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return entry, False
+                self._remove(key)
+
+            self.misses += 1
+            return None, False
+
+    def set(self, key, entry):
+        """Store an entry and evict least recently used ones past the limits"""
+        size = len(entry.body)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_prefix(self, prefix):
+        """Drop every entry whose key starts with prefix"""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _retire(self):
+        """The data moved on: drop every entry except those that may be served stale"""
+        now = time.monotonic()
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.stale_for > 0:
+                    entry.stale_until = min(entry.stale_until, now + entry.stale_for)
+                else:
+                    self._remove(key)
+
+    async def render_once(self, version, key, render):
+        """
+        Await render() unless the same (version, key) is already being
+        rendered, in which case wait for that result instead
+
+        render() sends the response itself when it is not cacheable and
+        returns None; so does this method.
+        """
+        flight = (version, key)
+        pending = self._inflight.get(flight)
+        if pending is not None:
+            self.coalesced += 1
+            entry = await asyncio.shield(pending)
+            if entry is not None:
+                return entry
+            # The shared render failed or was not cacheable (an error
+            # response); this request gets its own
+            return await render()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight] = future
+        entry = None
+        try:
+            entry = await render()
+        finally:
+            del self._inflight[flight]
+            future.set_result(entry)
+        return entry
+
+    def is_rendering(self, version, key):
+        return (version, key) in self._inflight
+
+    def stats(self):
+        """Hit/miss counters and current usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': RESPONSE_CACHE_ENABLED,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'coalesced': self.coalesced,
+                'revalidations': self.revalidations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'data_version': self.version
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+
+
+def cache_key(scope):
+    """Path plus query parameters in a stable order"""
+    query = parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True)
+    if not query:
+        return scope['path']
+    return f"{scope['path']}?{urlencode(sorted(query))}"
+
+
+def max_age_for(ttl, scraped_at):
+    """Seconds until the next expected scrape, capped at the entry TTL"""
+    if scraped_at is None:
+        return int(ttl)
+    # scrape_log timestamps are naive local time (datetime.now() in the scraper)
+    next_scrape = scraped_at + timedelta(seconds=SCRAPE_INTERVAL_SECONDS)
+    remaining = (next_scrape - datetime.now()).total_seconds()
+    return int(max(0, min(ttl, remaining)))
+
+
+def is_not_modified(scope, entry):
+    """Evaluate If-None-Match (preferred) or If-Modified-Since against an entry"""
+    headers = dict(scope.get('headers', []))
+
+    if_none_match = headers.get(b'if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.decode('latin-1').split(',')]
+        # Weak comparison, as RFC 9110 specifies for If-None-Match
+        return '*' in tags or entry.etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+    if_modified_since = headers.get(b'if-modified-since')
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since.decode('latin-1'))
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return entry.last_modified <= since
+
+    return False
+
+
+def resource_prefix(path):
+    """'/api/success-stories/12/helpful' -> '/api/success-stories'"""
+    return '/'.join(path.split('/')[:3])
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving cached GET responses
+
+    - ttls: path prefix -> TTL seconds (longest prefix wins, 0 disables)
+    - stale: path prefix -> seconds an outdated entry may still be served
+      while it is re-rendered in the background (stale-while-revalidate)
+    - paths outside path_prefix are never cached
+    Successful writes (POST/PUT/PATCH/DELETE) invalidate cached entries of the
+    same resource.
+    """
+
+    def __init__(self, app, cache, ttls=None, stale=None, path_prefix='/api/'):
+        self.app = app
+        self.cache = cache
+        self.path_prefix = path_prefix
+        # Longest prefix first so the most specific override wins
+        self.ttls = sorted((ttls or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.stale = sorted((stale or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self._revalidating = {}  # (version, key) -> background render task
+
+    def ttl_for(self, path):
+        for prefix, ttl in self.ttls:
+            if path.startswith(prefix):
+                return ttl
+        return RESPONSE_CACHE_TTL
+
+    def stale_for(self, path):
+        for prefix, seconds in self.stale:
+            if path.startswith(prefix):
+                return seconds
+        return 0
+
+    async def __call__(self, scope, receive, send):
+        if (scope['type'] != 'http' or not RESPONSE_CACHE_ENABLED or scope.get(BYPASS_SCOPE_KEY)
+                or not scope['path'].startswith(self.path_prefix)):
+            await self.app(scope, receive, send)
+            return
+
+        if scope['method'] in WRITE_METHODS:
+            await self._call_and_invalidate(scope, receive, send)
+            return
+        if scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+
+        ttl = self.ttl_for(scope['path'])
+        if ttl <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        version = await self.cache.refresh_version()
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        entry, fresh = self.cache.get(key)
+        if entry is None:
+            cache_status = b'MISS'
+            entry = await self.cache.render_once(
+                version, key, lambda: self._render(scope, receive, send, key, version, ttl)
+            )
+            if entry is None:
+                return
+        elif fresh:
+            cache_status = b'HIT'
+        else:
+            cache_status = b'STALE'
+            self._revalidate(scope, key, version, ttl)
+
+        # Outdated bodies must not be kept by browsers or nginx
+        max_age = 0 if cache_status == b'STALE' else max_age_for(ttl, self.cache.scraped_at)
+        headers = [
+            (b'etag', entry.etag.encode('latin-1')),
+            (b'last-modified', format_datetime(entry.last_modified, usegmt=True).encode('latin-1')),
+            (b'cache-control', b'public, max-age=%d' % max_age),
+            (b'x-cache', cache_status)
+        ]
+
+        if is_not_modified(scope, entry):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        await send({'type': 'http.response.start', 'status': entry.status, 'headers': entry.headers + headers})
+        await send({'type': 'http.response.body', 'body': entry.body})
+
+    async def _render(self, scope, receive, send, key, version, ttl):
+        """
+        Run the endpoint and cache a 200 response
+
+        Returns the new entry, or None when the response was not cacheable
+        (in which case it has already been sent as-is).
+        """
+        messages = []
+
+        async def capture(message):
+            messages.append(message)
+
+        await self.app(scope, receive, capture)
+
+        start = next((m for m in messages if m['type'] == 'http.response.start'), None)
+        if start is None or start['status'] != 200:
+            for message in messages:
+                await send(message)
+            return None
+
+        body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+        entry = CachedResponse(
+            status=200,
+            headers=[(k, v) for k, v in start.get('headers', []) if k.lower() not in (b'etag', b'last-modified', b'cache-control')],
+            body=body,
+            version=version,
+            expires_at=time.monotonic() + ttl,
+            stale_for=self.stale_for(scope['path'])
+        )
+        self.cache.set(key, entry)
+        return entry
+
+    def _revalidate(self, scope, key, version, ttl):
+        """Re-render a stale entry in the background, once per key and data version"""
+        flight = (version, key)
+        if flight in self._revalidating or self.cache.is_rendering(version, key):
+            return
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def discard(message):
+            pass
+
+        # Conditional headers belong to the request that found the stale entry
+        headers = [(k, v) for k, v in scope.get('headers', []) if k not in (b'if-none-match', b'if-modified-since')]
+        background = dict(scope, headers=headers)
+
+        async def run():
+            try:
+                await self.cache.render_once(
+                    version, key, lambda: self._render(background, receive, discard, key, version, ttl)
+                )
+            except Exception as e:
+                print(f"⚠️  Background refresh of {key} failed: {e}")
+
+        self.cache.revalidations += 1
+        self._revalidating[flight] = asyncio.ensure_future(run())
+        self._revalidating[flight].add_done_callback(lambda task: self._revalidating.pop(flight, None))
+
+    async def _call_and_invalidate(self, scope, receive, send):
+        status = {}
+
+        async def watch(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        await self.app(scope, receive, watch)
+        if status.get('code', 500) < 400:
+            self.cache.invalidate_prefix(resource_prefix(scope['path']))
@@ -2,13 +2,16 @@
 """
 Run database migrations for success stories and other features
 """
+import json
 import os
+import sys
 import psycopg2
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv('DATABASE_URL')
+EVENTS_CHANNEL = os.getenv('EVENTS_CHANNEL', 'aaip_events')
 
 def get_connection():
     if DATABASE_URL:
@@ -52,13 +55,55 @@ def run_migration(filename):
         print(f"   ❌ Error: {e}")
         return False
 
+def announce_schema_change():
+    """Tell running API workers to reload their schema registry"""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT pg_notify(%s, %s)', (EVENTS_CHANNEL, json.dumps({'type': 'schema'})))
+        conn.commit()
+        cursor.close()
+        conn.close()
+        print("📣 Notified API workers of the schema change")
+    except Exception as e:
+        print(f"   ⚠️  Could not notify API workers: {e}")
+
+def seed_insights():
+    """Fill an empty insights table once, so /api/insights/weekly is not empty until the next scrape"""
+    try:
+        conn = get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM insights)')
+            if cursor.fetchone()[0]:
+                return
+            # Imported here: the generator lives with the scraper, which writes the table afterwards
+            sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scraper'))
+            from insights_generator import update_insights
+
+            current, _, _ = update_insights(conn)
+            conn.commit()
+            print(f"🌱 Seeded {current} insights from the current data")
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"   ⚠️  Could not seed insights (the next scrape will): {e}")
+
 def main():
     print("=" * 70)
     print("Database Migrations Runner")
     print("=" * 70)
     
     migrations = [
-        '007_create_success_stories.sql'
+        '007_create_success_stories.sql',
+        '008_create_aaip_news.sql',
+        '009_create_stream_data_latest.sql',
+        '010_add_keyset_pagination_indexes.sql',
+        '011_add_draw_filter_indexes.sql',
+        '012_create_insights.sql',
+        '013_create_competitiveness.sql',
+        '014_create_quota_burn_rates.sql',
+        '015_add_processing_date_parsed.sql'
     ]
     
     success_count = 0
@@ -66,9 +111,17 @@ def main():
         if run_migration(migration):
             success_count += 1
     
+    if success_count:
+        seed_insights()
+        announce_schema_change()
+    
     print("\n" + "=" * 70)
     print(f"✅ Completed {success_count}/{len(migrations)} migrations")
     print("=" * 70)
 
+    # Non-zero exit so deployment/update.sh stops before restarting services
+    if success_count < len(migrations):
+        sys.exit(1)
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,89 @@
+"""
+Schema Registry
+In-memory record of which optional tables exist
+
+Several endpoints serve data from tables that only exist once their
+collector (or a migration) has run. Instead of probing information_schema
+on every request, they ask the registry, which loads the list of visible
+tables with one catalog query at startup and reloads it when it is older
+than SCHEMA_REFRESH_INTERVAL.
+
+run_migrations.py announces finished migrations with a "schema" event on
+the events channel; the API's listener then expires the registry so the
+next lookup reloads it right away. Tables created by collectors are picked
+up by the periodic refresh. On an embedded node (embedded.py) the list comes
+from the exported file's sqlite_master instead.
+
+Configuration (environment variables):
+- SCHEMA_REFRESH_INTERVAL: seconds before the table list is reloaded (default 300)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import psycopg2
+
+from database import query_all
+from embedded import EMBEDDED_DB_PATH
+
+SCHEMA_REFRESH_INTERVAL = float(os.getenv('SCHEMA_REFRESH_INTERVAL', '300'))
+
+# Event type sent by run_migrations.py once migrations have been applied
+SCHEMA_EVENT = 'schema'
+
+# Tables, views and materialized views reachable without a schema prefix
+TABLES_QUERY = """
+    SELECT c.relname
+    FROM pg_catalog.pg_class c
+    WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+      AND pg_catalog.pg_table_is_visible(c.oid)
+"""
+
+EMBEDDED_TABLES_QUERY = "SELECT name as relname FROM sqlite_master WHERE type IN ('table', 'view')"
+
+
+class SchemaRegistry:
+    """Set of existing table names, reloaded lazily once it is stale"""
+
+    def __init__(self, refresh_interval=SCHEMA_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._tables = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+        self.refreshes = 0
+
+    def refresh(self):
+        """Reload the table list from the catalog"""
+        rows = query_all(EMBEDDED_TABLES_QUERY if EMBEDDED_DB_PATH else TABLES_QUERY, label='schema_registry')
+        self._tables = frozenset(row['relname'] for row in rows)
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    def expire(self):
+        """Reload on the next lookup (after migrations ran)"""
+        self._loaded_at = 0.0
+
+    def has_table(self, name):
+        """Whether a table (or view) called name exists"""
+        if self._tables is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+            self._reload()
+        return name in self._tables
+
+    def _reload(self):
+        # Only the first lookup waits for the catalog; while one thread
+        # reloads, the others keep answering from the previous list
+        if not self._lock.acquire(blocking=self._tables is None):
+            return
+        try:
+            if self._tables is None or time.monotonic() - self._loaded_at > self.refresh_interval:
+                try:
+                    self.refresh()
+                except (psycopg2.Error, sqlite3.Error) as e:
+                    if self._tables is None:
+                        raise
+                    print(f"⚠️  Schema registry refresh failed, keeping previous table list: {e}")
+        finally:
+            self._lock.release()
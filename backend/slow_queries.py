@@ -0,0 +1,163 @@
+"""
+Slow Query Log
+Opt-in capture of slow statements with their execution plans
+
+When SLOW_QUERY_MS is set, every statement run through database.TimedCursor
+that takes at least that long is (subject to sampling) recorded with its
+label, SQL, parameters, duration and row count in an in-memory ring buffer,
+logged to stdout, and listed by GET /api/admin/slow-queries.
+
+For read-only statements an EXPLAIN (ANALYZE, BUFFERS) plan is captured
+afterwards on a background thread with its own read-only connection, so
+the request that was slow is not delayed further. EXPLAIN ANALYZE runs the
+statement again - keep SLOW_QUERY_SAMPLE_RATE low on busy servers.
+
+Configuration (environment variables):
+- SLOW_QUERY_MS: threshold in milliseconds, 0 disables the log (default 0)
+- SLOW_QUERY_SAMPLE_RATE: fraction of slow statements recorded (default 1.0)
+- SLOW_QUERY_EXPLAIN: set to 0 to skip plan capture (default 1)
+- SLOW_QUERY_LOG_SIZE: entries kept in the ring buffer (default 100)
+- SLOW_QUERY_EXPLAIN_TIMEOUT: statement_timeout for plan capture in seconds (default 30)
+"""
+
+import itertools
+import os
+import random
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import psycopg2
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '0'))
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1.0'))
+SLOW_QUERY_EXPLAIN = os.getenv('SLOW_QUERY_EXPLAIN', '1') != '0'
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '100'))
+SLOW_QUERY_EXPLAIN_TIMEOUT = float(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT', '30'))
+
+# Plans waiting for the explain thread; further slow queries skip the plan
+MAX_PENDING_PLANS = 10
+
+# Only plain reads are re-run under EXPLAIN ANALYZE
+READ_ONLY_STATEMENT = re.compile(r'^\s*(SELECT|WITH)\b', re.IGNORECASE)
+WRITE_KEYWORDS = re.compile(r'\b(INSERT|UPDATE|DELETE|MERGE|FOR\s+UPDATE|FOR\s+SHARE)\b', re.IGNORECASE)
+
+_log = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_pending = 0
+_explainer = None
+_explain_conn = None
+
+
+def threshold_seconds():
+    """Slow query threshold in seconds, None when the log is disabled"""
+    return SLOW_QUERY_MS / 1000 if SLOW_QUERY_MS > 0 else None
+
+
+def _json_safe(params):
+    """Parameters as JSON-friendly values (lists/dicts of str/int/float/None)"""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {str(key): _json_safe(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_json_safe(value) for value in params]
+    if isinstance(params, (str, int, float, bool)):
+        return params
+    return str(params)
+
+
+def record(label, query, params, executed, seconds, rowcount):
+    """
+    Record a statement that exceeded the threshold
+
+    - query/params: the SQL template and parameters as passed to execute()
+    - executed: the statement psycopg2 sent (cursor.query), used for EXPLAIN
+    """
+    global _pending
+    if SLOW_QUERY_SAMPLE_RATE < 1 and random.random() >= SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    sql = ' '.join(query.split()) if isinstance(query, str) else str(query)
+    entry = {
+        'id': next(_ids),
+        'recorded_at': datetime.now().isoformat(),
+        'statement': label,
+        'duration_ms': round(seconds * 1000, 1),
+        'rows': rowcount,
+        'query': sql,
+        'params': _json_safe(params),
+        'plan': None,
+        'plan_status': 'disabled'
+    }
+    print(f"⚠️  Slow query [{label}] {entry['duration_ms']} ms, {rowcount} rows")
+
+    if SLOW_QUERY_EXPLAIN and executed:
+        statement = executed.decode('utf-8', 'replace') if isinstance(executed, bytes) else executed
+        if not READ_ONLY_STATEMENT.match(statement) or WRITE_KEYWORDS.search(statement):
+            entry['plan_status'] = 'not read-only'
+        else:
+            with _lock:
+                queued = _pending < MAX_PENDING_PLANS
+                if queued:
+                    _pending += 1
+            if queued:
+                entry['plan_status'] = 'pending'
+                _get_explainer().submit(_capture_plan, entry, statement)
+            else:
+                entry['plan_status'] = 'skipped (explain queue full)'
+
+    with _lock:
+        _log.append(entry)
+
+
+def entries(limit=None):
+    """Recorded slow queries, newest first"""
+    with _lock:
+        items = [dict(entry) for entry in reversed(_log)]
+    return items[:limit] if limit else items
+
+
+def clear():
+    with _lock:
+        _log.clear()
+
+
+def _get_explainer():
+    global _explainer
+    with _lock:
+        if _explainer is None:
+            _explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='explain')
+        return _explainer
+
+
+def _capture_plan(entry, statement):
+    """Run EXPLAIN (ANALYZE, BUFFERS) in a read-only transaction that is rolled back"""
+    global _explain_conn, _pending
+    # Imported here: database imports this module for TimedCursor
+    from database import dedicated_connection
+
+    try:
+        if _explain_conn is None or _explain_conn.closed:
+            _explain_conn = dedicated_connection()
+            _explain_conn.set_session(readonly=True)
+
+        cursor = _explain_conn.cursor()
+        try:
+            cursor.execute("SET LOCAL statement_timeout = %s", (int(SLOW_QUERY_EXPLAIN_TIMEOUT * 1000),))
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS) " + statement)
+            entry['plan'] = '\n'.join(row[0] for row in cursor.fetchall())
+            entry['plan_status'] = 'captured'
+        finally:
+            cursor.close()
+            _explain_conn.rollback()
+    except psycopg2.Error as e:
+        entry['plan_status'] = f"error: {str(e).strip()}"
+        if _explain_conn is not None and _explain_conn.closed:
+            _explain_conn = None
+    finally:
+        with _lock:
+            _pending -= 1
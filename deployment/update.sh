@@ -24,6 +24,7 @@ print_success() {
 
 DEPLOY_PATH="/home/$USER/deploy/aaip-data"
 WEB_PATH="/var/www/aaip-test"
+SNAPSHOT_PATH="/var/www/aaip-snapshots"
 
 cd "$DEPLOY_PATH"
 
@@ -51,6 +52,10 @@ print_step "步骤 2/5: 更新 Backend"
 cd backend
 source venv/bin/activate
 pip install -r requirements.txt --quiet
+# 迁移必须在重启 backend 和 scraper 之前完成：抓取写入依赖
+# stream_data_latest、quota_burn_rates 和 processing_date_parsed
+# 迁移均可重复执行；失败时 set -e 会中止更新
+python3 run_migrations.py
 deactivate
 cd ..
 
@@ -111,6 +116,14 @@ if ! cmp -s deployment/aaip-scraper.timer /etc/systemd/system/aaip-scraper.timer
     sudo systemctl restart aaip-scraper.timer
 fi
 
+# 静态快照目录（publish_snapshots.py 写入，nginx 读取）
+if [ ! -d "$SNAPSHOT_PATH" ]; then
+    print_info "创建静态快照目录 $SNAPSHOT_PATH"
+    sudo mkdir -p "$SNAPSHOT_PATH"
+    sudo chown "$USER:$USER" "$SNAPSHOT_PATH"
+fi
+backend/venv/bin/python3 backend/publish_snapshots.py --root "$SNAPSHOT_PATH" || print_info "部分快照未发布，nginx 将回退到 API"
+
 # 检查 Nginx 配置
 NGINX_CONF="deployment/nginx-aaip-test-fixed.conf"
 if [ ! -f "$NGINX_CONF" ]; then
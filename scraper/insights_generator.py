@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Weekly Smart Insights Generator
+
+Runs the insight analyses (quota usage, draw frequency, Express Entry score
+trend, EOI pool changes) once per scrape instead of once per API request,
+and stores the result in the insights table.
+
+Each insight row has a validity window [valid_from, valid_to):
+- an insight still produced by the latest run stays open (valid_to NULL)
+  and only gets its generated_at / position refreshed
+- one that is no longer produced is closed with valid_to = now
+- a new one is inserted with valid_from = now
+so /api/insights/weekly reads the open rows and /api/insights/history can
+show what was shown when.
+
+Called by scraper.py inside every save, and once by backend/run_migrations.py
+to fill a new table; can also be run on its own:
+    python insights_generator.py
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Database configuration
+DATABASE_URL = os.getenv('DATABASE_URL')
+DB_HOST = os.getenv('DB_HOST', 'localhost')
+DB_PORT = os.getenv('DB_PORT', '5432')
+DB_NAME = os.getenv('DB_NAME', 'aaip_data')
+DB_USER = os.getenv('DB_USER')
+DB_PASSWORD = os.getenv('DB_PASSWORD')
+
+# Display order: warning > opportunity > positive > info
+TYPE_PRIORITY = {'warning': 0, 'opportunity': 1, 'positive': 2, 'info': 3}
+
+
+def get_db_connection():
+    """Get PostgreSQL database connection"""
+    if DATABASE_URL:
+        return psycopg2.connect(DATABASE_URL)
+    else:
+        return psycopg2.connect(
+            host=DB_HOST,
+            port=DB_PORT,
+            database=DB_NAME,
+            user=DB_USER,
+            password=DB_PASSWORD
+        )
+
+
+def quota_insights(cursor):
+    """Insight 1: quota usage warnings per main stream"""
+    cursor.execute("""
+        SELECT
+            stream_name,
+            nomination_allocation,
+            nominations_issued
+        FROM stream_data_latest
+        WHERE stream_type = 'main'
+        ORDER BY stream_name
+    """)
+
+    insights = []
+    for stream in cursor.fetchall():
+        if stream['nomination_allocation'] and stream['nomination_allocation'] > 0:
+            usage_rate = (stream['nominations_issued'] or 0) / stream['nomination_allocation']
+
+            if usage_rate > 0.85:
+                insights.append({
+                    "type": "warning",
+                    "title": f"{stream['stream_name']} - Quota Nearly Exhausted",
+                    "detail": f"Currently at {int(usage_rate * 100)}% quota usage ({stream['nominations_issued']}/{stream['nomination_allocation']})",
+                    "action": "If you qualify for this stream, consider submitting your EOI soon",
+                    "reasoning": "Historical data shows remaining 15% typically depletes within 4-6 weeks"
+                })
+            elif usage_rate > 0.70:
+                insights.append({
+                    "type": "info",
+                    "title": f"{stream['stream_name']} - Steady Quota Consumption",
+                    "detail": f"Currently at {int(usage_rate * 100)}% quota usage",
+                    "reasoning": "Stream is on track to exhaust quota by year-end"
+                })
+    return insights
+
+
+def draw_frequency_insights(cursor):
+    """Insight 2: draws in the past 30 days vs the 30 days before"""
+    cursor.execute("""
+        SELECT
+            COUNT(*) FILTER (WHERE draw_date >= CURRENT_DATE - INTERVAL '30 days') as draw_count,
+            COUNT(*) FILTER (WHERE draw_date < CURRENT_DATE - INTERVAL '30 days') as prev_count
+        FROM aaip_draws
+        WHERE draw_date >= CURRENT_DATE - INTERVAL '60 days'
+    """)
+    freq = cursor.fetchone()
+    if not freq['draw_count'] or not freq['prev_count']:
+        return []
+
+    change_pct = ((freq['draw_count'] - freq['prev_count']) / freq['prev_count']) * 100
+    if change_pct > 50:
+        return [{
+            "type": "positive",
+            "title": "Draw Frequency Significantly Increased",
+            "detail": f"{freq['draw_count']} draws in past 30 days (vs {freq['prev_count']} previously)",
+            "reasoning": f"Draw frequency increased by {int(change_pct)}%. Possible reasons: approaching year-end quota deadline or policy adjustment"
+        }]
+    if change_pct < -30:
+        return [{
+            "type": "warning",
+            "title": "Draw Frequency Decreased",
+            "detail": f"Only {freq['draw_count']} draws in past 30 days (vs {freq['prev_count']} previously)",
+            "reasoning": "May indicate quota constraints or policy review period"
+        }]
+    return []
+
+
+def score_trend_insights(cursor):
+    """Insight 3: last three Express Entry minimum scores vs the three before"""
+    cursor.execute("""
+        SELECT min_score, draw_date
+        FROM aaip_draws
+        WHERE stream_category = 'Alberta Express Entry Stream'
+        AND min_score IS NOT NULL
+        ORDER BY draw_date DESC
+        LIMIT 3
+    """)
+    recent_scores = cursor.fetchall()
+    if len(recent_scores) < 3:
+        return []
+
+    avg_recent = sum(s['min_score'] for s in recent_scores) / len(recent_scores)
+    cursor.execute("""
+        SELECT AVG(min_score) as avg_score
+        FROM (
+            SELECT min_score
+            FROM aaip_draws
+            WHERE stream_category = 'Alberta Express Entry Stream'
+            AND min_score IS NOT NULL
+            AND draw_date < %s
+            ORDER BY draw_date DESC
+            LIMIT 3
+        ) as prev_draws
+    """, (recent_scores[-1]['draw_date'],))
+    prev_avg = cursor.fetchone()
+    if not prev_avg or not prev_avg['avg_score']:
+        return []
+
+    score_change = avg_recent - float(prev_avg['avg_score'])
+    if score_change < -10:
+        return [{
+            "type": "opportunity",
+            "title": "Express Entry Invitation Scores Declining",
+            "detail": f"Recent average score: {int(avg_recent)} (down {int(abs(score_change))} points)",
+            "reasoning": "Score drops may indicate pool depletion of high-score candidates or increased invitation volumes",
+            "action": "Good time for mid-range score candidates to stay ready"
+        }]
+    if score_change > 10:
+        return [{
+            "type": "info",
+            "title": "Express Entry Scores Trending Higher",
+            "detail": f"Recent average score: {int(avg_recent)} (up {int(score_change)} points)",
+            "reasoning": "May indicate influx of high-score candidates or reduced invitation volumes"
+        }]
+    return []
+
+
+def eoi_pool_insights(cursor):
+    """Insight 4: the three largest EOI pool moves of more than 50 candidates"""
+    cursor.execute("""
+        WITH latest_two AS (
+            SELECT
+                stream_name,
+                candidate_count,
+                ROW_NUMBER() OVER (PARTITION BY stream_name ORDER BY timestamp DESC) as rn
+            FROM eoi_pool
+        )
+        SELECT
+            a.stream_name,
+            a.candidate_count as current_count,
+            b.candidate_count as previous_count
+        FROM latest_two a
+        JOIN latest_two b ON a.stream_name = b.stream_name AND b.rn = 2
+        WHERE a.rn = 1
+        AND ABS(a.candidate_count - b.candidate_count) > 50
+        ORDER BY ABS(a.candidate_count - b.candidate_count) DESC
+        LIMIT 3
+    """)
+
+    insights = []
+    for change in cursor.fetchall():
+        delta = change['current_count'] - change['previous_count']
+        change_pct = (delta / change['previous_count']) * 100 if change['previous_count'] > 0 else 0
+
+        if delta > 0:
+            insights.append({
+                "type": "info",
+                "title": f"{change['stream_name']} - EOI Pool Increased",
+                "detail": f"Pool size: {change['current_count']} (up {delta} candidates, +{int(change_pct)}%)",
+                "reasoning": "Increased competition may affect future draw scores"
+            })
+        else:
+            insights.append({
+                "type": "positive",
+                "title": f"{change['stream_name']} - EOI Pool Decreased",
+                "detail": f"Pool size: {change['current_count']} (down {abs(delta)} candidates, {int(change_pct)}%)",
+                "reasoning": "Reduced pool size may indicate recent draws or candidate withdrawals"
+            })
+    return insights
+
+
+def generate_insights(cursor):
+    """All current insights, in display order"""
+    insights = (
+        quota_insights(cursor)
+        + draw_frequency_insights(cursor)
+        + score_trend_insights(cursor)
+        + eoi_pool_insights(cursor)
+    )
+    # Stable sort keeps generation order within a type
+    insights.sort(key=lambda x: TYPE_PRIORITY.get(x['type'], 99))
+    return insights
+
+
+def store_insights(cursor, insights, now):
+    """
+    Reconcile the open insight rows with a fresh run
+
+    Returns (opened, closed) counts.
+    """
+    cursor.execute("""
+        SELECT id, insight_type, title, detail, action, reasoning
+        FROM insights
+        WHERE valid_to IS NULL
+        FOR UPDATE
+    """)
+    open_rows = {
+        (row['insight_type'], row['title'], row['detail'], row['action'], row['reasoning']): row['id']
+        for row in cursor.fetchall()
+    }
+
+    opened = 0
+    for position, insight in enumerate(insights):
+        key = (insight['type'], insight['title'], insight['detail'], insight.get('action'), insight.get('reasoning'))
+        priority = TYPE_PRIORITY.get(insight['type'], 99)
+        insight_id = open_rows.pop(key, None)
+        if insight_id is not None:
+            cursor.execute("""
+                UPDATE insights
+                SET generated_at = %s, priority = %s, position = %s
+                WHERE id = %s
+            """, (now, priority, position, insight_id))
+        else:
+            cursor.execute("""
+                INSERT INTO insights
+                (insight_type, title, detail, action, reasoning, priority, position,
+                 generated_at, valid_from)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                insight['type'], insight['title'], insight['detail'],
+                insight.get('action'), insight.get('reasoning'),
+                priority, position, now, now
+            ))
+            opened += 1
+
+    # Whatever is left was not produced this time
+    if open_rows:
+        cursor.execute(
+            "UPDATE insights SET valid_to = %s WHERE id = ANY(%s)",
+            (now, list(open_rows.values()))
+        )
+    return opened, len(open_rows)
+
+
+def update_insights(conn):
+    """
+    Generate and store insights on conn without committing
+
+    scraper.py calls this inside the scrape's transaction, so the new data
+    and the insights derived from it become visible together. Returns
+    (current, opened, closed) counts.
+    """
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    try:
+        insights = generate_insights(cursor)
+        opened, closed = store_insights(cursor, insights, datetime.now())
+    finally:
+        cursor.close()
+    return len(insights), opened, closed
+
+
+def refresh_insights():
+    """Generate insights from the current data and store them in one transaction"""
+    conn = get_db_connection()
+    try:
+        current, opened, closed = update_insights(conn)
+        conn.commit()
+        print(f"✓ Insights refreshed - {current} current, {opened} new, {closed} expired")
+        return current
+    finally:
+        conn.close()
+
+
+def main():
+    """Main function"""
+    try:
+        refresh_insights()
+        return 0
+    except Exception as e:
+        print(f"✗ Insight generation failed: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,8 +12,11 @@ from psycopg2.extras import RealDictCursor
 import os
 import sys
 import re
+import json
 from dotenv import load_dotenv
 
+from insights_generator import update_insights
+
 # Load environment variables
 load_dotenv()
 
@@ -28,6 +31,11 @@ DB_NAME = os.getenv('DB_NAME', 'aaip_data')
 DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 
+# Channel the API listens on for /api/events (backend/events.py)
+EVENTS_CHANNEL = os.getenv('EVENTS_CHANNEL', 'aaip_events')
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_EVENT_BYTES = 7900
+
 
 def get_db_connection():
     """Get PostgreSQL database connection"""
@@ -72,6 +80,27 @@ def parse_date(date_str):
         return None
 
 
+def parse_processing_date(text):
+    """
+    Parse the date out of a processing date cell
+
+    "March 3, 2025 (for applications ...)" -> date(2025, 3, 3); None when
+    the text holds no "Month D, YYYY" date. Mirrored by the backfill in
+    migration 015_add_processing_date_parsed.sql.
+    """
+    if not text:
+        return None
+    # Remove everything after '(' or 'for'
+    text = text.split('(')[0].split(' for')[0].strip()
+    match = re.search(r'([A-Z][a-z]+)\s+(\d{1,2}),\s+(\d{4})', text)
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(0), "%B %d, %Y").date()
+    except ValueError:
+        return None
+
+
 def categorize_stream(stream_text):
     """
     Categorize stream into main category and detail
@@ -503,6 +532,49 @@ def check_eoi_data_changed(data):
         return True
 
 
+def refresh_burn_rates(cursor):
+    """
+    Recompute quota_burn_rates for the streams in stream_data_latest
+
+    Runs inside the save transaction right after new stream_data rows are
+    inserted, so the quota calculator never scans history per request.
+    """
+    cursor.execute('''
+        INSERT INTO quota_burn_rates
+        (stream_name, window_days, rate_per_day, rate_low, rate_high,
+         nominations_issued, days_covered, samples, window_start, window_end)
+        SELECT stream_name, window_days, rate_per_day, rate_low, rate_high,
+               nominations_issued, days_covered, samples, window_start, window_end
+        FROM quota_burn_rate_estimates
+        ON CONFLICT (stream_name, window_days) DO UPDATE SET
+            rate_per_day = EXCLUDED.rate_per_day,
+            rate_low = EXCLUDED.rate_low,
+            rate_high = EXCLUDED.rate_high,
+            nominations_issued = EXCLUDED.nominations_issued,
+            days_covered = EXCLUDED.days_covered,
+            samples = EXCLUDED.samples,
+            window_start = EXCLUDED.window_start,
+            window_end = EXCLUDED.window_end,
+            updated_at = CURRENT_TIMESTAMP
+    ''')
+    return cursor.rowcount
+
+
+def notify_scrape_event(cursor, event):
+    """
+    Announce a saved scrape to /api/events subscribers
+
+    pg_notify is transactional, so listeners only hear about it once the
+    save commits. If the detail lists do not fit in a NOTIFY payload they
+    are dropped and only the counts are sent.
+    """
+    payload = json.dumps(event, separators=(',', ':'), default=str)
+    if len(payload.encode('utf-8')) > MAX_EVENT_BYTES:
+        event = dict(event, draws=[], eoi=[], quota=[], truncated=True)
+        payload = json.dumps(event, separators=(',', ':'), default=str)
+    cursor.execute('SELECT pg_notify(%s, %s)', (EVENTS_CHANNEL, payload))
+
+
 def save_to_database(data):
     """Save scraped data to PostgreSQL database (only stream data if changed)"""
     try:
@@ -515,11 +587,22 @@ def save_to_database(data):
         streams_saved = 0
         draws_new = 0
         draws_total = len(data['draws'])
+        quota_changes = []
+        new_draws = []
+        eoi_changes = []
 
         # Always save stream data if changed
         if has_changed:
             print("✓ Stream data changes detected - saving...")
 
+            # Previous quota figures, to report what changed in the scrape event
+            cursor.execute('''
+                SELECT stream_name, nominations_issued, nomination_spaces_remaining
+                FROM stream_data_latest
+                WHERE stream_type = 'main'
+            ''')
+            previous_quota = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+
             # Save overall summary
             if data['summary']:
                 cursor.execute('''
@@ -543,8 +626,8 @@ def save_to_database(data):
                     (timestamp, stream_name, stream_type, parent_stream,
                      nomination_allocation, nominations_issued,
                      nomination_spaces_remaining, applications_to_process,
-                     processing_date, last_updated)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                     processing_date, processing_date_parsed, last_updated)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                 ''', (
                     data['timestamp'],
                     stream['stream_name'],
@@ -555,10 +638,40 @@ def save_to_database(data):
                     stream['nomination_spaces_remaining'],
                     stream['applications_to_process'],
                     stream.get('processing_date'),
+                    parse_processing_date(stream.get('processing_date')),
                     data.get('last_updated')
                 ))
                 streams_saved += 1
 
+                if (stream['stream_type'] == 'main' and
+                        previous_quota.get(stream['stream_name']) !=
+                        (stream['nominations_issued'], stream['nomination_spaces_remaining'])):
+                    quota_changes.append({
+                        'stream': stream['stream_name'],
+                        'issued': stream['nominations_issued'],
+                        'remaining': stream['nomination_spaces_remaining']
+                    })
+
+            # Refresh the latest-snapshot table in the same transaction
+            if data['streams']:
+                cursor.execute('DELETE FROM stream_data_latest')
+                cursor.execute('''
+                    INSERT INTO stream_data_latest
+                    (stream_name, stream_data_id, timestamp, stream_type, parent_stream,
+                     nomination_allocation, nominations_issued,
+                     nomination_spaces_remaining, applications_to_process,
+                     processing_date, processing_date_parsed, last_updated)
+                    SELECT stream_name, id, timestamp, stream_type, parent_stream,
+                           nomination_allocation, nominations_issued,
+                           nomination_spaces_remaining, applications_to_process,
+                           processing_date, processing_date_parsed, last_updated
+                    FROM stream_data
+                    WHERE timestamp = %s
+                ''', (data['timestamp'],))
+
+                rates_updated = refresh_burn_rates(cursor)
+                print(f"  ✓ Updated {rates_updated} quota burn rates")
+
             print(f"  ✓ Saved {streams_saved} stream records")
         else:
             print("⊘ No stream data changes - skipping stream save")
@@ -592,6 +705,13 @@ def save_to_database(data):
                 result = cursor.fetchone()
                 if result and result[0]:  # New record inserted
                     draws_new += 1
+                    new_draws.append({
+                        'date': draw['draw_date'],
+                        'category': draw['stream_category'],
+                        'detail': draw['stream_detail'],
+                        'min_score': draw['min_score'],
+                        'invitations': draw['invitations_issued']
+                    })
 
             print(f"  ✓ Processed {draws_total} draws, {draws_new} new records added")
 
@@ -605,6 +725,12 @@ def save_to_database(data):
             
             if eoi_changed:
                 print(f"✓ EOI pool data changes detected - saving {eoi_total} records...")
+                cursor.execute('''
+                    SELECT stream_name, candidate_count
+                    FROM eoi_pool
+                    WHERE timestamp = (SELECT MAX(timestamp) FROM eoi_pool)
+                ''')
+                previous_eoi = dict(cursor.fetchall())
                 for eoi in data['eoi_pool']:
                     cursor.execute('''
                         INSERT INTO eoi_pool
@@ -618,6 +744,13 @@ def save_to_database(data):
                     ))
                     eoi_saved += 1
 
+                    if previous_eoi.get(eoi['stream_name']) != eoi['candidate_count']:
+                        eoi_changes.append({
+                            'stream': eoi['stream_name'],
+                            'count': eoi['candidate_count'],
+                            'previous': previous_eoi.get(eoi['stream_name'])
+                        })
+
                 print(f"  ✓ Saved {eoi_saved} EOI pool records")
             else:
                 print(f"⊘ No EOI pool data changes - skipping EOI save ({eoi_total} records unchanged)")
@@ -630,6 +763,27 @@ def save_to_database(data):
             VALUES (%s, %s, %s, %s, %s, %s)
         ''', (datetime.now(), status, message, streams_saved, draws_total, draws_new))
 
+        # Insights go in the same transaction: the response cache re-renders
+        # /api/insights/weekly as soon as it sees this scrape, so they must not
+        # lag behind it. The savepoint keeps a failed run from losing the scrape.
+        cursor.execute("SAVEPOINT insights")
+        try:
+            current, opened, closed = update_insights(conn)
+            cursor.execute("RELEASE SAVEPOINT insights")
+            print(f"✓ Insights refreshed - {current} current, {opened} new, {closed} expired")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT insights")
+            print(f"⚠️  Insight generation failed: {e}")
+
+        if quota_changes or new_draws or eoi_changes:
+            notify_scrape_event(cursor, {
+                'type': 'scrape',
+                'timestamp': data['timestamp'].isoformat(),
+                'draws': new_draws,
+                'eoi': eoi_changes,
+                'quota': quota_changes
+            })
+
         conn.commit()
         cursor.close()
         conn.close()
@@ -654,6 +808,32 @@ def save_to_database(data):
         raise
 
 
+def record_competitiveness_scores():
+    """
+    Append the current stream_competitiveness scores to competitiveness_scores
+
+    Streams whose inputs (stream and EOI timestamps) did not change since
+    the last recorded score are skipped by the unique index.
+    """
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO competitiveness_scores
+            (stream_name, stream_timestamp, eoi_timestamp, competitiveness_score, level, factors)
+            SELECT stream_name, stream_timestamp, eoi_timestamp, competitiveness_score, level, factors::jsonb
+            FROM stream_competitiveness
+            ON CONFLICT (stream_name, stream_timestamp, COALESCE(eoi_timestamp, '-infinity'::timestamp))
+            DO NOTHING
+        ''')
+        recorded = cursor.rowcount
+        conn.commit()
+        cursor.close()
+        print(f"✓ Recorded {recorded} competitiveness scores")
+    finally:
+        conn.close()
+
+
 def main():
     """Main function"""
     print("=" * 60)
@@ -669,6 +849,12 @@ def main():
         print("\nSaving to database...")
         save_to_database(data)
 
+        # Record scores from the new data; the scrape itself already succeeded
+        try:
+            record_competitiveness_scores()
+        except Exception as e:
+            print(f"⚠️  Competitiveness scoring failed: {e}")
+
         print(f"\n{'=' * 60}")
         print("✓ Scraping completed successfully!")
         print(f"{'=' * 60}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+API latency benchmark
+
+Starts the API (uvicorn main_enhanced:app) against a local PostgreSQL,
+optionally seeded first with synthetic history (synthetic_data.py), and
+drives a weighted mix of requests (request_mix.json) at a fixed
+concurrency. Reports count, errors, throughput and p50/p95/p99/max
+latency per route and overall.
+
+The response cache is disabled unless --cache is given, so the numbers
+measure handlers and queries rather than cache hits.
+
+Every route in budgets.json must stay within its p95/p99 budget and no
+request may fail, otherwise the run exits with status 1. After an
+intentional change, re-record the budgets with --record-budgets (measured
+percentiles times --headroom) and commit the new file. budgets.json is
+recorded at the default 1y data scale; larger scales need their own file.
+
+Usage:
+    python scripts/benchmark/benchmark_api.py --database-url postgresql://.../aaip_bench --seed
+    python scripts/benchmark/benchmark_api.py --database-url ... --seed --scale 10y --budgets budgets-10y.json
+    python scripts/benchmark/benchmark_api.py --base-url http://localhost:8000   # already running
+
+Configuration (environment variables):
+- BENCH_DATABASE_URL: default for --database-url
+- BENCH_BUDGET_SCALE: multiplier applied to every budget, for slower machines (default 1.0)
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+DEFAULT_MIX = os.path.join(HERE, 'request_mix.json')
+DEFAULT_BUDGETS = os.path.join(HERE, 'budgets.json')
+BUDGET_SCALE = float(os.getenv('BENCH_BUDGET_SCALE', '1.0'))
+
+SERVER_START_TIMEOUT = 60
+REQUEST_TIMEOUT = 30
+
+# Samples a route needs before a percentile is compared with its budget
+MIN_SAMPLES = {'p95_ms': 20, 'p99_ms': 100}
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    # Rank ceil(p * n), 1-based
+    index = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def load_mix(path):
+    """[(route name, [paths], weight)] from request_mix.json"""
+    with open(path) as f:
+        entries = json.load(f)['requests']
+    return [(entry['route'], entry['paths'], entry.get('weight', 1)) for entry in entries]
+
+
+def start_server(database_url, port, cache=False, extra_env=None):
+    env = dict(os.environ, DATABASE_URL=database_url, RESPONSE_CACHE_ENABLED='1' if cache else '0', **(extra_env or {}))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main_enhanced:app',
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=os.path.join(ROOT, 'backend'), env=env
+    )
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"✗ API exited during startup (status {process.returncode})")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/stats')
+            if conn.getresponse().status == 200:
+                conn.close()
+                return process
+            conn.close()
+        except OSError:
+            pass
+        time.sleep(0.25)
+
+    process.terminate()
+    raise SystemExit(f"✗ API did not answer /api/stats within {SERVER_START_TIMEOUT}s")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+class Worker(threading.Thread):
+    """One keep-alive client connection issuing requests back to back"""
+
+    def __init__(self, base_url, mix, rng, deadline, budget):
+        super().__init__(daemon=True)
+        target = urlsplit(base_url)
+        self.host, self.port = target.hostname, target.port or 80
+        self.mix = mix
+        self.weights = [weight for _, _, weight in mix]
+        self.rng = rng
+        self.deadline = deadline
+        self.budget = budget  # shared request counter, or None when running for a duration
+        self.samples = {}  # route -> [seconds]
+        self.errors = {}  # route -> [(status or exception, path)]
+        self.conn = None
+
+    def run(self):
+        while time.monotonic() < self.deadline and self._take():
+            route, paths, _ = self.rng.choices(self.mix, weights=self.weights)[0]
+            path = self.rng.choice(paths)
+            start = time.perf_counter()
+            try:
+                status = self._get(path)
+            except (OSError, http.client.HTTPException) as e:
+                status = type(e).__name__
+                self._reset()
+            elapsed = time.perf_counter() - start
+            if status == 200:
+                self.samples.setdefault(route, []).append(elapsed)
+            else:
+                self.errors.setdefault(route, []).append((status, path))
+        self._reset()
+
+    def _take(self):
+        if self.budget is None:
+            return True
+        with self.budget['lock']:
+            if self.budget['left'] <= 0:
+                return False
+            self.budget['left'] -= 1
+            return True
+
+    def _get(self, path):
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(self.host, self.port, timeout=REQUEST_TIMEOUT)
+        self.conn.request('GET', path, headers={'Accept-Encoding': 'gzip'})
+        response = self.conn.getresponse()
+        response.read()
+        return response.status
+
+    def _reset(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def run_load(base_url, mix, concurrency, duration=None, requests=None, seed=1):
+    """Run the mix; returns (samples by route, errors by route, wall seconds)"""
+    deadline = time.monotonic() + (duration if duration else 24 * 3600)
+    budget = {'left': requests, 'lock': threading.Lock()} if requests else None
+    workers = [
+        Worker(base_url, mix, random.Random(seed * 1000 + i), deadline, budget)
+        for i in range(concurrency)
+    ]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    wall = time.perf_counter() - start
+
+    samples, errors = {}, {}
+    for worker in workers:
+        for route, values in worker.samples.items():
+            samples.setdefault(route, []).extend(values)
+        for route, values in worker.errors.items():
+            errors.setdefault(route, []).extend(values)
+    return samples, errors, wall
+
+
+def summarize(mix, samples, errors, wall):
+    """Per-route and overall statistics (latencies in milliseconds)"""
+    def stats(values, failed):
+        values = sorted(values)
+        ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+        return {
+            'count': len(values),
+            'errors': failed,
+            'rps': round(len(values) / wall, 1) if wall else 0,
+            'p50_ms': ms(percentile(values, 0.50)),
+            'p95_ms': ms(percentile(values, 0.95)),
+            'p99_ms': ms(percentile(values, 0.99)),
+            'max_ms': ms(values[-1] if values else None),
+        }
+
+    routes = {route: stats(samples.get(route, []), len(errors.get(route, []))) for route, _, _ in mix}
+    every = [value for values in samples.values() for value in values]
+    overall = stats(every, sum(len(values) for values in errors.values()))
+    return {'routes': routes, 'overall': overall, 'wall_seconds': round(wall, 2)}
+
+
+def check_budgets(report, budgets, scale=BUDGET_SCALE):
+    """List of budget breaches as human-readable strings"""
+    breaches = []
+    for route, budget in budgets.items():
+        measured = report['routes'].get(route)
+        if not measured or not measured['count']:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            limit = budget.get(key)
+            if limit is not None and measured['count'] >= MIN_SAMPLES[key] and measured[key] > limit * scale:
+                breaches.append(f"{route}: {key} {measured[key]} > budget {round(limit * scale, 2)}")
+    return breaches
+
+
+def record_budgets(report, path, headroom):
+    budgets = {
+        route: {key: round(max(measured[key] * headroom, 1.0), 1) for key in ('p95_ms', 'p99_ms')}
+        for route, measured in report['routes'].items() if measured['count']
+    }
+    with open(path, 'w') as f:
+        json.dump({'headroom': headroom, 'routes': budgets}, f, indent=2)
+        f.write('\n')
+
+
+def print_report(report, budgets):
+    print(f"\n{'route':<48} {'count':>7} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'p95 budget':>10}")
+    rows = sorted(report['routes'].items()) + [('overall', report['overall'])]
+    for route, s in rows:
+        fmt = lambda value: f"{value:8.1f}" if value is not None else f"{'-':>8}"
+        budget = budgets.get(route, {}).get('p95_ms')
+        budget = f"{budget * BUDGET_SCALE:10.1f}" if budget is not None else f"{'-':>10}"
+        print(f"{route:<48} {s['count']:>7} {s['errors']:>4} {s['rps']:>8.1f} "
+              f"{fmt(s['p50_ms'])} {fmt(s['p95_ms'])} {fmt(s['p99_ms'])} {fmt(s['max_ms'])} {budget}")
+    print(f"\n{report['overall']['count']} requests in {report['wall_seconds']}s, "
+          f"{report['overall']['rps']} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API latency benchmark with per-route budgets')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='database the API is started against (BENCH_DATABASE_URL)')
+    parser.add_argument('--base-url', help='benchmark an already running API instead of starting one')
+    parser.add_argument('--seed', action='store_true', help='rebuild the database with synthetic history first')
+    parser.add_argument('--scale', default='1y', help='synthetic data scale for --seed (default 1y)')
+    parser.add_argument('--port', type=int, default=8765, help='port for the started API (default 8765)')
+    parser.add_argument('--cache', action='store_true', help='start the API with the response cache enabled')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent connections (default 8)')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of measured load (default 60)')
+    parser.add_argument('--requests', type=int, help='stop after this many requests instead of --duration')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds of unmeasured load first (default 5)')
+    parser.add_argument('--random-seed', type=int, default=1, help='seed for the request sequence (default 1)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='request mix JSON')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='latency budgets JSON')
+    parser.add_argument('--record-budgets', action='store_true', help='write measured percentiles x headroom to --budgets')
+    parser.add_argument('--headroom', type=float, default=1.5, help='budget headroom for --record-budgets (default 1.5)')
+    parser.add_argument('--output', help='write the report as JSON')
+    args = parser.parse_args()
+
+    if not args.base_url and not args.database_url:
+        parser.error('--database-url (or BENCH_DATABASE_URL) is required unless --base-url is given')
+
+    if args.seed:
+        import synthetic_data
+        if args.scale not in synthetic_data.SCALES:
+            parser.error(f"--scale must be one of {', '.join(sorted(synthetic_data.SCALES))}")
+        print(f"Seeding synthetic history at scale {args.scale}...")
+        synthetic_data.build(args.database_url, **synthetic_data.SCALES[args.scale])
+
+    mix = load_mix(args.mix)
+    process = None
+    base_url = args.base_url
+    if not base_url:
+        process = start_server(args.database_url, args.port, cache=args.cache)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    try:
+        if args.warmup:
+            print(f"Warming up for {args.warmup}s...")
+            run_load(base_url, mix, args.concurrency, duration=args.warmup, seed=args.random_seed + 1)
+        limit = f"{args.requests} requests" if args.requests else f"{args.duration}s"
+        print(f"Measuring {limit} at concurrency {args.concurrency}...")
+        samples, errors, wall = run_load(
+            base_url, mix, args.concurrency,
+            duration=None if args.requests else args.duration,
+            requests=args.requests, seed=args.random_seed
+        )
+    finally:
+        if process is not None:
+            stop_server(process)
+
+    report = summarize(mix, samples, errors, wall)
+    budgets = {}
+    if os.path.exists(args.budgets) and not args.record_budgets:
+        with open(args.budgets) as f:
+            budgets = json.load(f)['routes']
+    print_report(report, budgets)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    for route, failures in sorted(errors.items()):
+        failed = True
+        status, path = failures[0]
+        print(f"✗ {route}: {len(failures)} failed requests (first: {status} {path})")
+
+    if args.record_budgets:
+        if failed:
+            print("✗ Not recording budgets from a run with failed requests")
+            return 1
+        record_budgets(report, args.budgets, args.headroom)
+        print(f"✓ Recorded budgets in {args.budgets}")
+        return 0
+
+    breaches = check_budgets(report, budgets)
+    for breach in breaches:
+        print(f"✗ Over budget - {breach}")
+    missing = sorted(route for route in report['routes'] if route not in budgets)
+    if missing:
+        print(f"⚠️  No budget for: {', '.join(missing)}")
+
+    if failed or breaches:
+        return 1
+    print("✓ All routes within budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+PostgreSQL vs embedded SQLite latency comparison
+
+Exports the benchmark database to an embedded SQLite file
+(backend/export_embedded.py), then runs the request mix twice at the same
+concurrency: once against an API on PostgreSQL and once against an API
+serving the export (EMBEDDED_DB_PATH). Only routes an embedded node serves
+(embedded.EMBEDDED_ROUTES) are requested, and the response cache is off
+for both runs. Prints p50/p95 per route side by side.
+
+Usage:
+    python scripts/benchmark/compare_backends.py --database-url postgresql://.../aaip_bench
+    python scripts/benchmark/compare_backends.py --database-url ... --seed --scale 10y --duration 120
+
+Configuration (environment variables):
+- BENCH_DATABASE_URL: default for --database-url
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmark_api import DEFAULT_MIX, ROOT, load_mix, run_load, start_server, stop_server, summarize
+
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from embedded import EMBEDDED_ROUTES  # noqa: E402
+
+
+def export(database_url, output):
+    subprocess.run(
+        [sys.executable, 'export_embedded.py', '--output', output],
+        cwd=os.path.join(ROOT, 'backend'), env=dict(os.environ, DATABASE_URL=database_url), check=True
+    )
+
+
+def measure(database_url, port, mix, args, extra_env=None):
+    process = start_server(database_url, port, extra_env=extra_env)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if args.warmup:
+            run_load(base_url, mix, args.concurrency, duration=args.warmup, seed=args.random_seed + 1)
+        samples, errors, wall = run_load(base_url, mix, args.concurrency, duration=args.duration, seed=args.random_seed)
+    finally:
+        stop_server(process)
+    for route, failures in sorted(errors.items()):
+        status, path = failures[0]
+        print(f"✗ {route}: {len(failures)} failed requests (first: {status} {path})")
+    return summarize(mix, samples, errors, wall)
+
+
+def print_comparison(postgres, embedded):
+    print(f"\n{'route':<36} {'pg p50':>8} {'lite p50':>9} {'pg p95':>8} {'lite p95':>9} {'p95 x':>6}")
+    rows = sorted(postgres['routes']) + ['overall']
+    for route in rows:
+        pg = postgres['overall'] if route == 'overall' else postgres['routes'][route]
+        lite = embedded['overall'] if route == 'overall' else embedded['routes'][route]
+        fmt = lambda value, width: f"{value:{width}.1f}" if value is not None else f"{'-':>{width}}"
+        ratio = pg['p95_ms'] / lite['p95_ms'] if pg['p95_ms'] and lite['p95_ms'] else None
+        print(f"{route:<36} {fmt(pg['p50_ms'], 8)} {fmt(lite['p50_ms'], 9)} "
+              f"{fmt(pg['p95_ms'], 8)} {fmt(lite['p95_ms'], 9)} {fmt(ratio, 6)}")
+    print(f"\nThroughput: PostgreSQL {postgres['overall']['rps']} req/s, embedded {embedded['overall']['rps']} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare API latency on PostgreSQL and on the embedded export')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='PostgreSQL database to benchmark and export (BENCH_DATABASE_URL)')
+    parser.add_argument('--embedded-path', help='existing export to use instead of exporting to a temporary file')
+    parser.add_argument('--seed', action='store_true', help='rebuild the database with synthetic history first')
+    parser.add_argument('--scale', default='1y', help='synthetic data scale for --seed (default 1y)')
+    parser.add_argument('--port', type=int, default=8765, help='port for the started APIs (default 8765)')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent connections (default 8)')
+    parser.add_argument('--duration', type=float, default=60, help='seconds of measured load per backend (default 60)')
+    parser.add_argument('--warmup', type=float, default=5, help='seconds of unmeasured load first (default 5)')
+    parser.add_argument('--random-seed', type=int, default=1, help='seed for the request sequence (default 1)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='request mix JSON')
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error('--database-url (or BENCH_DATABASE_URL) is required')
+
+    if args.seed:
+        import synthetic_data
+        if args.scale not in synthetic_data.SCALES:
+            parser.error(f"--scale must be one of {', '.join(sorted(synthetic_data.SCALES))}")
+        print(f"Seeding synthetic history at scale {args.scale}...")
+        synthetic_data.build(args.database_url, **synthetic_data.SCALES[args.scale])
+
+    mix = [entry for entry in load_mix(args.mix) if entry[0] in EMBEDDED_ROUTES]
+    print(f"{len(mix)} routes of the mix are served by embedded nodes")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.embedded_path
+        if not path:
+            path = os.path.join(tmp, 'aaip.sqlite3')
+            export(args.database_url, path)
+
+        print(f"Measuring PostgreSQL for {args.duration}s at concurrency {args.concurrency}...")
+        postgres = measure(args.database_url, args.port, mix, args)
+        print(f"Measuring embedded SQLite for {args.duration}s at concurrency {args.concurrency}...")
+        embedded = measure(args.database_url, args.port, mix, args, extra_env={'EMBEDDED_DB_PATH': path})
+
+    print_comparison(postgres, embedded)
+    return 1 if postgres['overall']['errors'] or embedded['overall']['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
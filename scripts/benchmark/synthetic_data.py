@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Synthetic AAIP history for benchmarks
+
+Builds the full schema (setup scripts + backend migrations) in an empty
+database and fills it with a realistic, reproducible history:
+
+- an hourly scrape_log, with stream snapshots only for the scrapes where
+  the processing page changed (a few times a day, mostly office hours)
+- stream snapshots with quotas that reset every January, steady nomination
+  burn, a drifting backlog and processing dates lagging months behind
+- aaip_summary totals matching each snapshot
+- EOI pool sizes per stream that grow between draws and drop after them
+- two to three draws a week across the categories, with typical scores and sizes
+- daily Job Bank outlooks for the tracked occupations
+- news articles and success stories
+
+Rows are generated lazily and bulk-loaded with COPY, so large scales do
+not need the whole history in memory. Derived tables (stream_data_latest,
+insights, competitiveness scores, burn rates, parsed processing dates) are
+filled by re-running the migrations after the load, exactly as on a
+production upgrade.
+
+Scales (--scale, individual settings can be overridden):
+- 1y: one year of today's streams (default)
+- 10y: ten years of today's streams, ~10x today's rows
+- 100x-streams: one year with every stream, EOI pool, draw category and
+  occupation repeated 100 times, ~100x today's rows
+
+Usage:
+    python scripts/benchmark/synthetic_data.py --database-url postgresql://.../aaip_bench [--scale 10y]
+
+The target database must be empty (or be named *bench* to be reset).
+"""
+
+import argparse
+import glob
+import io
+import os
+import random
+import re
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Base tables first, then every migration in order
+SCHEMA_FILES = [
+    'scripts/database/setup_db_enhanced.sql',
+    'scripts/database/setup_db_draws.sql',
+    'scripts/database/fix_draws_duplicates.sql',
+    'scripts/database/add_eoi_pool_table.sql',
+]
+# Written by the scrapers but missing from the setup scripts
+SCHEMA_PATCHES = [
+    "ALTER TABLE aaip_draws ADD COLUMN IF NOT EXISTS selection_parameters TEXT",
+    # Same definition as scraper/job_bank_scraper.py
+    """
+    CREATE TABLE IF NOT EXISTS job_bank_data (
+        id SERIAL PRIMARY KEY,
+        timestamp TIMESTAMP NOT NULL,
+        noc_code VARCHAR(10) NOT NULL,
+        occupation_title VARCHAR(255) NOT NULL,
+        outlook VARCHAR(50),
+        job_openings INTEGER,
+        job_seekers INTEGER,
+        median_wage DECIMAL(10,2),
+        outlook_description TEXT,
+        aaip_stream VARCHAR(255),
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_job_bank_timestamp ON job_bank_data(timestamp DESC)",
+]
+# Migrations that only create tables; the rest backfill from data and run after seeding
+BASE_MIGRATIONS = ('007', '008')
+
+# days: history length, streams: how many times every stream is repeated,
+# snapshots_per_day: average page changes a day
+SCALES = {
+    '1y': {'days': 365, 'streams': 1, 'snapshots_per_day': 4},
+    '10y': {'days': 3650, 'streams': 1, 'snapshots_per_day': 4},
+    '100x-streams': {'days': 365, 'streams': 100, 'snapshots_per_day': 4},
+}
+
+# (stream_name, stream_type, parent_stream, yearly allocation)
+STREAMS = [
+    ('Alberta Opportunity Stream', 'main', None, 3400),
+    ('Rural Renewal Stream', 'main', None, 1600),
+    ('Tourism and Hospitality Stream', 'main', None, 900),
+    ('Dedicated Health Care Pathways', 'main', None, 800),
+    ('Entrepreneur Streams', 'main', None, 150),
+    ('Express Entry - Accelerated Tech Pathway', 'sub-pathway', 'Alberta Express Entry Stream', 900),
+    ('Express Entry - Law Enforcement Pathway', 'sub-pathway', 'Alberta Express Entry Stream', 100),
+    ('Express Entry - Priority Sectors', 'sub-pathway', 'Alberta Express Entry Stream', 700),
+]
+EOI_STREAMS = [
+    'Alberta Opportunity Stream',
+    'Alberta Express Entry Stream',
+    'Rural Renewal Stream',
+    'Tourism and Hospitality Stream',
+    'Dedicated Health Care Pathway',
+]
+# (stream_category, details, typical min score, score spread, typical invitations)
+DRAW_CATEGORIES = [
+    ('Alberta Opportunity Stream', [None, 'Construction', 'Agriculture', 'Priority Sectors'], 66, 6, 300),
+    ('Alberta Express Entry Stream', [None, 'Accelerated Tech Pathway', 'Law Enforcement Pathway',
+                                      'Priority Sectors (Construction)', 'Priority Sectors (Agriculture)'], 330, 40, 150),
+    ('Dedicated Health Care Pathway', [None, 'Physician', 'Nursing'], 55, 8, 80),
+    ('Tourism and Hospitality Stream', [None], 60, 6, 120),
+    ('Rural Renewal Stream', [None], 55, 5, 90),
+]
+# Occupations tracked by scraper/job_bank_scraper.py: (noc, title, stream, median wage)
+OCCUPATIONS = [
+    ('31301', 'Registered Nurses and Registered Psychiatric Nurses', 'Dedicated Health Care Pathways', 48.0),
+    ('33102', 'Nurse Aides, Orderlies and Patient Service Associates', 'Dedicated Health Care Pathways', 24.0),
+    ('62020', 'Food Service Supervisors', 'Tourism and Hospitality Stream', 17.5),
+    ('63200', 'Cooks', 'Tourism and Hospitality Stream', 17.0),
+    ('65201', 'Food Counter Attendants, Kitchen Helpers', 'Tourism and Hospitality Stream', 15.5),
+    ('21231', 'Software Engineers and Designers', 'Express Entry - Accelerated Tech Pathway', 52.0),
+    ('21232', 'Software Developers and Programmers', 'Express Entry - Accelerated Tech Pathway', 45.0),
+    ('62010', 'Retail Sales Supervisors', 'Alberta Opportunity Stream', 21.0),
+    ('73300', 'Transport Truck Drivers', 'Alberta Opportunity Stream', 27.0),
+]
+OUTLOOKS = [('Good', 0.45), ('Fair', 0.4), ('Limited', 0.15)]
+
+# Chance that a draw category holds a draw on a given weekday
+DRAW_CHANCE = 0.1
+
+# Hour-of-day weights for page changes: mostly during office hours
+CHANGE_HOUR_WEIGHTS = [0.5] * 8 + [3] * 10 + [0.5] * 6
+
+# Table -> columns loaded by COPY, in generator row order
+COPY_COLUMNS = {
+    'stream_data': ('timestamp', 'stream_name', 'stream_type', 'parent_stream', 'nomination_allocation',
+                    'nominations_issued', 'nomination_spaces_remaining', 'applications_to_process',
+                    'processing_date', 'last_updated'),
+    'scrape_log': ('timestamp', 'status', 'message', 'streams_collected', 'draws_collected', 'new_draws_added'),
+    'aaip_draws': ('draw_date', 'stream_category', 'stream_detail', 'min_score', 'invitations_issued',
+                   'selection_parameters'),
+    'eoi_pool': ('timestamp', 'stream_name', 'candidate_count', 'last_updated'),
+    'job_bank_data': ('timestamp', 'noc_code', 'occupation_title', 'outlook', 'job_openings', 'job_seekers',
+                      'median_wage', 'outlook_description', 'aaip_stream'),
+    'aaip_news': ('title_en', 'content_en', 'title_zh', 'content_zh', 'published_date'),
+    'success_stories': ('story_type', 'aaip_stream', 'timeline_submitted', 'timeline_nominated',
+                        'timeline_pr_approved', 'story_text', 'status', 'helpful_count', 'created_at',
+                        'approved_at'),
+}
+
+
+def connect(database_url):
+    return psycopg2.connect(database_url)
+
+
+def reset_database(conn):
+    """Drop everything in public; only allowed on databases named *bench*"""
+    name = conn.info.dbname
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public'")
+    if cursor.fetchone()[0] == 0:
+        return
+    if 'bench' not in name:
+        raise SystemExit(f"✗ Database '{name}' is not empty; use an empty database or one named *bench*")
+    cursor.execute("DROP SCHEMA public CASCADE")
+    cursor.execute("CREATE SCHEMA public")
+    conn.commit()
+
+
+def run_sql_file(cursor, relative_path):
+    with open(os.path.join(ROOT, relative_path)) as f:
+        sql = f.read()
+    # Grants name the production role
+    sql = re.sub(r'^GRANT [^;]*;', '', sql, flags=re.MULTILINE)
+    cursor.execute(sql)
+
+
+def migration_files():
+    return sorted(glob.glob(os.path.join(ROOT, 'backend/db/migrations/*.sql')))
+
+
+def create_schema(conn):
+    cursor = conn.cursor()
+    for path in SCHEMA_FILES:
+        run_sql_file(cursor, path)
+    for statement in SCHEMA_PATCHES:
+        cursor.execute(statement)
+    for path in migration_files():
+        if os.path.basename(path)[:3] in BASE_MIGRATIONS:
+            run_sql_file(cursor, os.path.relpath(path, ROOT))
+    conn.commit()
+
+
+def run_backfill_migrations(conn):
+    """Run the remaining migrations, timing each (they backfill from the seeded history)"""
+    cursor = conn.cursor()
+    for path in migration_files():
+        name = os.path.basename(path)
+        if name[:3] not in BASE_MIGRATIONS:
+            began = time.perf_counter()
+            run_sql_file(cursor, os.path.relpath(path, ROOT))
+            conn.commit()
+            print(f"  ✓ {name} ({time.perf_counter() - began:.1f}s)")
+
+
+def refresh_insights(conn):
+    """Store current insights with the scraper's generator"""
+    sys.path.insert(0, os.path.join(ROOT, 'scraper'))
+    from psycopg2.extras import RealDictCursor
+    from insights_generator import generate_insights, store_insights
+
+    cursor = conn.cursor(cursor_factory=RealDictCursor)
+    store_insights(cursor, generate_insights(cursor), datetime.now())
+    conn.commit()
+
+
+def _copy_value(value):
+    """One field in COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value)
+    if '\\' in text or '\t' in text or '\n' in text or '\r' in text:
+        text = text.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+    return text
+
+
+class CopyStream(io.TextIOBase):
+    """File-like view of a row iterator in COPY text format, read by copy_expert"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = ''
+        self.count = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = '\t'.join(_copy_value(value) for value in row) + '\n'
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = ''.join(chunks)
+        if size < 0:
+            self._buffer = ''
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def copy_rows(cursor, table, rows):
+    """COPY rows into table; returns the row count"""
+    stream = CopyStream(rows)
+    columns = ', '.join(COPY_COLUMNS[table])
+    cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN", stream, size=1 << 16)
+    return stream.count
+
+
+def replicate(name, copy):
+    """Name of the copy-th replica of a stream/category (copy 0 keeps the real name)"""
+    return name if copy == 0 else f"{name} #{copy + 1}"
+
+
+def scrape_times(rng, start, days, snapshots_per_day):
+    """
+    Hourly scrape times and whether the page had changed at each
+
+    Returns [(timestamp, changed)]; changes average snapshots_per_day a day
+    """
+    total_weight = sum(CHANGE_HOUR_WEIGHTS)
+    scrapes = []
+    for hour in range(days * 24):
+        ts = start + timedelta(hours=hour, seconds=rng.uniform(5, 90))
+        chance = snapshots_per_day * CHANGE_HOUR_WEIGHTS[ts.hour] / total_weight
+        scrapes.append((ts, rng.random() < chance))
+    return scrapes
+
+
+def stream_rows(rng, times, copies, snapshots_per_day):
+    """stream_data rows for every snapshot time"""
+    streams = [
+        (replicate(name, copy), stream_type, parent and replicate(parent, copy), allocation)
+        for copy in range(copies) for name, stream_type, parent, allocation in STREAMS
+    ]
+    state = {
+        name: {'issued': 0, 'backlog': rng.randint(300, 2500), 'lag_days': rng.randint(90, 240), 'year': None}
+        for name, _, _, _ in streams
+    }
+
+    for ts in times:
+        last_updated = ts.strftime('%B %d, %Y')
+        for name, stream_type, parent, allocation in streams:
+            s = state[name]
+            if s['year'] != ts.year:
+                # New allocation year
+                s['year'] = ts.year
+                s['issued'] = rng.randint(0, allocation // 50)
+            daily_burn = allocation / 365 * rng.uniform(0.6, 1.6)
+            s['issued'] = min(allocation, s['issued'] + int(rng.expovariate(snapshots_per_day / daily_burn)))
+            s['backlog'] = max(0, s['backlog'] + rng.randint(-40, 45))
+            s['lag_days'] = min(400, max(30, s['lag_days'] + rng.choice((-1, 0, 0, 1))))
+            processing = ts.date() - timedelta(days=s['lag_days'])
+
+            yield (
+                ts, name, stream_type, parent, allocation, s['issued'], allocation - s['issued'], s['backlog'],
+                f"{processing.strftime('%B')} {processing.day}, {processing.year} (for applications received)",
+                last_updated
+            )
+
+
+def scrape_log_rows(scrapes, draw_dates, stream_count):
+    seen_draw_dates = set()
+    for ts, changed in scrapes:
+        draws_new = 0
+        if ts.date() in draw_dates and ts.date() not in seen_draw_dates and ts.hour >= 12:
+            seen_draw_dates.add(ts.date())
+            draws_new = draw_dates[ts.date()]
+        status = 'success' if changed or draws_new else 'no_change'
+        message = f"Streams: {'saved' if changed else 'unchanged'}, Draws: {draws_new} new"
+        yield (ts, status, message, stream_count, draws_new, draws_new)
+
+
+def draw_rows(rng, start, days, copies):
+    """aaip_draws rows; each category draws independently on DRAW_CHANCE of weekdays"""
+    rows = []
+    for copy in range(copies):
+        for category, details, score, spread, size in DRAW_CATEGORIES:
+            name = replicate(category, copy)
+            for day in range(days):
+                draw_date = start.date() + timedelta(days=day)
+                if draw_date.weekday() >= 5 or rng.random() >= DRAW_CHANCE:
+                    continue
+                for detail in rng.sample(details, rng.randint(1, min(2, len(details)))):
+                    rows.append((
+                        draw_date, name, detail,
+                        max(1, int(rng.gauss(score, spread))),
+                        max(1, int(rng.lognormvariate(0, 0.6) * size)),
+                        None
+                    ))
+    return rows
+
+
+def eoi_rows(rng, times, draws, copies):
+    """EOI pool sizes at each snapshot; pools shrink on the day of a draw"""
+    draw_days = {(category, draw_date) for draw_date, category, _, _, _, _ in draws}
+    streams = [replicate(name, copy) for copy in range(copies) for name in EOI_STREAMS]
+    pools = {name: rng.randint(300, 3000) for name in streams}
+    drawn = set()
+    for ts in times:
+        last_updated = ts.strftime('%B %d, %Y')
+        for name in streams:
+            key = (name, ts.date())
+            if key in draw_days and key not in drawn:
+                drawn.add(key)
+                pools[name] = int(pools[name] * rng.uniform(0.75, 0.95))
+            else:
+                pools[name] = max(20, pools[name] + rng.randint(-3, 8))
+            yield (ts, name, pools[name], last_updated)
+
+
+def job_bank_rows(rng, start, days, copies):
+    """One Job Bank collection a day (03:00, like the extended collectors timer)"""
+    occupations = [
+        (f"{noc}-{copy + 1}" if copy else noc, title, replicate(stream, copy), wage)
+        for copy in range(copies) for noc, title, stream, wage in OCCUPATIONS
+    ]
+    state = {noc: {'openings': rng.randint(50, 1500), 'seekers': rng.randint(50, 1500), 'wage': wage}
+             for noc, _, _, wage in occupations}
+    names, weights = zip(*OUTLOOKS)
+    for day in range(days):
+        ts = start + timedelta(days=day, hours=3, seconds=rng.uniform(0, 120))
+        for noc, title, stream, _ in occupations:
+            s = state[noc]
+            s['openings'] = max(0, int(s['openings'] * rng.uniform(0.97, 1.035)))
+            s['seekers'] = max(0, int(s['seekers'] * rng.uniform(0.97, 1.035)))
+            if ts.month == 1 and ts.day == 1:
+                s['wage'] = round(s['wage'] * rng.uniform(1.0, 1.05), 2)
+            outlook = rng.choices(names, weights=weights)[0]
+            yield (
+                ts, noc, title, outlook, s['openings'], s['seekers'], s['wage'],
+                f"Employment outlook for {title} in Alberta is {outlook.lower()} over the next three years.",
+                stream
+            )
+
+
+def news_rows(rng, start, days):
+    for day in range(0, days, 14):
+        published = start.date() + timedelta(days=day + rng.randint(0, 13))
+        yield (
+            f"AAIP update {published.isoformat()}", "Program update. " * rng.randint(20, 120),
+            f"AAIP 更新 {published.isoformat()}", "项目更新。" * rng.randint(20, 120),
+            published
+        )
+
+
+def story_rows(rng, start, days, copies):
+    stream_names = [replicate(name, copy) for copy in range(copies) for name, _, _, _ in STREAMS]
+    for day in range(0, days * copies, 5):
+        submitted = start.date() + timedelta(days=day // copies)
+        nominated = submitted + timedelta(days=rng.randint(60, 300))
+        approved = nominated + timedelta(days=rng.randint(120, 400)) if rng.random() < 0.4 else None
+        created = datetime.combine(nominated, datetime.min.time()) + timedelta(days=rng.randint(1, 30))
+        status = 'approved' if rng.random() < 0.85 else 'pending'
+        yield (
+            rng.choice(('nomination', 'pr_approval', 'tips')), rng.choice(stream_names),
+            submitted, nominated, approved,
+            "Submitted my EOI and waited for the invitation. " * rng.randint(2, 10),
+            status, rng.randint(0, 40), created,
+            created + timedelta(days=rng.randint(0, 3)) if status == 'approved' else None
+        )
+
+
+def seed(conn, days=365, streams=1, snapshots_per_day=4, rng_seed=42):
+    """COPY days of history ending now into the base tables; returns {table: rows}"""
+    rng = random.Random(rng_seed)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+
+    scrapes = scrape_times(rng, start, days, snapshots_per_day)
+    times = [ts for ts, changed in scrapes if changed]
+    draws = draw_rows(rng, start, days, streams)
+    draw_dates = {}
+    for draw in draws:
+        draw_dates[draw[0]] = draw_dates.get(draw[0], 0) + 1
+
+    loads = [
+        ('stream_data', stream_rows(rng, times, streams, snapshots_per_day)),
+        ('scrape_log', scrape_log_rows(scrapes, draw_dates, len(STREAMS) * streams)),
+        ('aaip_draws', draws),
+        ('eoi_pool', eoi_rows(rng, times, draws, streams)),
+        ('job_bank_data', job_bank_rows(rng, start, days, streams)),
+        ('aaip_news', news_rows(rng, start, days)),
+        ('success_stories', story_rows(rng, start, days, streams)),
+    ]
+
+    cursor = conn.cursor()
+    counts = {}
+    for table, rows in loads:
+        began = time.perf_counter()
+        counts[table] = copy_rows(cursor, table, rows)
+        print(f"  ✓ {table}: {counts[table]} rows ({time.perf_counter() - began:.1f}s)")
+
+    # The page's overall totals are the sum of its streams
+    cursor.execute("""
+        INSERT INTO aaip_summary
+        (timestamp, nomination_allocation, nominations_issued, nomination_spaces_remaining,
+         applications_to_process, last_updated)
+        SELECT timestamp, SUM(nomination_allocation), SUM(nominations_issued),
+               SUM(nomination_spaces_remaining), SUM(applications_to_process), MAX(last_updated)
+        FROM stream_data
+        GROUP BY timestamp
+    """)
+    counts['aaip_summary'] = cursor.rowcount
+    print(f"  ✓ aaip_summary: {counts['aaip_summary']} rows")
+    conn.commit()
+    return counts
+
+
+def build(database_url, days=365, streams=1, snapshots_per_day=4, rng_seed=42):
+    """Reset, create the schema, seed and backfill derived tables; returns {table: rows}"""
+    conn = connect(database_url)
+    try:
+        reset_database(conn)
+        create_schema(conn)
+        counts = seed(conn, days, streams, snapshots_per_day, rng_seed)
+
+        run_backfill_migrations(conn)
+        refresh_insights(conn)
+        conn.autocommit = True
+        conn.cursor().execute("VACUUM ANALYZE")
+        return counts
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill a benchmark database with synthetic AAIP history')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        required=not os.getenv('BENCH_DATABASE_URL'))
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1y', help='preset size (default 1y)')
+    parser.add_argument('--days', type=int, help='days of history (overrides the scale)')
+    parser.add_argument('--streams', type=int, help='times every stream is repeated (overrides the scale)')
+    parser.add_argument('--snapshots-per-day', type=float, help='average page changes a day (overrides the scale)')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (default 42)')
+    args = parser.parse_args()
+
+    settings = dict(SCALES[args.scale])
+    for key in ('days', 'streams', 'snapshots_per_day'):
+        if getattr(args, key) is not None:
+            settings[key] = getattr(args, key)
+
+    print(f"Seeding {settings['days']} days, {settings['streams']}x streams...")
+    build(args.database_url, rng_seed=args.seed, **settings)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Draw query plan regression check
+
+Seeds a throwaway copy of aaip_draws (with the production index definitions)
+on a local PostgreSQL, then asserts via EXPLAIN (FORMAT JSON) that every
+filter combination compiled by backend/draw_filters.py is answered with an
+index scan, and that it returns the same rows as the legacy predicates.
+
+Everything runs in one transaction that is rolled back, so it is safe to
+point at a development database.
+
+Usage:
+    DATABASE_URL=postgresql://... python scripts/check_draw_query_plans.py
+    (or DB_HOST / DB_PORT / DB_NAME / DB_USER / DB_PASSWORD)
+
+Exit status is 1 when any check fails.
+"""
+
+import json
+import os
+import re
+import sys
+
+import psycopg2
+from dotenv import load_dotenv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'backend'))
+
+from draw_filters import draw_filter  # noqa: E402
+from pagination import seek_condition, order_by  # noqa: E402
+
+load_dotenv()
+
+DATABASE_URL = os.getenv('DATABASE_URL')
+SEED_DAYS = int(os.getenv('PLAN_CHECK_DAYS', '7300'))
+
+# Files holding the aaip_draws index definitions used in production
+INDEX_SOURCES = [
+    'scripts/database/setup_db_draws.sql',
+    'scripts/database/fix_draws_duplicates.sql',
+    'backend/db/migrations/010_add_keyset_pagination_indexes.sql',
+    'backend/db/migrations/011_add_draw_filter_indexes.sql',
+]
+
+CATEGORIES = [
+    'Alberta Opportunity Stream',
+    'Alberta Express Entry Stream',
+    'Dedicated Health Care Pathway',
+    'Tourism and Hospitality Stream',
+    'Rural Renewal Stream',
+]
+DETAILS = ['Construction', 'Agriculture', 'Technology', 'Law Enforcement', 'Priority Sectors']
+
+DRAWS_KEYS = [("draw_date", "DESC"), ("id", "DESC")]
+
+# (name, filter kwargs, query shape)
+CASES = [
+    ("list by category", {'stream_category': 'Alberta Express Entry Stream'}, 'list'),
+    ("list by category + General", {'stream_category': 'Alberta Express Entry Stream', 'stream_detail': 'General'}, 'list'),
+    ("list by category + detail", {'stream_category': 'Alberta Express Entry Stream', 'stream_detail': 'Technology'}, 'list'),
+    ("list by General only", {'stream_detail': 'General'}, 'list'),
+    ("list by year", {'year': 2015}, 'list'),
+    ("list by category + year", {'stream_category': 'Rural Renewal Stream', 'year': 2015}, 'list'),
+    ("list by date range", {'start_date': '2015-03-01', 'end_date': '2015-04-30'}, 'list'),
+    ("list page after cursor", {'stream_category': 'Rural Renewal Stream'}, 'seek'),
+    ("trends by category + detail + year", {'stream_category': 'Alberta Express Entry Stream', 'stream_detail': 'General', 'year': 2015}, 'trends'),
+    ("stats by year", {'year': 2015}, 'stats'),
+    ("stats by category + year", {'stream_category': 'Alberta Opportunity Stream', 'year': 2015}, 'stats'),
+]
+
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    END = '\033[0m'
+
+
+def print_success(msg):
+    print(f"{Colors.GREEN}✓{Colors.END} {msg}")
+
+
+def print_error(msg):
+    print(f"{Colors.RED}✗{Colors.END} {msg}")
+
+
+def print_info(msg):
+    print(f"{Colors.BLUE}ℹ{Colors.END} {msg}")
+
+
+def get_connection():
+    if DATABASE_URL:
+        return psycopg2.connect(DATABASE_URL)
+    return psycopg2.connect(
+        host=os.getenv('DB_HOST', 'localhost'),
+        port=os.getenv('DB_PORT', '5432'),
+        database=os.getenv('DB_NAME', 'aaip_data'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+def index_statements():
+    """CREATE INDEX statements on aaip_draws from the schema files"""
+    statements = []
+    for path in INDEX_SOURCES:
+        with open(os.path.join(ROOT, path)) as f:
+            sql = re.sub(r'--[^\n]*', '', f.read())
+        for statement in sql.split(';'):
+            statement = statement.strip()
+            if re.match(r'CREATE (UNIQUE )?INDEX', statement) and re.search(r'\bON aaip_draws\b', statement):
+                statements.append(statement)
+    return statements
+
+
+def seed(cursor):
+    """Throwaway aaip_draws in a private schema, SEED_DAYS days x categories"""
+    cursor.execute("CREATE SCHEMA plan_check")
+    cursor.execute("SET LOCAL search_path TO plan_check")
+    cursor.execute("""
+        CREATE TABLE aaip_draws (
+            id SERIAL PRIMARY KEY,
+            draw_date DATE NOT NULL,
+            draw_number VARCHAR(50),
+            stream_category TEXT NOT NULL,
+            stream_detail TEXT,
+            min_score INTEGER,
+            invitations_issued INTEGER,
+            selection_parameters TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    # One draw per day and category; a third "General" (split between NULL and '')
+    cursor.execute("""
+        INSERT INTO aaip_draws (draw_date, stream_category, stream_detail, min_score, invitations_issued)
+        SELECT
+            DATE '2005-01-01' + d,
+            (%(categories)s)[1 + c],
+            CASE (d * 7 + c) %% 9
+                WHEN 0 THEN NULL
+                WHEN 1 THEN ''
+                WHEN 2 THEN NULL
+                ELSE (%(details)s)[1 + (d + c) %% 5]
+            END,
+            40 + (d * 13 + c) %% 60,
+            10 + (d * 31 + c) %% 200
+        FROM generate_series(0, %(days)s - 1) d, generate_series(0, %(n)s - 1) c
+    """, {'categories': CATEGORIES, 'details': DETAILS, 'days': SEED_DAYS, 'n': len(CATEGORIES)})
+
+    for statement in index_statements():
+        cursor.execute(statement)
+    cursor.execute("ANALYZE aaip_draws")
+
+
+def build_query(shape, filters):
+    """The endpoint query shapes of /api/draws, /api/draws/trends and /api/draws/stats"""
+    where, params = draw_filter(**filters)
+    if shape in ('list', 'seek'):
+        query = f"SELECT id FROM aaip_draws WHERE {where}"
+        if shape == 'seek':
+            condition, seek_params = seek_condition(DRAWS_KEYS, ['2015-06-01', 1000000])
+            query += f" AND {condition}"
+            params.extend(seek_params)
+        return query + f" ORDER BY {order_by(DRAWS_KEYS)} LIMIT 100", params
+    if shape == 'trends':
+        return f"SELECT id FROM aaip_draws WHERE {where} ORDER BY draw_date ASC LIMIT 365", params
+    return f"""
+        SELECT stream_category, stream_detail, COUNT(*)
+        FROM aaip_draws
+        WHERE {where}
+        GROUP BY stream_category, stream_detail
+    """, params
+
+
+def legacy_ids(cursor, filters):
+    """Row ids matched by the predicates the endpoints used before draw_filters"""
+    query = "SELECT id FROM aaip_draws WHERE 1=1"
+    params = []
+    if filters.get('stream_category'):
+        query += " AND stream_category = %s"
+        params.append(filters['stream_category'])
+    if filters.get('stream_detail'):
+        if filters['stream_detail'] == 'General':
+            query += " AND (stream_detail IS NULL OR stream_detail = '')"
+        else:
+            query += " AND stream_detail = %s"
+            params.append(filters['stream_detail'])
+    if filters.get('year'):
+        query += " AND EXTRACT(YEAR FROM draw_date) = %s"
+        params.append(filters['year'])
+    if filters.get('start_date'):
+        query += " AND draw_date >= %s"
+        params.append(filters['start_date'])
+    if filters.get('end_date'):
+        query += " AND draw_date <= %s"
+        params.append(filters['end_date'])
+    cursor.execute(query, params)
+    return {row[0] for row in cursor.fetchall()}
+
+
+def plan_nodes(plan):
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+def check_case(cursor, name, filters, shape):
+    query, params = build_query(shape, filters)
+    cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+    result = cursor.fetchone()[0]
+    plan = (json.loads(result) if isinstance(result, str) else result)[0]['Plan']
+
+    # Bitmap Index Scan nodes carry only the index name, not the relation
+    nodes = list(plan_nodes(plan))
+    seq_scans = [node for node in nodes if node['Node Type'] == 'Seq Scan']
+    index_nodes = [node for node in nodes if 'Index' in node['Node Type']]
+
+    ok = True
+    if seq_scans or not index_nodes:
+        print_error(f"{name}: expected an index scan, got {[node['Node Type'] for node in nodes if 'Relation Name' in node]}")
+        ok = False
+
+    where, where_params = draw_filter(**filters)
+    cursor.execute(f"SELECT id FROM aaip_draws WHERE {where}", where_params)
+    if {row[0] for row in cursor.fetchall()} != legacy_ids(cursor, filters):
+        print_error(f"{name}: rows differ from the legacy predicates")
+        ok = False
+
+    if ok:
+        used = ', '.join(sorted({node.get('Index Name', '?') for node in index_nodes}))
+        print_success(f"{name}: {index_nodes[0]['Node Type']} using {used}")
+    return ok
+
+
+def main():
+    print("=" * 60)
+    print("Draw Query Plan Check")
+    print("=" * 60)
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+        seed(cursor)
+        cursor.execute("SELECT COUNT(*) FROM aaip_draws")
+        print_info(f"Seeded {cursor.fetchone()[0]} draws")
+
+        failures = sum(not check_case(cursor, *case) for case in CASES)
+    finally:
+        conn.rollback()
+        conn.close()
+
+    print("=" * 60)
+    if failures:
+        print_error(f"{failures}/{len(CASES)} checks failed")
+        return 1
+    print_success(f"All {len(CASES)} checks passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())